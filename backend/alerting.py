@@ -0,0 +1,164 @@
+"""
+Alert bookkeeping: suppression of repeat alerts, bulk state changes,
+archival / pruning and the maintained unread counter.
+
+An alert is unread while it is neither sent nor archived. Every write path
+that creates alerts or moves them out of that state adjusts the
+"alerts_unread" row in `counters` inside the same transaction, so the badge
+count is a primary-key read instead of a table count.
+
+The helpers below run in the caller's transaction and do not commit; callers
+commit, then bump(ALERTS) and publish the matching event.
+"""
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, select, update
+
+from extensions import db
+from models import Alert, Counter, OutboxMessage
+from risk_engine import LEVELS
+
+UNREAD = "alerts_unread"
+
+ALERT_TTL_DAYS       = float(os.getenv("ALERT_TTL_DAYS", "30"))        # archive after
+ALERT_RETENTION_DAYS = float(os.getenv("ALERT_RETENTION_DAYS", "90"))  # delete archived after
+PRUNE_BATCH          = int(os.getenv("ALERT_PRUNE_BATCH", "1000"))
+SUPPRESSION_MINUTES  = float(os.getenv("ALERT_SUPPRESSION_MINUTES", "360"))
+
+
+def adjust_unread(delta: int):
+    if delta:
+        db.session.execute(
+            update(Counter).where(Counter.name == UNREAD).values(value=Counter.value + delta)
+        )
+
+
+def recount_unread() -> int:
+    """Rebuild the counter from the alerts table (seed, repair)."""
+    count = db.session.scalar(
+        select(func.count()).select_from(Alert)
+        .where(Alert.is_sent.is_(False), Alert.archived_at.is_(None))
+    )
+    db.session.merge(Counter(name=UNREAD, value=count))
+    return count
+
+
+def unread_count() -> int:
+    value = db.session.scalar(select(Counter.value).where(Counter.name == UNREAD))
+    if value is None:
+        value = recount_unread()
+        db.session.commit()
+    return value
+
+
+def recent_alert_levels(areas, levels, since: datetime) -> dict:
+    """
+    area → highest level alerted at or after `since`, for the given areas and
+    levels. A GROUP BY over ix_alerts_area_severity_created: each (area, level)
+    pair is one index range seek. Archived alerts still count, so clearing the
+    feed does not re-trigger alerts.
+    """
+    if not areas:
+        return {}
+    rows = db.session.execute(
+        select(Alert.area, Alert.severity)
+        .where(Alert.area.in_(areas), Alert.severity.in_(levels), Alert.created_at >= since)
+        .group_by(Alert.area, Alert.severity)
+    ).all()
+    highest = {}
+    for area, severity in rows:
+        if LEVELS.index(severity) > LEVELS.index(highest.get(area, LEVELS[0])):
+            highest[area] = severity
+    return highest
+
+
+def suppressed(candidates: dict, now: datetime, window_minutes: float = None) -> set:
+    """
+    Areas in {area: level} that must not raise a new alert: an alert at the
+    same or a higher level went out within the suppression window. Escalation
+    or an expired window lets the alert through; a window of 0 disables this.
+    """
+    window = SUPPRESSION_MINUTES if window_minutes is None else window_minutes
+    if window <= 0 or not candidates:
+        return set()
+    # A lower candidate is also silenced by any higher recent alert, so ask for
+    # every level from the lowest candidate up.
+    lowest = min(LEVELS.index(level) for level in candidates.values())
+    recent = recent_alert_levels(list(candidates), list(LEVELS[lowest:]),
+                                 now - timedelta(minutes=window))
+    return {
+        area for area, level in candidates.items()
+        if area in recent and LEVELS.index(recent[area]) >= LEVELS.index(level)
+    }
+
+
+def alert_criteria(ids=None, severity=None, area=None, before=None) -> list:
+    """
+    WHERE clauses for bulk operations. `severity` / `area` accept a value or a
+    list; `before` is an ISO timestamp (ValueError when malformed).
+    """
+    criteria = []
+    if ids is not None:
+        criteria.append(Alert.id.in_([int(i) for i in ids]))
+    if severity:
+        criteria.append(Alert.severity.in_([severity] if isinstance(severity, str) else severity))
+    if area:
+        criteria.append(Alert.area.in_([area] if isinstance(area, str) else area))
+    if before:
+        criteria.append(Alert.created_at < datetime.fromisoformat(before))
+    return criteria
+
+
+def mark_sent(*criteria) -> list:
+    """Mark matching unsent alerts sent with one UPDATE. Returns their ids."""
+    rows = db.session.execute(
+        update(Alert)
+        .where(Alert.is_sent.is_(False), *criteria)
+        .values(is_sent=True)
+        .returning(Alert.id, Alert.archived_at),
+        execution_options={"synchronize_session": False},
+    ).all()
+    adjust_unread(-sum(1 for r in rows if r.archived_at is None))
+    return [r.id for r in rows]
+
+
+def archive(*criteria) -> list:
+    """Hide matching alerts from feeds with one UPDATE. Returns their ids."""
+    rows = db.session.execute(
+        update(Alert)
+        .where(Alert.archived_at.is_(None), *criteria)
+        .values(archived_at=datetime.utcnow())
+        .returning(Alert.id, Alert.is_sent),
+        execution_options={"synchronize_session": False},
+    ).all()
+    adjust_unread(-sum(1 for r in rows if not r.is_sent))
+    return [r.id for r in rows]
+
+
+def archive_expired(ttl_days: float = None) -> list:
+    cutoff = datetime.utcnow() - timedelta(days=ALERT_TTL_DAYS if ttl_days is None else ttl_days)
+    return archive(Alert.created_at < cutoff)
+
+
+def prune(retention_days: float = None) -> int:
+    """
+    Delete alerts archived longer than the retention period, PRUNE_BATCH rows
+    per transaction. Outbox history keeps its rows with alert_id cleared.
+    Commits; returns the number deleted.
+    """
+    cutoff = datetime.utcnow() - timedelta(
+        days=ALERT_RETENTION_DAYS if retention_days is None else retention_days)
+    deleted = 0
+    while True:
+        ids = db.session.scalars(
+            select(Alert.id).where(Alert.archived_at < cutoff).limit(PRUNE_BATCH)
+        ).all()
+        if not ids:
+            return deleted
+        db.session.execute(
+            update(OutboxMessage).where(OutboxMessage.alert_id.in_(ids)).values(alert_id=None)
+        )
+        db.session.execute(delete(Alert).where(Alert.id.in_(ids)))
+        db.session.commit()
+        deleted += len(ids)
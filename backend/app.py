@@ -1,3 +1,4 @@
+import click
 from flask import Flask
 from flask_cors import CORS
 import os
@@ -5,37 +6,161 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+
+def init_db(seed: bool = True):
+    """Create missing tables and seed; RuntimeError when the schema needs migrate-db."""
+    from extensions import db
+    from migrations import create_missing_indexes, pending, upgrade_message
+    steps = pending(db.engine)
+    if steps:
+        raise RuntimeError(upgrade_message(steps))
+    db.create_all()
+    with db.engine.begin() as conn:
+        create_missing_indexes(conn, db.metadata)
+    if seed:
+        from seed_data import seed_if_empty
+        seed_if_empty()
+
+
 def create_app():
     app = Flask(__name__)
     CORS(app, origins=["http://localhost:3000", "http://localhost:5173"])
 
+    import db_engine
+    import db_routing
     basedir = os.path.abspath(os.path.dirname(__file__))
-    app.config["SQLALCHEMY_DATABASE_URI"] = (
-        os.getenv("DATABASE_URL") or
-        f"sqlite:///{os.path.join(basedir, 'instance', 'jalraksha.db')}"
-    )
+    app.config["SQLALCHEMY_DATABASE_URI"] = db_engine.database_url(basedir)
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = db_engine.engine_options(app.config["SQLALCHEMY_DATABASE_URI"])
+    app.config["SQLALCHEMY_BINDS"] = {
+        key: {"url": url, **db_engine.engine_options(url)}
+        for key, url in db_routing.replica_binds().items()
+    }
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
     app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "jalraksha-secret-key-2024")
 
     from extensions import db
     db.init_app(app)
+    with app.app_context():
+        for engine in db.engines.values():
+            db_engine.install(engine)
+
+    if os.getenv("PROFILING", "0") == "1":
+        from profiling import init_app as init_profiling
+        init_profiling(app)
 
     from routes.dashboard import dashboard_bp
     from routes.disease import disease_bp
     from routes.chatbot import chatbot_bp
     from routes.alerts import alerts_bp
     from routes.reports import reports_bp
+    from routes.ingest import ingest_bp
+    from routes.notifications import notifications_bp
+    from routes.events import events_bp
 
     app.register_blueprint(dashboard_bp, url_prefix="/api/dashboard")
     app.register_blueprint(disease_bp,   url_prefix="/api/disease")
     app.register_blueprint(chatbot_bp,   url_prefix="/api/chatbot")
     app.register_blueprint(alerts_bp,    url_prefix="/api/alerts")
     app.register_blueprint(reports_bp,   url_prefix="/api/reports")
+    app.register_blueprint(ingest_bp,    url_prefix="/api/ingest")
+    app.register_blueprint(notifications_bp, url_prefix="/api/notifications")
+    app.register_blueprint(events_bp,    url_prefix="/api/events")
 
-    with app.app_context():
-        db.create_all()
-        from seed_data import seed_if_empty
-        seed_if_empty()
+    # BOOT_MODE=production: schema creation and seeding run once per deploy
+    # via `flask init-db`, not in every worker, and the optional SDKs are
+    # loaded in the background before the first request needs them.
+    production = os.getenv("BOOT_MODE", "dev") == "production"
+    if not production:
+        with app.app_context():
+            try:
+                init_db()
+            except RuntimeError as e:
+                # Keep booting so `flask migrate-db` can load the app.
+                app.logger.error(str(e))
+
+    # After init_db: the heartbeat thread writes to the `counters` table.
+    if db_routing.REPLICA_URLS:
+        db_routing.init_app(app)
+
+    @app.cli.command("init-db")
+    @click.option("--no-seed", is_flag=True, help="Create tables only.")
+    def init_db_command(no_seed):
+        """Create missing tables and seed an empty database."""
+        try:
+            init_db(seed=not no_seed)
+        except RuntimeError as e:
+            raise click.ClickException(str(e))
+        print("✅ Database ready.")
+
+    @app.cli.command("migrate-db")
+    def migrate_db_command():
+        """Upgrade a database created by an older version in place."""
+        from migrations import migrate
+        steps = migrate()
+        for step in steps:
+            print(f"  {step}")
+        print(f"✅ Database migrated ({len(steps)} step(s)).")
+
+    @app.cli.command("rebuild-rollups")
+    def rebuild_rollups_command():
+        """Recompute hourly/daily reading rollups from the raw tables."""
+        from rollups import rebuild_rollups
+        rebuild_rollups()
+        db.session.commit()
+        print("✅ Rollups rebuilt.")
+
+    @app.cli.command("sync-replicas")
+    @click.option("--every", type=float, default=0, help="Repeat every N seconds (simulated replication lag).")
+    def sync_replicas_command(every):
+        """Copy the primary SQLite database into the SQLite replicas (local testing)."""
+        import time
+        from db_routing import sync_sqlite_replicas
+        while True:
+            copied = sync_sqlite_replicas(db.engines)
+            print(f"✅ Copied primary to {', '.join(copied) or 'no SQLite replicas'}.")
+            if not every:
+                break
+            time.sleep(every)
+
+    @app.cli.command("ingest-file")
+    @click.argument("kind", type=click.Choice(["water-quality", "weather", "disease-cases"]))
+    @click.argument("path", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--format", "fmt", type=click.Choice(["csv", "parquet"]), default=None,
+                  help="Defaults to the file extension.")
+    @click.option("--batch-size", type=int, default=None, help="Rows per transaction.")
+    @click.option("--no-refresh", is_flag=True, help="Skip the risk refresh after loading.")
+    def ingest_file_command(kind, path, fmt, batch_size, no_refresh):
+        """Bulk-load a CSV / Parquet file of readings."""
+        from ingestion import BATCH_SIZE, detect_format, load_file
+        stats = load_file(kind, path, fmt or detect_format(path), batch_size or BATCH_SIZE,
+                          refresh=not no_refresh)
+        for err in stats["errors"][:10]:
+            print(f"  row {err['row']}: {err['error']}")
+        print(f"✅ {stats['inserted']:,} of {stats['rows']:,} rows loaded into {kind} "
+              f"({stats['rejected']:,} rejected) in {stats['seconds']}s — {stats['rows_per_sec']:,} rows/s.")
+        if "risk_refresh" in stats:
+            print(f"   Rescored {stats['risk_refresh']['updated']} area(s).")
+
+    @app.cli.command("prune-alerts")
+    def prune_alerts_command():
+        """Archive expired alerts and delete ones archived past the retention period."""
+        import alerting
+        archived = alerting.archive_expired()
+        db.session.commit()
+        deleted = alerting.prune()
+        print(f"✅ Archived {len(archived)} alert(s), deleted {deleted}.")
+
+    if os.getenv("PRELOAD_SDKS", "1" if production else "0") != "0":
+        from preload import start_preload
+        start_preload()
+
+    if os.getenv("RISK_WORKER", "1") != "0":
+        from risk_worker import start_worker
+        start_worker(app)
+
+    if os.getenv("NOTIFY_WORKER", "1") != "0":
+        from notifications import start_dispatcher
+        start_dispatcher(app)
 
     return app
 
@@ -0,0 +1,211 @@
+"""
+Concurrency stress test for the database layer.
+
+    python benchmarks/concurrency.py [--workers 4] [--threads 1] [--seconds 10]
+                                     [--write-ratio 0.3] [--profile tuned|baseline|both]
+                                     [--database-url URL] [--out concurrency.json]
+
+Starts --workers processes, each with its own create_app() and connection
+pool, as gunicorn sync workers would, all pointed at one database. Every
+worker loops for --seconds issuing a mix of reads (dashboard summary, risk
+map, alert list, with response caches invalidated so each read hits the
+database) and writes (reading ingest, full risk recalculation, bulk
+mark-sent). It reports per-operation throughput, p50/p95 latency, failures
+and how many of those were "database is locked".
+
+Without --database-url a fresh seeded SQLite file is created per profile:
+`tuned` uses the engine defaults from db_engine.py (WAL, synchronous=NORMAL,
+busy timeout), `baseline` the previous behaviour (rollback journal,
+synchronous=FULL). Pass a postgresql:// URL to stress a Postgres pool; the
+profile setting is ignored there.
+"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+from time import perf_counter
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILES = {
+    "tuned":    {},
+    "baseline": {"SQLITE_JOURNAL_MODE": "DELETE", "SQLITE_SYNCHRONOUS": "FULL"},
+}
+
+READS = {
+    "read_summary": ("get", "/api/dashboard/summary", None),
+    "read_map":     ("get", "/api/disease/map", None),
+    "read_alerts":  ("get", "/api/alerts/", None),
+}
+# name → (method, path, json body builder, relative weight)
+WRITES = {
+    "write_ingest":      ("post", "/api/ingest/water-quality", "reading", 7),
+    "write_recalculate": ("post", "/api/disease/recalculate", None, 2),
+    "write_mark_sent":   ("post", "/api/alerts/mark-sent", "mark_sent", 1),
+}
+
+
+def _percentile(ordered: list, pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def _body(kind, rng, areas):
+    if kind == "reading":
+        return {"area": rng.choice(areas), "ph": round(rng.gauss(7.2, 0.5), 2),
+                "turbidity": round(rng.lognormvariate(0.5, 0.8), 2), "hardness": 180,
+                "chloramines": 4.0, "conductivity": 400, "organic_carbon": 14, "trihalomethanes": 60}
+    if kind == "mark_sent":
+        return {"area": rng.choice(areas)}
+    return None
+
+
+def _worker(env: dict, threads: int, seconds: float, write_ratio: float, seed: int, barrier, results):
+    os.environ.update(env)
+    sys.path.insert(0, BACKEND)
+    from app import create_app
+    from cache import ALERTS, READINGS, RISK, bump
+    from seed_data import AREAS
+
+    app = create_app()
+    app.config["PROPAGATE_EXCEPTIONS"] = True
+    areas = [a["name"] for a in AREAS]
+    write_names   = list(WRITES)
+    write_weights = [WRITES[n][3] for n in write_names]
+    samples = {name: {"ms": [], "failed": 0, "locked": 0} for name in (*READS, *WRITES)}
+    lock = threading.Lock()
+
+    def loop(n):
+        rng    = random.Random(seed * 1000 + n)
+        client = app.test_client()
+        local  = {name: {"ms": [], "failed": 0, "locked": 0} for name in samples}
+        barrier.wait()
+        deadline = perf_counter() + seconds
+        while perf_counter() < deadline:
+            if rng.random() < write_ratio:
+                name = rng.choices(write_names, write_weights)[0]
+                method, path, body, _ = WRITES[name]
+            else:
+                name = rng.choice(list(READS))
+                method, path, body = READS[name]
+                bump(READINGS, RISK, ALERTS)
+            payload = _body(body, rng, areas)
+            start = perf_counter()
+            try:
+                resp = getattr(client, method)(path, json=payload)
+                ok = resp.status_code < 500
+                text = "" if ok else resp.get_data(as_text=True)
+            except Exception as e:   # PROPAGATE_EXCEPTIONS: driver errors surface here
+                ok, text = False, str(e)
+            elapsed = (perf_counter() - start) * 1000
+            if ok:
+                local[name]["ms"].append(elapsed)
+            else:
+                local[name]["failed"] += 1
+                local[name]["locked"] += "database is locked" in text
+        with lock:
+            for name, s in local.items():
+                samples[name]["ms"].extend(s["ms"])
+                samples[name]["failed"] += s["failed"]
+                samples[name]["locked"] += s["locked"]
+
+    pool = [threading.Thread(target=loop, args=(n,)) for n in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    results.put(samples)
+
+
+def run_profile(database_url: str, env_overrides: dict, workers: int, threads: int,
+                seconds: float, write_ratio: float, seed: int) -> dict:
+    env = {"DATABASE_URL": database_url, "BOOT_MODE": "production", "RISK_WORKER": "0",
+           "NOTIFY_WORKER": "0", "PRELOAD_SDKS": "0", "PROFILING": "0", **env_overrides}
+    subprocess.run([sys.executable, "-m", "flask", "--app", "app", "init-db"], cwd=BACKEND,
+                   env=dict(os.environ, **env), check=True, capture_output=True)
+
+    ctx     = mp.get_context("spawn")
+    barrier = ctx.Barrier(workers * threads)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(env, threads, seconds, write_ratio, seed + i, barrier, results))
+             for i in range(workers)]
+    for p in procs:
+        p.start()
+    merged = {}
+    for _ in procs:
+        for name, s in results.get().items():
+            m = merged.setdefault(name, {"ms": [], "failed": 0, "locked": 0})
+            m["ms"].extend(s["ms"])
+            m["failed"] += s["failed"]
+            m["locked"] += s["locked"]
+    for p in procs:
+        p.join()
+
+    operations, totals = {}, {"read": [0, 0, 0], "write": [0, 0, 0]}   # ok, failed, locked
+    for name, m in merged.items():
+        ordered = sorted(m["ms"])
+        operations[name] = {
+            "ok": len(ordered), "failed": m["failed"], "locked": m["locked"],
+            "ops_per_sec": round(len(ordered) / seconds, 1),
+            "p50_ms": round(_percentile(ordered, 0.50), 2),
+            "p95_ms": round(_percentile(ordered, 0.95), 2),
+        }
+        kind = totals[name.split("_")[0]]
+        kind[0] += len(ordered)
+        kind[1] += m["failed"]
+        kind[2] += m["locked"]
+    return {
+        "operations": operations,
+        "reads_per_sec":  round(totals["read"][0] / seconds, 1),
+        "writes_per_sec": round(totals["write"][0] / seconds, 1),
+        "failed": totals["read"][1] + totals["write"][1],
+        "locked": totals["read"][2] + totals["write"][2],
+    }
+
+
+def _print(profile: str, result: dict):
+    print(f"\n[{profile}] reads {result['reads_per_sec']}/s, writes {result['writes_per_sec']}/s, "
+          f"{result['failed']} failed ({result['locked']} database-is-locked)")
+    print(f"  {'operation':20} {'ok':>7} {'failed':>7} {'ops/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, r in result["operations"].items():
+        print(f"  {name:20} {r['ok']:7} {r['failed']:7} {r['ops_per_sec']:8.1f} {r['p50_ms']:8.2f} {r['p95_ms']:8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=4, help="processes, each with its own engine")
+    parser.add_argument("--threads", type=int, default=1, help="request threads per worker")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--write-ratio", type=float, default=0.3)
+    parser.add_argument("--profile", choices=[*PROFILES, "both"], default="both")
+    parser.add_argument("--database-url", help="stress an existing database instead of a fresh SQLite file")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default="concurrency-results.json")
+    args = parser.parse_args()
+
+    profiles = list(PROFILES) if args.profile == "both" else [args.profile]
+    if args.database_url:
+        profiles = ["tuned"]
+    results = {}
+    for profile in profiles:
+        url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'stress.db')}"
+        print(f"running {profile}: {args.workers} workers × {args.threads} threads for {args.seconds}s …",
+              file=sys.stderr)
+        results[profile] = run_profile(url, PROFILES[profile], args.workers, args.threads,
+                                       args.seconds, args.write_ratio, args.seed)
+        _print(profile, results[profile])
+
+    with open(args.out, "w") as f:
+        json.dump({"workers": args.workers, "threads": args.threads, "seconds": args.seconds,
+                   "write_ratio": args.write_ratio, "profiles": results}, f, indent=2)
+    print(f"\nResults written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Micro-benchmark for area report rendering.
+
+    python benchmarks/report_render.py [--seconds 2]
+
+Measures raw HTML render throughput on a fixed report for the previous
+hand-built f-string renderer (legacy_email_html, kept here as the baseline)
+and the compiled Jinja2 template (_build_email_html), plus the per-report_id
+render cache. Then times the /api/reports/area/<name> path through Flask's
+test client with the report cache cold (cleared before every call) and warm.
+"""
+import argparse
+import os
+import sys
+import tempfile
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _rate(fn, seconds: float) -> float:
+    fn()   # warm-up
+    n, start = 0, perf_counter()
+    while perf_counter() - start < seconds:
+        fn()
+        n += 1
+    return n / (perf_counter() - start)
+
+
+def legacy_email_html(report: dict) -> str:
+    """The f-string renderer the Jinja2 template replaced, kept as the baseline."""
+    from routes.reports import _risk_color
+
+    area     = report["area"]
+    level    = report["risk"]["level"]
+    score    = report["risk"]["score"]
+    color    = _risk_color(level)
+    gen_at   = report["generated_at"][:19].replace("T", " ") + " UTC"
+    rid      = report["report_id"]
+    wq       = report.get("water_quality") or {}
+    wd       = report.get("weather") or {}
+    dc       = report.get("disease") or {}
+    issues   = report.get("water_issues", [])
+
+    issue_rows = "".join(f"<li style='color:#c0392b'>{i}</li>" for i in issues) if issues else "<li style='color:green'>All major parameters within safe range</li>"
+    wq_table = ""
+    if wq:
+        params = [
+            ("pH",             wq.get("ph","—"),            "6.5 – 8.5"),
+            ("Turbidity (NTU)", wq.get("turbidity","—"),     "< 1 NTU"),
+            ("Hardness (mg/L)", wq.get("hardness","—"),      "< 300 mg/L"),
+            ("Chloramines (ppm)", wq.get("chloramines","—"), "< 4 ppm"),
+            ("Trihalomethanes (µg/L)", wq.get("trihalomethanes","—"), "< 80 µg/L"),
+            ("Conductivity",   wq.get("conductivity","—"),   "< 500 µS/cm"),
+            ("Organic Carbon", wq.get("organic_carbon","—"), "< 2 mg/L"),
+        ]
+        wq_table = "<table style='width:100%;border-collapse:collapse;font-size:13px;'><tr style='background:#eaf0fb'><th style='padding:6px;border:1px solid #ccc;text-align:left'>Parameter</th><th style='padding:6px;border:1px solid #ccc'>Value</th><th style='padding:6px;border:1px solid #ccc'>Safe Range</th></tr>"
+        for name, val, safe in params:
+            wq_table += f"<tr><td style='padding:6px;border:1px solid #ccc'>{name}</td><td style='padding:6px;border:1px solid #ccc;text-align:center'>{val}</td><td style='padding:6px;border:1px solid #ccc;text-align:center;color:#555'>{safe}</td></tr>"
+        wq_table += "</table>"
+
+    disease_block = ""
+    if dc:
+        disease_block = f"""
+        <h3 style='color:#6d28d9'>Disease Outbreak Data</h3>
+        <table style='width:100%;border-collapse:collapse;font-size:13px;'>
+          <tr style='background:#f3e8ff'>
+            <td style='padding:6px;border:1px solid #ccc'>Disease</td><td style='padding:6px;border:1px solid #ccc'><b>{dc.get('disease','—')}</b></td>
+          </tr>
+          <tr><td style='padding:6px;border:1px solid #ccc'>Total Cases</td><td style='padding:6px;border:1px solid #ccc'>{dc.get('total_cases','—')}</td></tr>
+          <tr style='background:#fef3c7'><td style='padding:6px;border:1px solid #ccc'>Active Cases</td><td style='padding:6px;border:1px solid #ccc;color:#b45309;font-weight:bold'>{dc.get('active_cases','—')}</td></tr>
+          <tr><td style='padding:6px;border:1px solid #ccc'>Recovered</td><td style='padding:6px;border:1px solid #ccc;color:green'>{dc.get('recovered','—')}</td></tr>
+          <tr style='background:#fee2e2'><td style='padding:6px;border:1px solid #ccc'>Deaths</td><td style='padding:6px;border:1px solid #ccc;color:#b91c1c;font-weight:bold'>{dc.get('deaths','—')}</td></tr>
+        </table>"""
+
+    climate_lines = []
+    if wd:
+        if wd.get("rainfall_mm", 0) > 50:
+            climate_lines.append(f"Heavy rainfall ({wd['rainfall_mm']} mm) flushing surface contaminants")
+        if wd.get("flood_risk"):
+            climate_lines.append("Flood risk — sewage mixing with drinking water possible")
+        if wd.get("humidity", 0) > 85:
+            climate_lines.append(f"High humidity ({wd['humidity']}%) accelerating microbial growth")
+        if wd.get("temperature", 0) > 30:
+            climate_lines.append(f"High temperature ({wd['temperature']}°C) promoting bacterial growth")
+    if not climate_lines:
+        climate_lines.append("Seasonal weather changes affecting water source quality")
+
+    html = f"""<!DOCTYPE html>
+<html>
+<head><meta charset='utf-8'/></head>
+<body style='font-family:Arial,sans-serif;max-width:700px;margin:0 auto;color:#1a1a1a;'>
+  <div style='background:linear-gradient(135deg,#1e3a5f,#0f2942);padding:24px 32px;border-radius:8px 8px 0 0;'>
+    <h1 style='color:white;margin:0;font-size:22px;'>🌊 JalRaksha — Water Health Intelligence</h1>
+    <p style='color:#7dd3fc;margin:4px 0 0;font-size:12px;'>Official Area Water Health Report</p>
+  </div>
+
+  <div style='background:#f0f4f8;padding:16px 32px;border-bottom:3px solid {color};'>
+    <table style='width:100%;'>
+      <tr>
+        <td><h2 style='margin:0;color:#0f2942'>{area}</h2><p style='margin:4px 0 0;color:#555;font-size:12px;'>Report ID: {rid} &nbsp;|&nbsp; Generated: {gen_at}</p></td>
+        <td style='text-align:right;'>
+          <span style='background:{color};color:white;padding:6px 16px;border-radius:20px;font-weight:bold;font-size:15px;'>
+            {level.upper()} RISK — {score}/100
+          </span>
+        </td>
+      </tr>
+    </table>
+  </div>
+
+  <div style='padding:24px 32px;background:white;'>
+    <h3 style='color:#1e3a5f;border-bottom:2px solid #e2e8f0;padding-bottom:6px;'>1. Water Quality Analysis</h3>
+    {wq_table if wq_table else "<p style='color:#888'>No water quality data available.</p>"}
+
+    <h3 style='color:#dc2626;margin-top:24px;'>⚠ Parameter Violations</h3>
+    <ul style='margin:8px 0;padding-left:20px;'>{issue_rows}</ul>
+  </div>
+
+  <div style='padding:0 32px 24px;background:white;'>
+    <h3 style='color:#1e3a5f;border-bottom:2px solid #e2e8f0;padding-bottom:6px;'>2. Environmental / Weather Conditions</h3>
+    {'<table style="font-size:13px;"><tr><td style="padding:4px 12px 4px 0;color:#555">Rainfall</td><td><b>' + str(wd.get('rainfall_mm','—')) + ' mm</b></td></tr><tr><td style="padding:4px 12px 4px 0;color:#555">Temperature</td><td><b>' + str(wd.get('temperature','—')) + ' °C</b></td></tr><tr><td style="padding:4px 12px 4px 0;color:#555">Humidity</td><td><b>' + str(wd.get('humidity','—')) + ' %</b></td></tr><tr><td style="padding:4px 12px 4px 0;color:#555">Flood Risk</td><td><b style="color:' + ('red' if wd.get('flood_risk') else 'green') + '">' + ('YES — ACTIVE' if wd.get('flood_risk') else 'No') + '</b></td></tr></table>' if wd else "<p style='color:#888'>No weather data.</p>"}
+
+    <h4 style='color:#0369a1;margin-top:12px;'>Contributing Environmental Factors:</h4>
+    <ul style='font-size:13px;'>{''.join(f"<li>{c}</li>" for c in climate_lines)}</ul>
+  </div>
+
+  <div style='padding:0 32px 24px;background:white;'>{disease_block}</div>
+
+  <div style='padding:16px 32px 24px;background:#fffbeb;border-top:2px solid #fcd34d;'>
+    <h3 style='color:#92400e;margin-top:0;'>3. Recommended Government Actions</h3>
+    <ol style='font-size:13px;line-height:1.7;color:#1a1a1a;'>
+      <li>Deploy mobile water testing units to {area} within <b>24 hours</b></li>
+      <li>Issue a public advisory for residents to boil water before use</li>
+      <li>Inspect and repair sewage infrastructure and open drains in the area</li>
+      <li>Distribute ORS packets and water purification tablets at public centres</li>
+      <li>Increase surveillance frequency for waterborne disease cases at local PHCs</li>
+      <li>Coordinate with CMWSSB / TWAD Board for emergency water supply</li>
+      <li>Activate rapid response teams if active disease cases exceed threshold</li>
+    </ol>
+  </div>
+
+  <div style='padding:12px 32px;background:#1e3a5f;border-radius:0 0 8px 8px;text-align:center;'>
+    <p style='color:#7dd3fc;font-size:11px;margin:0;'>
+      🚨 Emergency: <b style='color:white'>108</b> &nbsp;|&nbsp;
+      Disease Surveillance: <b style='color:white'>104</b> &nbsp;|&nbsp;
+      Water Quality Helpline: <b style='color:white'>1800-180-5678</b>
+    </p>
+    <p style='color:#475569;font-size:10px;margin:4px 0 0;'>This report was auto-generated by JalRaksha Water Health Intelligence System</p>
+  </div>
+</body>
+</html>"""
+    return html
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=2.0, help="time budget per measurement")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+    os.environ.setdefault("RISK_WORKER", "0")
+    os.environ.setdefault("NOTIFY_WORKER", "0")
+
+    from app import create_app
+    from routes import reports
+
+    app = create_app()
+    client = app.test_client()
+    area = "Sholinganallur"
+
+    with app.app_context():
+        report = reports._build_report_payload(area)
+    before = _rate(lambda: legacy_email_html(report), args.seconds)
+    after  = _rate(lambda: reports._build_email_html(report), args.seconds)
+    cached = _rate(lambda: reports._email_html(report), args.seconds)
+    print(f"render  legacy f-string (before)  {before:10.0f} renders/s")
+    print(f"render  Jinja2 template (after)   {after:10.0f} renders/s  ({after / before:.2f}x)")
+    print(f"render  cached per report_id      {cached:10.0f} renders/s  ({cached / before:.2f}x)")
+
+    if hasattr(reports, "_report_cache"):
+        def cold():
+            reports._report_cache.clear()
+            client.get(f"/api/reports/area/{area}")
+        cold_rate = _rate(cold, args.seconds)
+        warm_rate = _rate(lambda: client.get(f"/api/reports/area/{area}"), args.seconds)
+        print(f"request /api/reports/area (cold)  {cold_rate:10.0f} req/s")
+        print(f"request /api/reports/area (warm)  {warm_rate:10.0f} req/s")
+    else:
+        rate = _rate(lambda: client.get(f"/api/reports/area/{area}"), args.seconds)
+        print(f"request /api/reports/area         {rate:10.0f} req/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Endpoint benchmark harness.
+
+    python benchmarks/run.py [--scales 20x100x4,200x200x6] [--requests 200]
+                             [--out results.json] [--compare baseline.json]
+
+For each scale (areas × readings × diseases) a fresh SQLite database is
+generated with benchmarks/synthetic.py, then the key endpoints are called
+through Flask's test client. Per endpoint it records p50/p95/p99 latency,
+throughput and SQL statements per request. By default the response caches
+stay warm, as in production; --cold invalidates them before every request
+so the underlying queries are measured. Each scale runs in its own
+subprocess so module-level caches never leak between scales.
+
+Results are written as JSON. With --compare, p95 latency and query counts
+are checked against an earlier results file; the exit status is 1 when any
+endpoint regressed by more than --tolerance.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from time import perf_counter
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+DEFAULT_SCALES = "20x100x4,200x200x6"
+WARMUP = 3
+
+# name → (method, path builder). Path builders get a random.Random and the area list.
+ENDPOINTS = {
+    "dashboard_summary":   ("get",  lambda rng, areas: "/api/dashboard/summary"),
+    "disease_recalculate": ("post", lambda rng, areas: "/api/disease/recalculate"),
+    "disease_high_risk":   ("get",  lambda rng, areas: "/api/disease/high-risk"),
+    "reports_area":        ("get",  lambda rng, areas: f"/api/reports/area/{rng.choice(areas)}"),
+    "alerts_list":         ("get",  lambda rng, areas: "/api/alerts/"),
+}
+
+
+def _percentile(ordered: list, pct: float) -> float:
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * pct
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def _parse_scale(text: str) -> dict:
+    n, m, d = (int(x) for x in text.lower().split("x"))
+    return {"areas": n, "readings": m, "diseases": d}
+
+
+def run_scale(scale: dict, requests: int, seed: int, cold: bool = False) -> dict:
+    """Generate one dataset and benchmark every endpoint against it (runs in-process)."""
+    tmp = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+    os.environ["RISK_WORKER"] = "0"
+    os.environ["NOTIFY_WORKER"] = "0"
+
+    from sqlalchemy import event
+
+    from app import create_app
+    from benchmarks.synthetic import area_names, generate
+    from cache import ALERTS, READINGS, RISK, bump
+    from extensions import db
+    from routes.reports import _report_cache
+
+    app = create_app()
+    with app.app_context():
+        generated = generate(scale["areas"], scale["readings"], scale["diseases"], seed)
+        engine = db.engine
+
+    statements = [0]
+    event.listen(engine, "before_cursor_execute", lambda *a: statements.__setitem__(0, statements[0] + 1))
+
+    client = app.test_client()
+    areas  = area_names(scale["areas"])
+    rng    = random.Random(seed)
+    results = {}
+    for name, (method, path) in ENDPOINTS.items():
+        call = getattr(client, method)
+        for _ in range(WARMUP):
+            call(path(rng, areas))
+
+        latencies, errors = [], 0
+        statements[0] = 0
+        started = perf_counter()
+        for _ in range(requests):
+            url = path(rng, areas)
+            if cold:
+                bump(READINGS, RISK, ALERTS)
+                _report_cache.clear()   # revalidated against the data, not the versions
+            t0 = perf_counter()
+            resp = call(url)
+            latencies.append((perf_counter() - t0) * 1000)
+            errors += resp.status_code >= 400
+        elapsed = perf_counter() - started
+
+        latencies.sort()
+        results[name] = {
+            "requests": requests,
+            "errors": errors,
+            "p50_ms": round(_percentile(latencies, 0.50), 3),
+            "p95_ms": round(_percentile(latencies, 0.95), 3),
+            "p99_ms": round(_percentile(latencies, 0.99), 3),
+            "max_ms": round(latencies[-1], 3),
+            "throughput_rps": round(requests / elapsed, 1),
+            "queries_per_request": round(statements[0] / requests, 2),
+        }
+    return {"scale": scale, "cold": cold, "generated": generated, "endpoints": results}
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _scale_key(result: dict) -> str:
+    return json.dumps([result["scale"], result.get("cold", False)], sort_keys=True)
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list:
+    """Regressions as human-readable lines; empty when nothing got worse."""
+    base = {_scale_key(s): s for s in baseline.get("scales", [])}
+    problems = []
+    for scale in current["scales"]:
+        key = _scale_key(scale)
+        if key not in base:
+            continue
+        label = "x".join(str(scale["scale"][k]) for k in ("areas", "readings", "diseases"))
+        for name, now in scale["endpoints"].items():
+            before = base[key]["endpoints"].get(name)
+            if not before:
+                continue
+            if before["p95_ms"] and now["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+                problems.append(f"{label} {name}: p95 {before['p95_ms']} → {now['p95_ms']} ms")
+            if now["queries_per_request"] > before["queries_per_request"]:
+                problems.append(f"{label} {name}: queries/request "
+                                f"{before['queries_per_request']} → {now['queries_per_request']}")
+    return problems
+
+
+def _print_table(results: dict):
+    for scale in results["scales"]:
+        s = scale["scale"]
+        print(f"\n{s['areas']} areas × {s['readings']} readings × {s['diseases']} diseases"
+              f"{' (cold caches)' if scale.get('cold') else ''}, generated in {scale['generated']['load_seconds']}s")
+        print(f"  {'endpoint':22} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9} {'queries':>8}")
+        for name, r in scale["endpoints"].items():
+            print(f"  {name:22} {r['p50_ms']:9.2f} {r['p95_ms']:9.2f} {r['p99_ms']:9.2f} "
+                  f"{r['throughput_rps']:9.1f} {r['queries_per_request']:8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", default=DEFAULT_SCALES, help="comma-separated AREASxREADINGSxDISEASES")
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per endpoint")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--cold", action="store_true", help="invalidate response caches before each request")
+    parser.add_argument("--out", default="benchmark-results.json")
+    parser.add_argument("--compare", help="earlier results file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 slowdown (0.25 = 25%%)")
+    parser.add_argument("--one-scale", help=argparse.SUPPRESS)   # internal: subprocess entry point
+    args = parser.parse_args()
+
+    if args.one_scale:
+        json.dump(run_scale(_parse_scale(args.one_scale), args.requests, args.seed, args.cold), sys.stdout)
+        return
+
+    scales = []
+    for text in args.scales.split(","):
+        print(f"running scale {text} …", file=sys.stderr)
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--one-scale", text,
+             "--requests", str(args.requests), "--seed", str(args.seed)] + (["--cold"] if args.cold else []),
+            cwd=BACKEND, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            sys.stderr.write(proc.stderr)
+            sys.exit(proc.returncode)
+        # create_app / seeding may print before the JSON document.
+        scales.append(json.loads(proc.stdout[proc.stdout.index("{"):]))
+
+    results = {
+        "meta": {
+            "revision": _git_revision(),
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "requests": args.requests,
+            "seed": args.seed,
+            "cold": args.cold,
+        },
+        "scales": scales,
+    }
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+    _print_table(results)
+    print(f"\nResults written to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            problems = compare(results, json.load(f), args.tolerance)
+        if problems:
+            print("\nRegressions:")
+            for line in problems:
+                print(f"  ✗ {line}")
+            sys.exit(1)
+        print("\nNo regressions against", args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Cold-start benchmark.
+
+    python benchmarks/startup.py [--runs 10] [--out startup.json]
+
+Boots the backend in fresh interpreters, in both BOOT_MODE=dev and
+BOOT_MODE=production, against one pre-initialised SQLite database, and
+records per run:
+
+    import_ms         `import app` (Flask, SQLAlchemy, models, dotenv)
+    create_app_ms     create_app(): blueprints, plus create_all / seed in dev
+    first_request_ms  first GET /api/dashboard/summary (cold caches, new connection)
+    second_request_ms the same request again
+    process_ms        whole child process, interpreter start to exit, measured by the parent
+
+Background workers are disabled so they do not compete with the boot path.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from time import perf_counter
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = ("dev", "production")
+PATH = "/api/dashboard/summary"
+METRICS = ("import_ms", "create_app_ms", "first_request_ms", "second_request_ms", "process_ms")
+
+
+def one_run() -> dict:
+    """Runs inside the child interpreter."""
+    sys.path.insert(0, BACKEND)
+    t0 = perf_counter()
+    import app as app_module
+    t1 = perf_counter()
+    app = app_module.create_app()
+    t2 = perf_counter()
+    client = app.test_client()
+    first = client.get(PATH)
+    t3 = perf_counter()
+    client.get(PATH)
+    t4 = perf_counter()
+    return {
+        "status": first.status_code,
+        "import_ms": round((t1 - t0) * 1000, 2),
+        "create_app_ms": round((t2 - t1) * 1000, 2),
+        "first_request_ms": round((t3 - t2) * 1000, 2),
+        "second_request_ms": round((t4 - t3) * 1000, 2),
+    }
+
+
+def _env(mode: str, database_url: str) -> dict:
+    return dict(os.environ, BOOT_MODE=mode, DATABASE_URL=database_url,
+                RISK_WORKER="0", NOTIFY_WORKER="0", PRELOAD_SDKS="0", PROFILING="0")
+
+
+def _init_db(database_url: str):
+    subprocess.run([sys.executable, "-m", "flask", "--app", "app", "init-db"], cwd=BACKEND,
+                   env=_env("production", database_url), check=True, capture_output=True)
+
+
+def _launch(mode: str, database_url: str) -> dict:
+    start = perf_counter()
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--one-run"], cwd=BACKEND,
+                          env=_env(mode, database_url), capture_output=True, text=True)
+    elapsed = perf_counter() - start
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr)
+        sys.exit(proc.returncode)
+    run = json.loads(proc.stdout[proc.stdout.rindex("{"):])
+    if run["status"] != 200:
+        sys.exit(f"{mode}: {PATH} returned {run['status']}")
+    run["process_ms"] = round(elapsed * 1000, 2)
+    return run
+
+
+def summarize(runs: list) -> dict:
+    out = {}
+    for metric in METRICS:
+        values = sorted(r[metric] for r in runs)
+        out[metric] = {"median": round(statistics.median(values), 2), "max": values[-1]}
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10, help="fresh interpreters per mode")
+    parser.add_argument("--out", default="startup-results.json")
+    parser.add_argument("--one-run", action="store_true", help=argparse.SUPPRESS)   # child entry point
+    args = parser.parse_args()
+
+    if args.one_run:
+        json.dump(one_run(), sys.stdout)
+        return
+
+    database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'startup.db')}"
+    _init_db(database_url)
+
+    results = {}
+    for mode in MODES:
+        _launch(mode, database_url)   # warm the OS page cache / .pyc files
+        runs = [_launch(mode, database_url) for _ in range(args.runs)]
+        results[mode] = {"runs": runs, "summary": summarize(runs)}
+
+    with open(args.out, "w") as f:
+        json.dump({"runs": args.runs, "modes": results}, f, indent=2)
+
+    print(f"\n  {'median ms':18} " + " ".join(f"{m:>12}" for m in MODES))
+    for metric in METRICS:
+        print(f"  {metric:18} " + " ".join(f"{results[m]['summary'][metric]['median']:12.1f}" for m in MODES))
+    print(f"\nResults written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
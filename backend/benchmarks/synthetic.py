@@ -0,0 +1,167 @@
+"""
+Synthetic data generator.
+
+    python benchmarks/synthetic.py --areas 100 --readings 500 --diseases 5 [--seed 1]
+
+Fills the database named by DATABASE_URL with N areas × M readings per area
+(water quality and weather, hourly, newest last) and D diseases per area,
+then rescores every area. Rows go through the bulk ingestion path, so
+validation and rollups match production loads.
+
+Distributions are chosen to look like municipal sensor data rather than
+uniform noise:
+    pH            normal(7.3, 0.45), a few areas drift acidic/alkaline
+    turbidity     log-normal around 1–2 NTU with a long contaminated tail
+    chloramines   normal(4, 1.5) clipped at 0
+    rainfall      zero-inflated: ~65 % dry hours, otherwise exponential,
+                  with occasional cloudbursts
+    disease cases gamma-Poisson (over-dispersed) totals, active share ~ beta
+"""
+import argparse
+import math
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DISEASES = ["Cholera", "Typhoid", "Hepatitis A", "Dysentery", "Giardiasis",
+            "Cryptosporidiosis", "Leptospirosis", "Gastroenteritis"]
+
+CENTER = (13.0827, 80.2707)   # Chennai
+
+
+def _clip(value, lo, hi):
+    return max(lo, min(hi, value))
+
+
+def _poisson(rng, lam):
+    # Knuth for small means, normal approximation beyond.
+    if lam > 30:
+        return max(0, int(rng.gauss(lam, math.sqrt(lam))))
+    limit, k, p = math.exp(-lam), 0, 1.0
+    while True:
+        p *= rng.random()
+        if p <= limit:
+            return k
+        k += 1
+
+
+def area_names(n: int) -> list:
+    return [f"Synthetic Area {i:04d}" for i in range(1, n + 1)]
+
+
+def disease_names(d: int) -> list:
+    return [DISEASES[i] if i < len(DISEASES) else f"Disease {i + 1}" for i in range(d)]
+
+
+def water_rows(rng, areas, m, end):
+    for area in areas:
+        ph_bias   = rng.choice([0.0] * 8 + [-1.0, 1.0])        # a few areas drift
+        turb_mu   = rng.uniform(0.0, 1.2)
+        for h in range(m):
+            yield h, {
+                "area": area,
+                "ph": round(_clip(rng.gauss(7.3 + ph_bias, 0.45), 3.5, 11.0), 2),
+                "turbidity": round(_clip(rng.lognormvariate(turb_mu, 0.8), 0.05, 60.0), 2),
+                "hardness": round(_clip(rng.gauss(205, 35), 40, 400), 1),
+                "chloramines": round(_clip(rng.gauss(4.0, 1.5), 0.0, 14.0), 2),
+                "conductivity": round(_clip(rng.gauss(420, 80), 100, 900), 1),
+                "organic_carbon": round(_clip(rng.gauss(14, 3.5), 2, 30), 2),
+                "trihalomethanes": round(_clip(rng.gauss(66, 16), 5, 130), 1),
+                "recorded_at": end - timedelta(hours=m - 1 - h),
+            }
+
+
+def weather_rows(rng, areas, m, end):
+    for area in areas:
+        wetness = rng.uniform(0.2, 0.5)
+        for h in range(m):
+            if rng.random() > wetness:
+                rain = 0.0
+            elif rng.random() < 0.03:
+                rain = rng.uniform(60, 180)                     # cloudburst
+            else:
+                rain = rng.expovariate(1 / 12)
+            yield h, {
+                "area": area,
+                "rainfall_mm": round(rain, 1),
+                "temperature": round(rng.gauss(31, 2.5), 1),
+                "humidity": round(_clip(rng.gauss(72, 10), 30, 100), 1),
+                "flood_risk": rain > 100,
+                "recorded_at": end - timedelta(hours=m - 1 - h),
+            }
+
+
+def disease_rows(rng, areas, diseases, end):
+    for area in areas:
+        burden = rng.gammavariate(1.5, 40)                      # area-level over-dispersion
+        for disease in diseases:
+            total  = _poisson(rng, rng.gammavariate(2.0, burden / 2) + 1)
+            active = int(total * rng.betavariate(2, 5))
+            deaths = int((total - active) * rng.betavariate(1, 60))
+            yield 0, {
+                "area": area, "disease": disease,
+                "total_cases": total, "active_cases": active,
+                "recovered": total - active - deaths, "deaths": deaths,
+                "recorded_at": end,
+            }
+
+
+def generate(n_areas: int, m_readings: int, d_diseases: int, seed: int = 1) -> dict:
+    """Populate the current app's database. Returns row counts and timings."""
+    from extensions import db
+    from ingestion import load_rows
+    from models import RiskLevel
+    from risk_refresh import refresh_risk
+
+    rng   = random.Random(seed)
+    areas = area_names(n_areas)
+    end   = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    start = perf_counter()
+
+    for area in areas:
+        r, theta = 0.25 * math.sqrt(rng.random()), rng.uniform(0, 2 * math.pi)
+        db.session.add(RiskLevel(area=area, lat=CENTER[0] + r * math.sin(theta),
+                                 lng=CENTER[1] + r * math.cos(theta)))
+    db.session.commit()
+
+    loads = {
+        "water-quality": load_rows("water-quality", water_rows(rng, areas, m_readings, end), refresh=False),
+        "weather":       load_rows("weather", weather_rows(rng, areas, m_readings, end), refresh=False),
+        "disease-cases": load_rows("disease-cases", disease_rows(rng, areas, disease_names(d_diseases), end),
+                                   refresh=False),
+    }
+    refresh_start = perf_counter()
+    refresh_risk()
+    return {
+        "areas": n_areas,
+        "rows": {kind: stats["inserted"] for kind, stats in loads.items()},
+        "load_seconds": round(refresh_start - start, 3),
+        "refresh_seconds": round(perf_counter() - refresh_start, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--areas", type=int, default=50)
+    parser.add_argument("--readings", type=int, default=200, help="readings per area per sensor table")
+    parser.add_argument("--diseases", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    os.environ.setdefault("RISK_WORKER", "0")
+    os.environ.setdefault("NOTIFY_WORKER", "0")
+    from app import create_app
+
+    app = create_app()
+    with app.app_context():
+        result = generate(args.areas, args.readings, args.diseases, args.seed)
+    print(f"✅ {result['areas']} areas, {result['rows']} rows in {result['load_seconds']}s "
+          f"(+{result['refresh_seconds']}s risk refresh).")
+
+
+if __name__ == "__main__":
+    main()
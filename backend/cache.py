@@ -0,0 +1,67 @@
+"""
+Process-local data versions and a small versioned response cache.
+
+Write paths call bump("<scope>") after they commit; cached entries remember the
+versions of the scopes they were built from and are dropped as soon as any of
+them moves. A TTL bounds staleness for writes made by other worker processes,
+which do not share these counters.
+"""
+import threading
+from collections import OrderedDict, defaultdict
+from time import monotonic
+
+READINGS = "readings"   # water quality / weather / disease case rows
+RISK     = "risk"       # RiskLevel rows
+ALERTS   = "alerts"     # Alert rows
+
+_versions = defaultdict(int)
+_lock     = threading.Lock()
+
+
+def bump(*scopes):
+    with _lock:
+        for scope in scopes:
+            _versions[scope] += 1
+
+
+def versions(*scopes) -> tuple:
+    with _lock:
+        return tuple(_versions[s] for s in scopes)
+
+
+class VersionedCache:
+    """Thread-safe LRU whose entries expire on TTL or when a watched scope is bumped."""
+
+    def __init__(self, scopes, ttl: float = 30.0, maxsize: int = 256):
+        self.scopes  = tuple(scopes)
+        self.ttl     = ttl
+        self.maxsize = maxsize
+        self._data   = OrderedDict()
+        self._lock   = threading.Lock()
+
+    def get(self, key):
+        current = versions(*self.scopes)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            built_at, built_versions, value = entry
+            if built_versions != current or monotonic() - built_at > self.ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value, built_versions=None):
+        """Store `value`; pass the versions read *before* loading the data to avoid caching a racing write."""
+        if built_versions is None:
+            built_versions = versions(*self.scopes)
+        with self._lock:
+            self._data[key] = (monotonic(), built_versions, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
@@ -0,0 +1,162 @@
+"""
+JalRaksha – Chatbot Knowledge Base
+Keyword index behind the offline/fallback chatbot answers.
+
+Each entry has a list of keywords (single words or multi-word phrases,
+any language) and a response. Keywords are compiled into a hash map of
+token n-grams, so matching a message costs a few dict lookups per
+message token regardless of how many entries the knowledge base holds.
+
+Scoring:
+    exact keyword hit      → number of tokens in the keyword × entry weight
+    inflected hit          → same as exact when the message word only adds
+                             1–2 trailing characters ("chloramines")
+    prefix hit (≥4 chars)  → 0.8 × the above  (e.g. "giardiasis" → "giardia")
+The entry with the highest total wins; ties go to the entry listed first.
+
+An external JSON file (CHATBOT_KB_PATH) replaces the built-in entries:
+
+    {
+      "default": "Fallback text when nothing matches",
+      "entries": [
+        {"keywords": ["cholera", "हैजा"], "response": "...", "weight": 1.0}
+      ]
+    }
+
+The file is re-read when its mtime changes (checked at most every
+CHATBOT_KB_CHECK seconds), so edits apply without an app restart.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+
+MIN_PREFIX   = 4
+PREFIX_SCORE = 0.8
+INFLECTION   = 2     # trailing characters treated as an inflection, not a new word
+
+# Anything that is not whitespace, ASCII punctuation or a Devanagari danda.
+_TOKEN_RE = re.compile(r"[^\s!-/:-@\[-`{-~।॥]+")
+
+
+def tokenize(text: str) -> list:
+    return _TOKEN_RE.findall(text.casefold())
+
+
+class KeywordIndex:
+    def __init__(self, entries: list, default: str):
+        self.entries = entries
+        self.default = default
+        self._exact  = {}   # token tuple -> [(entry_idx, score)]
+        self._prefix = {}   # single-token keyword -> [(entry_idx, full score)], for stem-like matches
+        self.max_ngram = 1
+
+        for idx, entry in enumerate(entries):
+            weight = float(entry.get("weight", 1.0))
+            for keyword in entry["keywords"]:
+                tokens = tuple(tokenize(keyword))
+                if not tokens:
+                    continue
+                score = len(tokens) * weight
+                self._exact.setdefault(tokens, []).append((idx, score))
+                self.max_ngram = max(self.max_ngram, len(tokens))
+                if len(tokens) == 1 and len(tokens[0]) >= MIN_PREFIX:
+                    self._prefix.setdefault(tokens[0], []).append((idx, score))
+
+    @classmethod
+    def from_mapping(cls, mapping: dict, default: str) -> "KeywordIndex":
+        """Build from a {keyword: response} dict; one entry per keyword."""
+        return cls([{"keywords": [k], "response": v} for k, v in mapping.items()], default)
+
+    @classmethod
+    def from_file(cls, path: str, default: str) -> "KeywordIndex":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        entries = data["entries"] if isinstance(data, dict) else data
+        for entry in entries:
+            if not entry.get("keywords") or not entry.get("response"):
+                raise ValueError("Every knowledge-base entry needs 'keywords' and 'response'")
+        return cls(entries, data.get("default", default) if isinstance(data, dict) else default)
+
+    def scores(self, message: str) -> dict:
+        """entry index → score. Each keyword counts once per message."""
+        tokens  = tokenize(message)
+        matched = {}   # (entry_idx, keyword key) -> score, so repeats don't stack
+        for i in range(len(tokens)):
+            for n in range(1, min(self.max_ngram, len(tokens) - i) + 1):
+                key = tuple(tokens[i:i + n])
+                for idx, score in self._exact.get(key, ()):
+                    matched[(idx, key)] = score
+            token = tokens[i]
+            for cut in range(MIN_PREFIX, len(token)):
+                stem   = token[:cut]
+                factor = 1.0 if len(token) - cut <= INFLECTION else PREFIX_SCORE
+                for idx, score in self._prefix.get(stem, ()):
+                    key = (idx, (stem,))
+                    matched[key] = max(matched.get(key, 0.0), score * factor)
+
+        totals = {}
+        for (idx, _), score in matched.items():
+            totals[idx] = totals.get(idx, 0.0) + score
+        return totals
+
+    def best(self, message: str):
+        """Best-scoring entry for the message, or None."""
+        totals = self.scores(message)
+        if not totals:
+            return None
+        idx = min(totals, key=lambda i: (-totals[i], i))
+        return self.entries[idx]
+
+    def respond(self, message: str) -> str:
+        entry = self.best(message)
+        return entry["response"] if entry else self.default
+
+
+class KnowledgeBase:
+    """
+    Holds the current KeywordIndex and swaps it when CHATBOT_KB_PATH changes.
+    A file that fails to load keeps the previous index in service.
+    """
+
+    def __init__(self, builtin: dict, default: str, path: str = None, check_every: float = None):
+        self.path        = path if path is not None else os.getenv("CHATBOT_KB_PATH")
+        self.check_every = check_every if check_every is not None else float(os.getenv("CHATBOT_KB_CHECK", "5"))
+        self._builtin    = KeywordIndex.from_mapping(builtin, default)
+        self._default    = default
+        self._index      = self._builtin
+        self._mtime      = None
+        self._checked_at = 0.0
+        self._lock       = threading.Lock()
+        self.last_error  = None
+
+    @property
+    def source(self) -> str:
+        return self.path if self._index is not self._builtin else "builtin"
+
+    def index(self) -> KeywordIndex:
+        if self.path and time.monotonic() - self._checked_at >= self.check_every:
+            self._maybe_reload()
+        return self._index
+
+    def _maybe_reload(self):
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError as e:
+                self.last_error = str(e)
+                return
+            if mtime == self._mtime:
+                return
+            try:
+                self._index = KeywordIndex.from_file(self.path, self._default)
+                self.last_error = None
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                self.last_error = f"{self.path}: {e}"
+            self._mtime = mtime
+
+    def respond(self, message: str) -> str:
+        return self.index().respond(message)
@@ -0,0 +1,95 @@
+"""
+Engine configuration profiles, chosen by the DATABASE_URL scheme.
+
+SQLite (the default file database): every new connection gets WAL journaling
+so readers never block the writer, synchronous=NORMAL (durable at WAL
+checkpoints, the standard pairing with WAL), a busy timeout so concurrent
+writers from several workers wait for the lock instead of failing with
+"database is locked", and a larger page cache.
+
+PostgreSQL: a sized connection pool with pre-ping and recycling, so workers
+survive server restarts and idle-connection reaping, and a server-side
+statement timeout so a runaway query cannot hold a worker forever.
+
+Every setting can be overridden through the environment; see .env.example.
+"""
+import os
+
+from sqlalchemy import event
+
+
+def database_url(basedir: str) -> str:
+    """DATABASE_URL, or the bundled SQLite file (its directory is created)."""
+    url = os.getenv("DATABASE_URL")
+    if url:
+        # Heroku-style URLs; SQLAlchemy only accepts the postgresql:// scheme.
+        return "postgresql://" + url[len("postgres://"):] if url.startswith("postgres://") else url
+    instance = os.path.join(basedir, "instance")
+    os.makedirs(instance, exist_ok=True)
+    return f"sqlite:///{os.path.join(instance, 'jalraksha.db')}"
+
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def _is_postgres(url: str) -> bool:
+    return url.startswith("postgresql")
+
+
+def sqlite_pragmas() -> dict:
+    return {
+        "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+        "synchronous":  os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+        "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        "cache_size":   -int(os.getenv("SQLITE_CACHE_KB", "20000")),   # negative = KiB
+        "temp_store":   "MEMORY",
+    }
+
+
+def engine_options(url: str) -> dict:
+    """SQLALCHEMY_ENGINE_OPTIONS for `url`."""
+    if _is_sqlite(url):
+        # The driver's own lock wait is the busy timeout too; keep them equal.
+        busy = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+        return {"connect_args": {"timeout": busy / 1000, "check_same_thread": False}}
+    if _is_postgres(url):
+        options = {
+            "pool_size":     int(os.getenv("DB_POOL_SIZE", "10")),
+            "max_overflow":  int(os.getenv("DB_MAX_OVERFLOW", "20")),
+            "pool_timeout":  float(os.getenv("DB_POOL_TIMEOUT", "30")),
+            "pool_recycle":  int(os.getenv("DB_POOL_RECYCLE", "1800")),
+            "pool_pre_ping": True,
+        }
+        timeout = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "15000"))
+        if timeout:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+        return options
+    return {"pool_pre_ping": True}
+
+
+def _apply_pragmas(dbapi_conn, _record):
+    cursor = dbapi_conn.cursor()
+    try:
+        for name, value in sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def install(engine):
+    """Attach per-connection setup to `engine` (SQLite pragmas; no-op otherwise)."""
+    if engine.dialect.name == "sqlite" and not event.contains(engine, "connect", _apply_pragmas):
+        event.listen(engine, "connect", _apply_pragmas)
+
+
+def describe(engine) -> dict:
+    """Effective settings of `engine`, for logs and benchmarks."""
+    info = {"dialect": engine.dialect.name, "pool": type(engine.pool).__name__}
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as conn:
+            for name in ("journal_mode", "synchronous", "busy_timeout", "cache_size"):
+                info[name] = conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+    elif hasattr(engine.pool, "size"):
+        info["pool_size"] = engine.pool.size()
+    return info
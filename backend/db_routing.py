@@ -0,0 +1,201 @@
+"""
+Read-replica routing (DATABASE_REPLICA_URLS).
+
+Replicas are registered as Flask-SQLAlchemy binds ("replica_1", …) and
+RoutingSession.get_bind() picks the engine per statement:
+
+  * GET / HEAD / OPTIONS requests read from one healthy replica, chosen once
+    per request so every query in it sees the same copy.
+  * Everything else goes to the primary: other methods, CLI commands,
+    background workers, any flush or INSERT / UPDATE / DELETE, and every
+    read after a write in the same request.
+  * Read-after-write across requests: a request that wrote sets the
+    `jr_primary_until` cookie, and the same client's reads stay on the
+    primary until the staleness bound has passed. `X-Read-Consistency:
+    strong` forces the primary for a single request.
+
+Staleness is measured with a heartbeat rather than driver-specific lag
+queries. A per-process thread stamps the `replica_heartbeat` counter on the
+primary every REPLICA_CHECK_INTERVAL seconds and reads it back from each
+replica. A replica whose copy is more than REPLICA_MAX_LAG seconds old, or
+unreachable, is skipped; with no healthy replica, reads fall back to the
+primary. This works the same for Postgres streaming replicas and for SQLite
+files refreshed with `flask sync-replicas`.
+"""
+import logging
+import os
+import random
+import threading
+import time
+
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+
+log = logging.getLogger(__name__)
+
+REPLICA_URLS   = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+MAX_LAG        = float(os.getenv("REPLICA_MAX_LAG", "5"))           # seconds
+CHECK_INTERVAL = float(os.getenv("REPLICA_CHECK_INTERVAL", "1"))    # seconds
+
+HEARTBEAT    = "replica_heartbeat"
+COOKIE       = "jr_primary_until"
+READ_METHODS = frozenset(("GET", "HEAD", "OPTIONS"))
+
+heartbeats = {}   # bind key → last primary heartbeat seen on the replica (unix s), None if unknown
+
+_thread = None
+
+
+def replica_binds(urls=None) -> dict:
+    return {f"replica_{i}": url for i, url in enumerate(REPLICA_URLS if urls is None else urls, start=1)}
+
+
+def replica_lag(key: str, now: float = None):
+    """Seconds the replica is behind, or None when it has no heartbeat yet."""
+    beat = heartbeats.get(key)
+    return None if beat is None else max(0.0, (now or time.time()) - beat)
+
+
+def healthy_replicas(now: float = None) -> list:
+    now = now or time.time()
+    return [k for k in heartbeats if (lag := replica_lag(k, now)) is not None and lag <= MAX_LAG]
+
+
+def _pinned_to_primary() -> bool:
+    if request.method not in READ_METHODS:
+        return True
+    if request.headers.get("X-Read-Consistency", "").lower() == "strong":
+        return True
+    try:
+        return float(request.cookies.get(COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def _choose_replica():
+    if _pinned_to_primary():
+        return None
+    healthy = healthy_replicas()
+    return random.choice(healthy) if healthy else None
+
+
+def primary_required() -> bool:
+    """
+    True when replicas are configured and this request must see the primary's
+    current data (writer cookie, strong consistency, non-GET, or it wrote).
+    Process-local response caches must not answer such a request: their
+    entries may predate a write made through another worker.
+    """
+    if not (heartbeats and has_request_context()):
+        return False
+    return bool(g.get("db_wrote")) or _pinned_to_primary()
+
+
+def read_from_replica() -> bool:
+    """True when this request's reads so far were served by a replica; don't cache what they built."""
+    return has_request_context() and bool(g.get("db_route")) and not g.get("db_wrote")
+
+
+class RoutingSession(Session):
+    """db.session class: reads in GET requests go to a replica, all else to the primary."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and heartbeats and has_request_context():
+            if self._flushing or getattr(clause, "is_dml", False):
+                g.db_wrote = True
+            elif not g.get("db_wrote"):
+                if "db_route" not in g:
+                    g.db_route = _choose_replica()
+                if g.db_route:
+                    return self._db.engines[g.db_route]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+# ─────────── heartbeat ──────────────────────────────────────────────────────────
+
+def beat(engines) -> int:
+    """Stamp the heartbeat on the primary; returns the value written."""
+    from sqlalchemy import insert, update
+    from models import Counter
+
+    now = int(time.time())
+    table = Counter.__table__
+    with engines[None].begin() as conn:
+        if not conn.execute(update(table).where(table.c.name == HEARTBEAT).values(value=now)).rowcount:
+            conn.execute(insert(table).values(name=HEARTBEAT, value=now))
+    return now
+
+
+def check_replicas(engines):
+    """Refresh `heartbeats` from every replica bind."""
+    from sqlalchemy import select
+    from models import Counter
+
+    for key in replica_binds():
+        try:
+            with engines[key].connect() as conn:
+                heartbeats[key] = conn.execute(select(Counter.value).where(Counter.name == HEARTBEAT)).scalar()
+        except Exception as e:   # unreachable, or not yet initialised
+            if heartbeats.get(key) is not None:
+                log.warning("replica %s unavailable: %s", key, e)
+            heartbeats[key] = None
+
+
+def _run(app):
+    from extensions import db
+
+    while True:
+        with app.app_context():
+            try:
+                beat(db.engines)
+            except Exception:
+                log.exception("replica heartbeat failed")
+            check_replicas(db.engines)
+        time.sleep(CHECK_INTERVAL)
+
+
+def sync_sqlite_replicas(engines) -> list:
+    """
+    Copy the primary SQLite file into every SQLite replica with the online
+    backup API — a stand-in for replication when testing locally. Returns
+    the bind keys copied.
+    """
+    primary = engines[None]
+    if primary.dialect.name != "sqlite":
+        raise ValueError("sync-replicas only copies SQLite databases")
+    beat(engines)
+    copied = []
+    for key in replica_binds():
+        replica = engines[key]
+        if replica.dialect.name != "sqlite":
+            continue
+        src, dst = primary.raw_connection(), replica.raw_connection()
+        try:
+            src.driver_connection.backup(dst.driver_connection)
+        finally:
+            src.close()
+            dst.close()
+        copied.append(key)
+    return copied
+
+
+# ─────────── wiring ─────────────────────────────────────────────────────────────
+
+def _mark_response(response):
+    if g.get("db_wrote"):
+        until = time.time() + MAX_LAG + 1   # +1: heartbeats have one-second resolution
+        response.set_cookie(COOKIE, f"{until:.3f}", max_age=int(MAX_LAG) + 2, httponly=True, samesite="Lax")
+    if "db_route" in g or g.get("db_wrote"):
+        response.headers["X-DB-Route"] = "primary" if g.get("db_wrote") else (g.db_route or "primary")
+    return response
+
+
+def init_app(app):
+    """Install the response hook and start the per-process heartbeat thread (idempotent)."""
+    global _thread
+    app.after_request(_mark_response)
+    for key in replica_binds():
+        heartbeats.setdefault(key, None)
+    if _thread is None:
+        _thread = threading.Thread(target=_run, args=(app,), name="replica-heartbeat", daemon=True)
+        _thread.start()
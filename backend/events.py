@@ -0,0 +1,119 @@
+"""
+Process-local publish/subscribe hub for live risk and alert changes.
+
+Write paths call publish("<topic>.<kind>", data) after they commit; every
+subscriber gets its own bounded queue. A subscriber that falls behind is
+cut off rather than allowed to block publishers — it reconnects with the
+last event id it saw and the missed events are replayed from a short ring
+buffer.
+
+Like the counters in cache.py, the hub only reaches clients connected to
+the same worker process; the frontend re-fetches on every reconnect and
+once a minute to pick up writes handled elsewhere. A stream holds its
+worker thread while open, so serve it from threaded or gevent workers.
+
+Topics:
+    risk      risk.updated    {"changes": [{area, score, level, prev_level, ...}]}
+    alert     alert.created   {"alerts":  [alert dicts]}
+              alert.sent      {"ids": [...]}
+              alert.archived  {"ids": [...]}
+"""
+import os
+import queue
+import threading
+from collections import deque
+
+QUEUE_SIZE  = int(os.getenv("EVENTS_QUEUE_SIZE", "100"))
+REPLAY_SIZE = int(os.getenv("EVENTS_REPLAY_SIZE", "256"))
+
+RISK  = "risk"
+ALERT = "alert"
+TOPICS = (RISK, ALERT)
+
+
+class Subscription:
+    def __init__(self, hub: "EventHub", topics):
+        self.hub        = hub
+        self.topics     = set(topics) if topics else None
+        self.queue      = queue.Queue(maxsize=QUEUE_SIZE)
+        self.overflowed = False
+
+    def wants(self, event: str) -> bool:
+        return self.topics is None or event.split(".", 1)[0] in self.topics
+
+    def offer(self, item) -> bool:
+        if self.overflowed or not self.wants(item[1]):
+            return True
+        try:
+            self.queue.put_nowait(item)
+            return True
+        except queue.Full:
+            self.overflowed = True
+            return False
+
+    def get(self, timeout: float):
+        """Next (id, event, data), or None on timeout."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+class EventHub:
+    def __init__(self, replay: int = REPLAY_SIZE):
+        self._lock        = threading.Lock()
+        self._subscribers = set()
+        self._recent      = deque(maxlen=replay)
+        self._seq         = 0
+        self.published    = 0
+        self.dropped      = 0
+
+    def publish(self, event: str, data: dict) -> int:
+        with self._lock:
+            self._seq += 1
+            item = (self._seq, event, data)
+            self._recent.append(item)
+            self.published += 1
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            if not sub.offer(item):
+                with self._lock:
+                    self.dropped += 1
+        return item[0]
+
+    def subscribe(self, topics=None, last_id: int = None) -> Subscription:
+        """
+        Register a subscriber. With `last_id`, events after it that are still
+        in the replay buffer are queued first.
+        """
+        sub = Subscription(self, topics)
+        with self._lock:
+            if last_id is not None:
+                for item in self._recent:
+                    if item[0] > last_id:
+                        sub.offer(item)
+            self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "published":   self.published,
+                "dropped":     self.dropped,
+                "last_id":     self._seq,
+            }
+
+
+hub = EventHub()
+
+
+def publish(event: str, data: dict) -> int:
+    return hub.publish(event, data)
@@ -0,0 +1,251 @@
+"""
+Reading validation and bulk file loading.
+
+parse_reading() validates one reading against the per-model field map; the
+JSON ingest endpoints and the bulk loader share it. load_file() streams a
+CSV or Parquet file in chunks, inserts each chunk with one executemany
+INSERT, folds it into the rollups and commits, so memory stays flat for
+multi-million-row files. Affected areas are rescored once at the end.
+
+Parquet support needs the optional `pyarrow` package.
+"""
+import csv
+import io
+import math
+import os
+from datetime import datetime, timezone
+from itertools import islice
+from time import perf_counter
+
+from sqlalchemy import insert, select
+
+from cache import READINGS, bump
+from extensions import db
+from models import Area, DiseaseCase, WaterQuality, WeatherData
+from risk_refresh import refresh_risk
+from rollups import update_rollups
+
+BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "5000"))
+MAX_ERRORS = 50   # row errors echoed back; the rest are only counted
+
+
+def _as_bool(value) -> bool:
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in ("1", "true", "yes", "y", "t"):
+            return True
+        if lowered in ("0", "false", "no", "n", "f"):
+            return False
+        raise ValueError(value)
+    return bool(value)
+
+
+WATER_FIELDS   = {"ph": float, "turbidity": float, "hardness": float, "chloramines": float,
+                  "conductivity": float, "organic_carbon": float, "trihalomethanes": float}
+WEATHER_FIELDS = {"rainfall_mm": float, "temperature": float, "humidity": float, "flood_risk": _as_bool}
+DISEASE_FIELDS = {"disease": str, "total_cases": int, "active_cases": int,
+                  "recovered": int, "deaths": int}
+
+# Inclusive (low, high) bounds; None is open-ended. Temperature is unbounded.
+RANGES = {
+    "ph": (0, 14), "turbidity": (0, None), "hardness": (0, None), "chloramines": (0, None),
+    "conductivity": (0, None), "organic_carbon": (0, None), "trihalomethanes": (0, None),
+    "rainfall_mm": (0, None), "humidity": (0, 100),
+    "total_cases": (0, None), "active_cases": (0, None), "recovered": (0, None), "deaths": (0, None),
+}
+
+REQUIRED = {
+    WaterQuality: tuple(WATER_FIELDS),
+    WeatherData:  ("rainfall_mm",),
+    DiseaseCase:  ("disease", "total_cases", "active_cases"),
+}
+
+# URL / CLI name → (model, field map)
+KINDS = {
+    "water-quality": (WaterQuality, WATER_FIELDS),
+    "weather":       (WeatherData,  WEATHER_FIELDS),
+    "disease-cases": (DiseaseCase,  DISEASE_FIELDS),
+}
+
+
+def _blank(value) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _column_default(model, name: str):
+    default = model.__table__.c[name].default
+    return default.arg if default is not None and default.is_scalar else None
+
+
+def parse_reading(model, fields: dict, data: dict) -> dict:
+    """
+    Validate a reading against `fields`; raises ValueError with a client-facing
+    message. Every field is present in the result, blanks as the column default
+    (or None), so parsed rows share one key set for executemany.
+    """
+    area = "" if data.get("area") is None else str(data["area"]).strip()
+    if not area:
+        raise ValueError("area required")
+    missing = [f for f in REQUIRED[model] if _blank(data.get(f))]
+    if missing:
+        raise ValueError(f"missing fields: {', '.join(missing)}")
+
+    values = {"area": area}
+    for name, cast in fields.items():
+        if _blank(data.get(name)):
+            values[name] = _column_default(model, name)
+            continue
+        try:
+            values[name] = cast(data[name])
+        except (TypeError, ValueError):
+            raise ValueError(f"invalid value for {name}: {data[name]!r}")
+        if isinstance(values[name], float) and not math.isfinite(values[name]):
+            raise ValueError(f"invalid value for {name}: {data[name]!r}")
+        low, high = RANGES.get(name, (None, None))
+        if (low is not None and values[name] < low) or (high is not None and values[name] > high):
+            bounds = f"between {low} and {high}" if high is not None else f"at least {low}"
+            raise ValueError(f"{name} must be {bounds}, got {data[name]!r}")
+    if model is DiseaseCase and values["active_cases"] > values["total_cases"]:   # both required
+        raise ValueError("active_cases cannot exceed total_cases")
+
+    recorded_at = data.get("recorded_at")
+    if not isinstance(recorded_at, datetime) and not _blank(recorded_at):
+        try:
+            recorded_at = datetime.fromisoformat(str(recorded_at))
+        except ValueError:
+            raise ValueError("recorded_at must be an ISO-8601 timestamp")
+    if isinstance(recorded_at, datetime):
+        # Stored as naive UTC, like every other timestamp in the database.
+        if recorded_at.tzinfo is not None:
+            recorded_at = recorded_at.astimezone(timezone.utc).replace(tzinfo=None)
+        values["recorded_at"] = recorded_at
+    return values
+
+
+# ─────────── readers: yield (row_number, dict) ──────────────────────────────────
+
+def read_csv(stream):
+    """`stream` may be text or binary; a UTF-8 BOM is tolerated."""
+    if not isinstance(stream, io.TextIOBase):
+        stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    for line, row in enumerate(csv.DictReader(stream), start=2):   # line 1 is the header
+        yield line, row
+
+
+def read_parquet(stream, batch_size: int = BATCH_SIZE):
+    """`stream` must be a path or a seekable binary file."""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Parquet ingestion requires the pyarrow package")
+    n = 0
+    for batch in pq.ParquetFile(stream).iter_batches(batch_size=batch_size):
+        for row in batch.to_pylist():
+            n += 1
+            yield n, row
+
+
+READERS = {"csv": read_csv, "parquet": read_parquet}
+
+
+def detect_format(filename: str, content_type: str = "") -> str:
+    name = (filename or "").lower()
+    if name.endswith((".parquet", ".pq")) or "parquet" in (content_type or ""):
+        return "parquet"
+    return "csv"
+
+
+# ─────────── loader ─────────────────────────────────────────────────────────────
+
+def _area_ids(names, known: dict) -> dict:
+    """Resolve area names to ids, creating unknown areas."""
+    for name in names - known.keys():
+        known[name] = Area.get_or_create(name).id
+    return known
+
+
+def _rescore(stats: dict, affected: set, refresh: bool):
+    """Invalidate reading caches and rescore the areas of the committed batches."""
+    if stats["inserted"]:
+        bump(READINGS)
+        if refresh:
+            updated, timings = refresh_risk(sorted(affected))
+            stats["risk_refresh"] = {"updated": len(updated), "timings_ms": timings}
+
+
+def load_rows(kind: str, rows, batch_size: int = BATCH_SIZE, refresh: bool = True) -> dict:
+    """
+    Validate and insert (row_number, dict) pairs for `kind`, one transaction
+    per `batch_size` rows. Invalid rows are skipped and reported. On a fatal
+    error (a database error, an unreadable file) the failing batch is rolled
+    back, the batches committed before it stay loaded and are rescored, and
+    the error is re-raised. Returns run statistics, including rows/sec and
+    the risk refresh of affected areas.
+    """
+    model, fields = KINDS[kind]
+    started  = perf_counter()
+    known    = dict(db.session.execute(select(Area.name, Area.id)).all())
+    affected = set()
+    stats    = {"kind": kind, "rows": 0, "inserted": 0, "rejected": 0, "batches": 0, "errors": []}
+
+    rows = iter(rows)
+    try:
+        while True:
+            chunk = list(islice(rows, batch_size))
+            if not chunk:
+                break
+            stats["rows"] += len(chunk)
+
+            parsed = []
+            for number, raw in chunk:
+                try:
+                    parsed.append(parse_reading(model, fields, raw))
+                except ValueError as e:
+                    stats["rejected"] += 1
+                    if len(stats["errors"]) < MAX_ERRORS:
+                        stats["errors"].append({"row": number, "error": str(e)})
+            if not parsed:
+                continue
+
+            _area_ids({p["area"] for p in parsed}, known)
+            now = datetime.utcnow()
+            batch_areas = set()
+            for p in parsed:
+                area = p.pop("area")
+                batch_areas.add(area)
+                p["area_id"] = known[area]
+                p.setdefault("recorded_at", now)
+
+            db.session.execute(insert(model.__table__), parsed)
+            update_rollups(model, parsed)
+            db.session.commit()
+            affected |= batch_areas
+            stats["inserted"] += len(parsed)
+            stats["batches"]  += 1
+    except Exception:
+        db.session.rollback()
+        _rescore(stats, affected, refresh)
+        raise
+
+    load_seconds = perf_counter() - started
+    stats["areas"]        = len(affected)
+    stats["seconds"]      = round(load_seconds, 3)
+    stats["rows_per_sec"] = round(stats["rows"] / load_seconds) if load_seconds else stats["rows"]
+    _rescore(stats, affected, refresh)
+    return stats
+
+
+def load_file(kind: str, stream, fmt: str = "csv", batch_size: int = BATCH_SIZE, refresh: bool = True) -> dict:
+    """Stream a CSV / Parquet file (path or file object) into the `kind` table."""
+    if kind not in KINDS:
+        raise ValueError(f"unknown kind {kind!r}; expected one of {', '.join(KINDS)}")
+    if fmt not in READERS:
+        raise ValueError(f"unknown format {fmt!r}; expected csv or parquet")
+    if fmt == "csv" and isinstance(stream, (str, os.PathLike)):
+        with open(stream, newline="", encoding="utf-8-sig") as f:
+            stats = load_rows(kind, read_csv(f), batch_size, refresh)
+    else:
+        reader = read_parquet(stream, batch_size) if fmt == "parquet" else read_csv(stream)
+        stats = load_rows(kind, reader, batch_size, refresh)
+    stats["format"] = fmt
+    return stats
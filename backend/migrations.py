@@ -0,0 +1,117 @@
+"""
+In-place upgrade of databases created before the areas table.
+
+    flask --app app migrate-db
+
+Older databases store the area name on every reading row and have no
+alerts.archived_at. db.create_all() only adds missing tables, so booting the
+current models on such a file fails with "no such column". migrate() keeps
+every existing row and:
+
+  * fills `areas` from the distinct area names in the readings and risk rows,
+  * adds area_id to water_quality / weather_data / disease_cases, backfills
+    it from the name, and drops the old name column,
+  * adds alerts.archived_at,
+  * widens counters.value to BIGINT on Postgres (SQLite integers are
+    already 64-bit),
+  * creates the tables and indexes the old schema lacks,
+  * gives every area a RiskLevel row, then rebuilds the rollups and the
+    unread-alert counter.
+
+The column changes use plain ALTER TABLE, which SQLite (3.35+) and Postgres
+both support. Each run only applies the steps still pending, so it is safe
+to run again.
+"""
+from datetime import datetime
+
+from sqlalchemy import BigInteger, inspect, insert, literal, select, text
+
+READING_TABLES = ("water_quality", "weather_data", "disease_cases")
+
+
+def pending(engine) -> list:
+    """Human-readable upgrade steps this database still needs; empty when current."""
+    insp   = inspect(engine)
+    tables = set(insp.get_table_names())
+    steps  = []
+    for table in READING_TABLES:
+        if table in tables and "area_id" not in {c["name"] for c in insp.get_columns(table)}:
+            steps.append(f"{table}: replace the area name column with area_id")
+    if "alerts" in tables and "archived_at" not in {c["name"] for c in insp.get_columns("alerts")}:
+        steps.append("alerts: add archived_at")
+    if engine.dialect.name == "postgresql" and "counters" in tables:
+        value = next(c for c in insp.get_columns("counters") if c["name"] == "value")
+        if not isinstance(value["type"], BigInteger):
+            steps.append("counters: widen value to BIGINT")
+    return steps
+
+
+def upgrade_message(steps: list) -> str:
+    return ("Database schema is older than the code (" + "; ".join(steps) + "). "
+            "Back up the database file, then run `flask --app app migrate-db`.")
+
+
+def _move_to_area_id(conn, table: str):
+    conn.execute(text(
+        f"INSERT INTO areas (name) SELECT DISTINCT area FROM {table} "
+        f"WHERE area NOT IN (SELECT name FROM areas)"
+    ))
+    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN area_id INTEGER REFERENCES areas(id)"))
+    conn.execute(text(
+        f"UPDATE {table} SET area_id = (SELECT id FROM areas WHERE areas.name = {table}.area)"
+    ))
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN area_id SET NOT NULL"))
+    conn.execute(text(f"ALTER TABLE {table} DROP COLUMN area"))
+
+
+def create_missing_indexes(conn, metadata):
+    """create_all() skips indexes added to tables that already exist."""
+    insp = inspect(conn)
+    for table in metadata.sorted_tables:
+        existing = {i["name"] for i in insp.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(conn)
+
+
+def migrate() -> list:
+    """Apply the pending steps (see module docstring). Returns the steps applied."""
+    from alerting import recount_unread
+    from cache import ALERTS, READINGS, RISK, bump
+    from extensions import db
+    from models import Alert, Area, RiskLevel
+    from rollups import rebuild_rollups
+
+    engine = db.engine
+    steps  = pending(engine)
+    db.create_all()   # new tables only; existing ones are altered below
+    with engine.begin() as conn:
+        tables = set(inspect(conn).get_table_names())
+        if "risk_levels" in tables:
+            conn.execute(text("INSERT INTO areas (name) SELECT area FROM risk_levels "
+                              "WHERE area NOT IN (SELECT name FROM areas)"))
+        for table in READING_TABLES:
+            if any(s.startswith(f"{table}:") for s in steps):
+                _move_to_area_id(conn, table)
+        if "alerts: add archived_at" in steps:
+            column_type = Alert.__table__.c.archived_at.type.compile(dialect=conn.dialect)
+            conn.execute(text(f"ALTER TABLE alerts ADD COLUMN archived_at {column_type}"))
+        if "counters: widen value to BIGINT" in steps:
+            # int4 overflows on unix-second heartbeats in 2038.
+            conn.execute(text("ALTER TABLE counters ALTER COLUMN value TYPE BIGINT"))
+        create_missing_indexes(conn, db.metadata)
+
+    db.session.execute(
+        insert(RiskLevel).from_select(
+            ["area", "score", "level", "updated_at"],
+            select(Area.name, literal(0.0), literal("Low"), literal(datetime.utcnow()))
+            .where(Area.name.not_in(select(RiskLevel.area))),
+        )
+    )
+    if steps:
+        rebuild_rollups()
+    recount_unread()
+    db.session.commit()
+    bump(READINGS, RISK, ALERTS)
+    return steps
@@ -1,11 +1,55 @@
 from extensions import db
 from datetime import datetime
+from sqlalchemy import func, select
+from sqlalchemy.orm import contains_eager, declared_attr
 
 
-class WaterQuality(db.Model):
+class Area(db.Model):
+    __tablename__ = "areas"
+    id            = db.Column(db.Integer, primary_key=True)
+    name          = db.Column(db.String(100), nullable=False, unique=True)
+
+    @classmethod
+    def get_or_create(cls, name: str) -> "Area":
+        """New areas also get a RiskLevel row, so the refresh scores them."""
+        area = cls.query.filter_by(name=name).first()
+        if area is None:
+            area = cls(name=name)
+            db.session.add(area)
+            if db.session.scalar(select(RiskLevel.id).where(RiskLevel.area == name)) is None:
+                db.session.add(RiskLevel(area=name))
+            db.session.flush()
+        return area
+
+
+def _area_recorded_index(table: str):
+    # Newest-first per area: serves both "latest reading" and range scans.
+    return db.Index(f"ix_{table}_area_recorded", "area_id",
+                    db.text("recorded_at DESC"), db.text("id DESC"))
+
+
+def _recorded_index(table: str):
+    # Newest-first across all areas: the unfiltered keyset feed.
+    return db.Index(f"ix_{table}_recorded", db.text("recorded_at DESC"), db.text("id DESC"))
+
+
+class AreaReadingMixin:
+    """Time-series rows keyed by an Area FK; `area` resolves to the area name."""
+    area_id       = db.Column(db.Integer, db.ForeignKey("areas.id"), nullable=False)
+
+    @declared_attr
+    def area_ref(cls):
+        return db.relationship(Area, lazy="joined", innerjoin=True)
+
+    @property
+    def area(self) -> str:
+        return self.area_ref.name
+
+
+class WaterQuality(AreaReadingMixin, db.Model):
     __tablename__ = "water_quality"
+    __table_args__ = (_area_recorded_index("water_quality"), _recorded_index("water_quality"))
     id            = db.Column(db.Integer, primary_key=True)
-    area          = db.Column(db.String(100), nullable=False)
     ph            = db.Column(db.Float, nullable=False)
     turbidity     = db.Column(db.Float, nullable=False)   # NTU
     hardness      = db.Column(db.Float, nullable=False)   # mg/L
@@ -27,10 +71,10 @@ class WaterQuality(db.Model):
         }
 
 
-class WeatherData(db.Model):
+class WeatherData(AreaReadingMixin, db.Model):
     __tablename__ = "weather_data"
+    __table_args__ = (_area_recorded_index("weather_data"), _recorded_index("weather_data"))
     id            = db.Column(db.Integer, primary_key=True)
-    area          = db.Column(db.String(100), nullable=False)
     rainfall_mm   = db.Column(db.Float, default=0.0)
     temperature   = db.Column(db.Float, default=25.0)   # °C
     humidity      = db.Column(db.Float, default=60.0)   # %
@@ -48,11 +92,11 @@ class WeatherData(db.Model):
         }
 
 
-class DiseaseCase(db.Model):
+class DiseaseCase(AreaReadingMixin, db.Model):
     __tablename__ = "disease_cases"
+    __table_args__ = (_area_recorded_index("disease_cases"),)
     id            = db.Column(db.Integer, primary_key=True)
     disease       = db.Column(db.String(100), nullable=False)
-    area          = db.Column(db.String(100), nullable=False)
     total_cases   = db.Column(db.Integer, default=0)
     active_cases  = db.Column(db.Integer, default=0)
     recovered     = db.Column(db.Integer, default=0)
@@ -89,12 +133,21 @@ class RiskLevel(db.Model):
 
 class Alert(db.Model):
     __tablename__ = "alerts"
+    __table_args__ = (
+        # Unsent/sent feeds filtered by severity, newest first.
+        db.Index("ix_alerts_sent_severity_created", "is_sent", "severity", "created_at"),
+        db.Index("ix_alerts_created", "created_at"),
+        db.Index("ix_alerts_archived", "archived_at"),
+        # Suppression lookup: newest alert per (area, level).
+        db.Index("ix_alerts_area_severity_created", "area", "severity", "created_at"),
+    )
     id            = db.Column(db.Integer, primary_key=True)
     area          = db.Column(db.String(100), nullable=False)
     message       = db.Column(db.Text, nullable=False)
     severity      = db.Column(db.String(20), default="Low")
     is_sent       = db.Column(db.Boolean, default=False)
     created_at    = db.Column(db.DateTime, default=datetime.utcnow)
+    archived_at   = db.Column(db.DateTime, nullable=True)   # hidden from feeds; pruned later
 
     def to_dict(self):
         return {
@@ -102,4 +155,186 @@ class Alert(db.Model):
             "message": self.message, "severity": self.severity,
             "is_sent": self.is_sent,
             "created_at": self.created_at.isoformat(),
+            "archived_at": self.archived_at.isoformat() if self.archived_at else None,
+        }
+
+
+class Counter(db.Model):
+    """Named counters maintained in the same transaction as the rows they count."""
+    __tablename__ = "counters"
+    name          = db.Column(db.String(50), primary_key=True)
+    value         = db.Column(db.BigInteger, nullable=False, default=0)   # also unix-second heartbeats
+
+
+def _latest_id(model):
+    # Correlated "top-1 per area" lookup: one index seek on
+    # (area_id, recorded_at DESC, id DESC) per area instead of a full scan.
+    return (
+        select(model.id)
+        .where(model.area_id == Area.id)
+        .order_by(model.recorded_at.desc(), model.id.desc())
+        .limit(1)
+        .correlate(Area)
+        .scalar_subquery()
+    )
+
+
+def _latest_query(model, areas=None):
+    q = (
+        select(model)
+        .select_from(Area)
+        .join(model, model.id == _latest_id(model))
+        .options(contains_eager(model.area_ref))
+    )
+    if areas is not None:
+        q = q.where(Area.name.in_(areas))
+    return q
+
+
+def latest_per_area(model, areas=None):
+    """
+    Newest row per area for a time-series model (WaterQuality, WeatherData,
+    DiseaseCase) in a single query. Returns {area_name: row}.
+    """
+    rows = db.session.execute(_latest_query(model, areas)).scalars()
+    return {row.area: row for row in rows}
+
+
+def latest_case_totals(areas=None):
+    """
+    Active / total cases per area, summed over the newest DiseaseCase row of
+    each disease the area tracks, in a single query. Returns
+    {area_name: row} with `active_cases` and `total_cases` attributes.
+    """
+    newest = (
+        select(DiseaseCase.area_id, DiseaseCase.active_cases, DiseaseCase.total_cases,
+               func.row_number().over(
+                   partition_by=(DiseaseCase.area_id, DiseaseCase.disease),
+                   order_by=(DiseaseCase.recorded_at.desc(), DiseaseCase.id.desc()),
+               ).label("rn"))
+        .subquery()
+    )
+    q = (
+        select(Area.name,
+               func.sum(newest.c.active_cases).label("active_cases"),
+               func.sum(newest.c.total_cases).label("total_cases"))
+        .join(newest, newest.c.area_id == Area.id)
+        .where(newest.c.rn == 1)
+        .group_by(Area.name)
+    )
+    if areas is not None:
+        q = q.where(Area.name.in_(areas))
+    return {row.name: row for row in db.session.execute(q)}
+
+
+def latest_for_area(model, area_name: str):
+    """Newest row of `model` for one area, or None."""
+    return db.session.execute(_latest_query(model, [area_name])).scalars().first()
+
+
+def area_snapshots(*criteria, order_by=None):
+    """
+    RiskLevel rows joined to the newest WaterQuality, WeatherData and
+    DiseaseCase row of each area in one statement. `criteria` filter
+    RiskLevel. Returns [(risk, water, weather, cases)]; missing readings are None.
+    """
+    q = (
+        select(RiskLevel, WaterQuality, WeatherData, DiseaseCase)
+        .outerjoin(Area,         Area.name == RiskLevel.area)
+        .outerjoin(WaterQuality, WaterQuality.id == _latest_id(WaterQuality))
+        .outerjoin(WeatherData,  WeatherData.id  == _latest_id(WeatherData))
+        .outerjoin(DiseaseCase,  DiseaseCase.id  == _latest_id(DiseaseCase))
+        .where(*criteria)
+        # Every joined reading belongs to the joined Area row, so reuse it
+        # instead of letting each reading eager-join `areas` again.
+        .options(
+            contains_eager(WaterQuality.area_ref),
+            contains_eager(WeatherData.area_ref),
+            contains_eager(DiseaseCase.area_ref),
+        )
+    )
+    if order_by is not None:
+        q = q.order_by(order_by)
+    return db.session.execute(q).all()
+
+
+def snapshot_versions(*criteria) -> dict:
+    """
+    {area: (risk updated_at, newest water / weather / case id)} — what
+    area_snapshots() would return for each area, read from the indexes alone.
+    Cheap enough to revalidate cached snapshots on every request.
+    """
+    q = (
+        select(RiskLevel.area, RiskLevel.updated_at,
+               _latest_id(WaterQuality), _latest_id(WeatherData), _latest_id(DiseaseCase))
+        .outerjoin(Area, Area.name == RiskLevel.area)
+        .where(*criteria)
+        .order_by(RiskLevel.area)
+    )
+    return {area: tuple(version) for area, *version in db.session.execute(q)}
+
+
+def snapshot_version(risk, water, weather, cases) -> tuple:
+    """The snapshot_versions() entry of one area_snapshots() row."""
+    return (risk.updated_at, *(row.id if row else None for row in (water, weather, cases)))
+
+
+class ReadingRollup(db.Model):
+    """Per-area hourly/daily min/max/sum/count of a sensor metric, maintained on ingest."""
+    __tablename__ = "reading_rollups"
+    __table_args__ = (
+        db.UniqueConstraint("area_id", "metric", "granularity", "bucket_start",
+                            name="uq_reading_rollups_bucket"),
+        db.Index("ix_reading_rollups_metric_bucket", "metric", "granularity", "bucket_start"),
+    )
+    id            = db.Column(db.Integer, primary_key=True)
+    area_id       = db.Column(db.Integer, db.ForeignKey("areas.id"), nullable=False)
+    metric        = db.Column(db.String(32), nullable=False)   # ph / turbidity / ... / rainfall_mm
+    granularity   = db.Column(db.String(8), nullable=False)    # hour / day
+    bucket_start  = db.Column(db.DateTime, nullable=False)
+    count         = db.Column(db.Integer, nullable=False, default=0)
+    min_value     = db.Column(db.Float, nullable=False)
+    max_value     = db.Column(db.Float, nullable=False)
+    total         = db.Column(db.Float, nullable=False, default=0.0)
+
+    def to_dict(self):
+        return {
+            "bucket_start": self.bucket_start.isoformat(),
+            "count": self.count,
+            "min": self.min_value, "max": self.max_value,
+            "mean": round(self.total / self.count, 3) if self.count else None,
+        }
+
+
+class OutboxMessage(db.Model):
+    """One SMS / email waiting for (or done with) delivery by the notification dispatcher."""
+    __tablename__ = "notification_outbox"
+    __table_args__ = (
+        db.Index("ix_notification_outbox_due", "status", "next_attempt_at"),
+    )
+    id            = db.Column(db.Integer, primary_key=True)
+    job_id        = db.Column(db.String(32), nullable=False, index=True)
+    channel       = db.Column(db.String(10), nullable=False)            # sms / email
+    recipient     = db.Column(db.String(255), nullable=False)
+    subject       = db.Column(db.String(255), nullable=True)
+    body          = db.Column(db.Text, nullable=False)
+    alert_id      = db.Column(db.Integer, db.ForeignKey("alerts.id", ondelete="SET NULL"), nullable=True)
+    status        = db.Column(db.String(12), default="queued")         # queued/sending/sent/failed
+    attempts      = db.Column(db.Integer, default=0)
+    last_error    = db.Column(db.Text, nullable=True)
+    provider_ref  = db.Column(db.String(64), nullable=True)             # Twilio SID etc.
+    claimed_by    = db.Column(db.String(32), nullable=True)
+    claimed_at    = db.Column(db.DateTime, nullable=True)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at    = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at       = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            "id": self.id, "job_id": self.job_id,
+            "channel": self.channel, "recipient": self.recipient,
+            "status": self.status, "attempts": self.attempts,
+            "last_error": self.last_error, "provider_ref": self.provider_ref,
+            "created_at": self.created_at.isoformat(),
+            "sent_at": self.sent_at.isoformat() if self.sent_at else None,
         }
@@ -0,0 +1,387 @@
+"""
+Asynchronous SMS / email delivery.
+
+Endpoints enqueue messages into the `notification_outbox` table and return a
+job id immediately. A per-process dispatcher thread claims due messages and
+hands them to a bounded worker pool; each provider has its own token-bucket
+rate limit, failures are retried with exponential backoff, and every message
+keeps its own status so /api/notifications/jobs/<id> can report progress.
+
+Providers: Twilio (sms), SMTP (email), and `local`, a fake that only logs and
+is selected for both channels with NOTIFY_PROVIDER=local.
+"""
+import logging
+import os
+import random
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from time import monotonic, sleep
+
+from sqlalchemy import func, insert, select, update
+
+import alerting
+from cache import ALERTS, bump
+from events import publish
+from extensions import db
+from models import Alert, OutboxMessage
+from smtp_pool import SMTPPool
+
+log = logging.getLogger(__name__)
+
+MAX_ATTEMPTS   = int(os.getenv("NOTIFY_MAX_ATTEMPTS", "5"))
+RETRY_BASE     = float(os.getenv("NOTIFY_RETRY_BASE", "2"))       # seconds
+RETRY_CAP      = float(os.getenv("NOTIFY_RETRY_CAP", "300"))
+CONCURRENCY    = int(os.getenv("NOTIFY_CONCURRENCY", "8"))
+BATCH_SIZE     = int(os.getenv("NOTIFY_BATCH_SIZE", "20"))       # messages per SMTP session
+POLL_INTERVAL  = float(os.getenv("NOTIFY_POLL_INTERVAL", "5"))
+CLAIM_TIMEOUT  = timedelta(minutes=10)   # reclaim rows left "sending" by a dead worker
+
+
+# ─────────── rate limiting ──────────────────────────────────────────────────────
+
+class TokenBucket:
+    """Blocking token bucket: `rate` sends per second with bursts up to `burst`."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate   = rate
+        self.burst  = max(burst, 1)
+        self.tokens = float(self.burst)
+        self.stamp  = monotonic()
+        self._lock  = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+                self.stamp  = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            sleep(delay)
+
+
+# ─────────── providers ──────────────────────────────────────────────────────────
+
+class TwilioSMSProvider:
+    channel = "sms"
+
+    def __init__(self):
+        self.account_sid = os.getenv("TWILIO_ACCOUNT_SID", "")
+        self.auth_token  = os.getenv("TWILIO_AUTH_TOKEN", "")
+        self.from_number = os.getenv("TWILIO_FROM") or os.getenv("TWILIO_FROM_NUMBER", "")
+        self.limiter     = TokenBucket(float(os.getenv("SMS_RATE_PER_SEC", "1")),
+                                       int(os.getenv("SMS_RATE_BURST", "1")))
+        self._client     = None
+
+    def configured(self) -> bool:
+        return bool(self.account_sid and self.auth_token and self.from_number)
+
+    def client(self):
+        if self._client is None:
+            from twilio.rest import Client
+            self._client = Client(self.account_sid, self.auth_token)
+        return self._client
+
+    def send(self, msg: dict) -> str:
+        sent = self.client().messages.create(body=msg["body"], from_=self.from_number, to=msg["recipient"])
+        return sent.sid
+
+
+class SMTPEmailProvider:
+    channel = "email"
+
+    def __init__(self):
+        self.user     = os.getenv("SMTP_USER", "")
+        self.password = os.getenv("SMTP_PASSWORD", "")
+        self.sender   = os.getenv("SMTP_FROM") or self.user
+        self.limiter  = TokenBucket(float(os.getenv("EMAIL_RATE_PER_SEC", "5")),
+                                    int(os.getenv("EMAIL_RATE_BURST", "5")))
+        self.pool     = SMTPPool(
+            host=os.getenv("SMTP_HOST", "smtp.gmail.com"),
+            port=int(os.getenv("SMTP_PORT", "587")),
+            user=self.user, password=self.password,
+            starttls=os.getenv("SMTP_STARTTLS", "1") != "0",
+            max_size=int(os.getenv("SMTP_POOL_SIZE", "4")),
+            max_idle=float(os.getenv("SMTP_MAX_IDLE", "60")),
+        )
+
+    def configured(self) -> bool:
+        # SMTP_AUTH=0 allows an unauthenticated local relay / aiosmtpd stand-in.
+        return bool(self.user and self.password) or (
+            os.getenv("SMTP_AUTH", "1") == "0" and bool(self.sender)
+        )
+
+    def _mime(self, msg: dict) -> str:
+        mime = MIMEMultipart("alternative")
+        mime["Subject"] = msg["subject"] or ""
+        mime["From"]    = self.sender
+        mime["To"]      = msg["recipient"]
+        mime.attach(MIMEText(msg["body"], "html"))
+        return mime.as_string()
+
+    def send(self, msg: dict) -> str:
+        self.pool.send(self.sender, [msg["recipient"]], self._mime(msg))
+        return ""
+
+    def send_batch(self, msgs: list) -> list:
+        """Send many messages over one pooled session; returns [(ref, error)]."""
+        for _ in msgs:
+            self.limiter.acquire()
+        errors = self.pool.send_many((self.sender, [m["recipient"]], self._mime(m)) for m in msgs)
+        return [("", None if e is None else f"{type(e).__name__}: {e}") for e in errors]
+
+
+class LocalProvider:
+    """Delivers nothing; logs each message. NOTIFY_LOCAL_FAIL_RATE exercises retries."""
+
+    def __init__(self, channel: str):
+        self.channel   = channel
+        self.fail_rate = float(os.getenv("NOTIFY_LOCAL_FAIL_RATE", "0"))
+        self.limiter   = TokenBucket(float(os.getenv("NOTIFY_LOCAL_RATE_PER_SEC", "50")), 10)
+
+    def configured(self) -> bool:
+        return True
+
+    def send(self, msg: dict) -> str:
+        if random.random() < self.fail_rate:
+            raise RuntimeError("simulated provider failure")
+        log.info("[local %s] to=%s subject=%s", self.channel, msg["recipient"], msg.get("subject"))
+        return f"local-{uuid.uuid4().hex[:12]}"
+
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+def get_provider(channel: str):
+    with _providers_lock:
+        if channel not in _providers:
+            if os.getenv("NOTIFY_PROVIDER", "") == "local":
+                _providers[channel] = LocalProvider(channel)
+            elif channel == "sms":
+                _providers[channel] = TwilioSMSProvider()
+            else:
+                _providers[channel] = SMTPEmailProvider()
+        return _providers[channel]
+
+
+def preload_providers():
+    """Build both providers and the Twilio client up front (boot preload)."""
+    for channel in ("sms", "email"):
+        provider = get_provider(channel)
+        if hasattr(provider, "client") and provider.configured():
+            provider.client()
+
+
+# ─────────── enqueue / status ───────────────────────────────────────────────────
+
+_wake = threading.Event()
+
+
+def enqueue(channel: str, messages) -> str:
+    """
+    Queue `messages` (dicts with recipient, body and optional subject /
+    alert_id) on `channel` as one job. Commits and returns the job id.
+    """
+    job_id = uuid.uuid4().hex
+    now    = datetime.utcnow()
+    rows   = [{
+        "job_id": job_id, "channel": channel,
+        "recipient": m["recipient"], "subject": m.get("subject"), "body": m["body"],
+        "alert_id": m.get("alert_id"), "status": "queued", "attempts": 0,
+        "next_attempt_at": now, "created_at": now,
+    } for m in messages]
+    if rows:
+        db.session.execute(insert(OutboxMessage), rows)
+    db.session.commit()
+    _wake.set()
+    return job_id
+
+
+def job_status(job_id: str, include_messages: bool = True):
+    """Progress of a job, or None if the id is unknown."""
+    counts = dict(db.session.execute(
+        select(OutboxMessage.status, func.count())
+        .where(OutboxMessage.job_id == job_id)
+        .group_by(OutboxMessage.status)
+    ).all())
+    total = sum(counts.values())
+    if not total:
+        return None
+
+    done = counts.get("sent", 0) + counts.get("failed", 0)
+    status = {
+        "job_id":  job_id,
+        "total":   total,
+        "queued":  counts.get("queued", 0),
+        "sending": counts.get("sending", 0),
+        "sent":    counts.get("sent", 0),
+        "failed":  counts.get("failed", 0),
+        "done":    done == total,
+        "progress": round(done / total * 100, 1),
+    }
+    if include_messages:
+        rows = OutboxMessage.query.filter_by(job_id=job_id).order_by(OutboxMessage.id).all()
+        status["messages"] = [r.to_dict() for r in rows]
+    return status
+
+
+# ─────────── dispatcher ─────────────────────────────────────────────────────────
+
+def _claim(limit: int) -> list:
+    """
+    Atomically mark up to `limit` due messages as ours; safe across worker
+    processes. The due predicate is repeated in the outer WHERE: under
+    Postgres READ COMMITTED, a row another dispatcher claimed after our
+    subquery ran is re-checked against its new status and skipped, not
+    claimed twice. On Postgres the subquery also locks with SKIP LOCKED so
+    concurrent dispatchers pick disjoint rows instead of queueing on each
+    other; SQLite serialises writers and ignores the clause.
+    """
+    now   = datetime.utcnow()
+    token = uuid.uuid4().hex
+    is_due = (
+        ((OutboxMessage.status == "queued") & (OutboxMessage.next_attempt_at <= now)) |
+        ((OutboxMessage.status == "sending") & (OutboxMessage.claimed_at < now - CLAIM_TIMEOUT))
+    )
+    due = (
+        select(OutboxMessage.id)
+        .where(is_due)
+        .order_by(OutboxMessage.next_attempt_at, OutboxMessage.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    db.session.execute(
+        update(OutboxMessage)
+        .where(OutboxMessage.id.in_(due), is_due)
+        .values(status="sending", claimed_by=token, claimed_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    rows = db.session.execute(
+        select(OutboxMessage.id, OutboxMessage.channel, OutboxMessage.recipient,
+               OutboxMessage.subject, OutboxMessage.body, OutboxMessage.alert_id,
+               OutboxMessage.attempts, OutboxMessage.claimed_by)
+        .where(OutboxMessage.claimed_by == token, OutboxMessage.status == "sending")
+    ).all()
+    return [r._asdict() for r in rows]
+
+
+def _backoff(attempts: int) -> float:
+    delay = min(RETRY_CAP, RETRY_BASE * (2 ** (attempts - 1)))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def _record(outcomes):
+    """Persist [(msg, ref, error)] in one transaction."""
+    now = datetime.utcnow()
+    delivered_alerts = []
+    for msg, ref, error in outcomes:
+        attempts = msg["attempts"] + 1
+        if error is None:
+            values = {"status": "sent", "provider_ref": ref, "sent_at": now, "last_error": None}
+            if msg["alert_id"]:
+                delivered_alerts.append(msg["alert_id"])
+        elif attempts >= MAX_ATTEMPTS:
+            values = {"status": "failed", "last_error": error}
+        else:
+            values = {"status": "queued", "last_error": error,
+                      "next_attempt_at": now + timedelta(seconds=_backoff(attempts))}
+        # Only while the claim is still ours: a dispatcher that took longer
+        # than CLAIM_TIMEOUT may have lost the row to another one.
+        db.session.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id == msg["id"], OutboxMessage.claimed_by == msg["claimed_by"])
+            .values(attempts=attempts, claimed_by=None, **values)
+        )
+
+    if delivered_alerts:
+        delivered_alerts = alerting.mark_sent(Alert.id.in_(delivered_alerts))
+    db.session.commit()
+    if delivered_alerts:
+        bump(ALERTS)
+        publish("alert.sent", {"ids": delivered_alerts})
+
+
+def _deliver(app, msgs: list):
+    """Deliver messages of one channel; batches go over a single provider session when supported."""
+    provider = get_provider(msgs[0]["channel"])
+    if len(msgs) > 1 and hasattr(provider, "send_batch"):
+        try:
+            results = provider.send_batch(msgs)
+        except Exception as e:
+            results = [(None, f"{type(e).__name__}: {e}")] * len(msgs)
+    else:
+        results = []
+        for msg in msgs:
+            try:
+                provider.limiter.acquire()
+                results.append((provider.send(msg), None))
+            except Exception as e:
+                results.append((None, f"{type(e).__name__}: {e}"))
+
+    outcomes = [(msg, ref, error) for msg, (ref, error) in zip(msgs, results)]
+    for msg, _, error in outcomes:
+        if error:
+            log.warning("delivery of outbox message %s failed: %s", msg["id"], error)
+
+    with app.app_context():
+        try:
+            _record(outcomes)
+        finally:
+            db.session.remove()
+
+
+def _work_units(batch: list) -> list:
+    """Split claimed messages into per-channel delivery units (email in BATCH_SIZE chunks)."""
+    units = []
+    for channel in sorted({m["channel"] for m in batch}):
+        msgs = [m for m in batch if m["channel"] == channel]
+        size = BATCH_SIZE if hasattr(get_provider(channel), "send_batch") else 1
+        units.extend(msgs[i:i + size] for i in range(0, len(msgs), size))
+    return units
+
+
+def dispatch_once(app, pool) -> int:
+    """Claim one batch of due messages and deliver it on `pool`. Returns the number claimed."""
+    with app.app_context():
+        try:
+            batch = _claim(CONCURRENCY * 4)
+        finally:
+            db.session.remove()
+    if batch:
+        wait([pool.submit(_deliver, app, unit) for unit in _work_units(batch)])
+    return len(batch)
+
+
+def _run(app):
+    pool = ThreadPoolExecutor(max_workers=CONCURRENCY, thread_name_prefix="notify")
+    while True:
+        _wake.wait(POLL_INTERVAL)
+        _wake.clear()
+        try:
+            claimed = dispatch_once(app, pool)
+        except Exception:
+            log.exception("claiming outbox messages failed")
+            continue
+        if claimed:
+            _wake.set()   # a full batch may mean more is due; loop again without waiting
+
+
+_thread = None
+
+
+def start_dispatcher(app):
+    """Start the per-process dispatcher thread (idempotent)."""
+    global _thread
+    if _thread is not None:
+        return
+    _thread = threading.Thread(target=_run, args=(app,), name="notify-dispatcher", daemon=True)
+    _thread.start()
@@ -0,0 +1,56 @@
+"""
+Background warm-up of the optional SDKs.
+
+google.generativeai and twilio take long to import, and without a preload
+the first chat question or SMS in each worker pays that cost inside a
+request. start_preload() imports them and builds the clients on a daemon
+thread, once per process. Only configured integrations are loaded, and a
+missing package is logged and left to the request path, which already falls
+back to the keyword answers / outbox retry.
+"""
+import logging
+import threading
+from time import perf_counter
+
+log = logging.getLogger(__name__)
+
+timings = {}   # step → seconds, or the error text for a step that failed
+
+_thread = None
+
+
+def _step(name: str, fn):
+    start = perf_counter()
+    try:
+        fn()
+    except Exception as e:   # ImportError, bad credentials: leave it to first use
+        timings[name] = f"{type(e).__name__}: {e}"
+        log.warning("preload %s failed: %s", name, e)
+    else:
+        timings[name] = round(perf_counter() - start, 3)
+
+
+def _run():
+    from notifications import preload_providers
+    from routes.chatbot import preload as preload_chatbot
+
+    _step("chatbot", preload_chatbot)
+    _step("notifications", preload_providers)
+    log.info("SDK preload finished: %s", timings)
+
+
+def start_preload():
+    """Start the per-process preload thread (idempotent)."""
+    global _thread
+    if _thread is not None:
+        return
+    _thread = threading.Thread(target=_run, name="sdk-preload", daemon=True)
+    _thread.start()
+
+
+def wait(timeout: float = None) -> bool:
+    """Block until the preload finished; True when it did within `timeout`."""
+    if _thread is None:
+        return True
+    _thread.join(timeout)
+    return not _thread.is_alive()
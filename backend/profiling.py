@@ -0,0 +1,219 @@
+"""
+Opt-in request profiling and Prometheus metrics (PROFILING=1).
+
+For every request this records wall time, the number of SQL statements and
+the time spent in them (SQLAlchemy cursor events), plus named code sections
+wrapped in timed() — risk scoring and report rendering. Everything is
+exported as endpoint-labelled histograms at GET /metrics in the Prometheus
+text format, and summarised per response in a Server-Timing header.
+
+Sending `X-Profile: 1` runs that single request under cProfile and writes
+the stats to PROFILE_DIR; the file name comes back in `X-Profile-File`.
+`X-Profile: pyinstrument` writes an HTML report instead when pyinstrument is
+installed. Dumps cost time and disk, so they need PROFILE_TOKEN: the header
+must be `<token>` or `<token>:pyinstrument`, and without a token X-Profile is
+ignored.
+
+When profiling is off, timed() is a no-op and no hooks are installed.
+"""
+import bisect
+import hmac
+import os
+import tempfile
+import threading
+import uuid
+from contextlib import contextmanager, nullcontext
+from time import perf_counter
+
+from flask import Response, g, has_request_context, request
+
+ENABLED = False
+
+PROFILE_DIR   = os.getenv("PROFILE_DIR") or os.path.join(tempfile.gettempdir(), "jalraksha-profiles")
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
+
+TIME_BUCKETS  = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels, rendered in Prometheus text format."""
+
+    def __init__(self, name: str, help_text: str, labels: tuple, buckets: tuple):
+        self.name, self.help, self.labels, self.buckets = name, help_text, labels, buckets
+        self._series = {}   # label values -> [bucket counts..., +Inf count, sum]
+        self._lock   = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += value
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._series.items()]
+        for label_values, series in sorted(items):
+            base = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, label_values))
+            sep  = "," if base else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{base}{sep}le="{bound}"}} {cumulative}')
+            cumulative += series[len(self.buckets)]
+            lines.append(f'{self.name}_bucket{{{base}{sep}le="+Inf"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{base}}} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{{{base}}} {cumulative}")
+        return lines
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_SECONDS = Histogram("jalraksha_request_duration_seconds", "Request wall time.",
+                            ("endpoint", "method", "status"), TIME_BUCKETS)
+SQL_QUERIES     = Histogram("jalraksha_request_sql_queries", "SQL statements per request.",
+                            ("endpoint",), COUNT_BUCKETS)
+SQL_SECONDS     = Histogram("jalraksha_request_sql_seconds", "Time spent in SQL per request.",
+                            ("endpoint",), TIME_BUCKETS)
+SECTION_SECONDS = Histogram("jalraksha_section_duration_seconds", "Time spent in instrumented code sections.",
+                            ("section", "endpoint"), TIME_BUCKETS)
+HISTOGRAMS = (REQUEST_SECONDS, SQL_QUERIES, SQL_SECONDS, SECTION_SECONDS)
+
+
+def _endpoint() -> str:
+    if has_request_context():
+        return request.url_rule.rule if request.url_rule else "unmatched"
+    return "background"
+
+
+@contextmanager
+def _timed(name: str):
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = perf_counter() - start
+        SECTION_SECONDS.observe(elapsed, name, _endpoint())
+        if has_request_context() and "prof" in g:
+            g.prof["sections"][name] = g.prof["sections"].get(name, 0.0) + elapsed
+
+
+def timed(name: str):
+    """Context manager timing a code section; free when profiling is off."""
+    return _timed(name) if ENABLED else nullcontext()
+
+
+# ─────────── SQL hooks ──────────────────────────────────────────────────────────
+
+def _before_cursor(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("prof_start", []).append(perf_counter())
+
+
+def _after_cursor(conn, cursor, statement, parameters, context, executemany):
+    stack = conn.info.get("prof_start")
+    if not stack:
+        return
+    elapsed = perf_counter() - stack.pop()
+    if has_request_context() and "prof" in g:
+        g.prof["queries"] += 1
+        g.prof["sql"] += elapsed
+
+
+# ─────────── request hooks ──────────────────────────────────────────────────────
+
+def _profile_mode():
+    value = request.headers.get("X-Profile")
+    if not value or not PROFILE_TOKEN:
+        return None
+    token, _, mode = value.partition(":")
+    return (mode or "cprofile") if hmac.compare_digest(token, PROFILE_TOKEN) else None
+
+
+def _start_request():
+    g.prof = {"start": perf_counter(), "queries": 0, "sql": 0.0, "sections": {}, "profiler": None}
+    mode = _profile_mode()
+    if mode == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            mode = "cprofile"
+        else:
+            profiler = Profiler()
+            profiler.start()
+            g.prof["profiler"] = ("pyinstrument", profiler)
+    if mode == "cprofile":
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        g.prof["profiler"] = ("cprofile", profiler)
+
+
+def _dump_profile(kind: str, profiler) -> str:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stem = f"{request.method}-{request.path.strip('/').replace('/', '_') or 'root'}-{uuid.uuid4().hex[:8]}"
+    if kind == "pyinstrument":
+        profiler.stop()
+        path = os.path.join(PROFILE_DIR, f"{stem}.html")
+        with open(path, "w") as f:
+            f.write(profiler.output_html())
+    else:
+        profiler.disable()
+        path = os.path.join(PROFILE_DIR, f"{stem}.prof")
+        profiler.dump_stats(path)
+    return path
+
+
+def _finish_request(response):
+    prof = g.pop("prof", None)
+    if prof is None:
+        return response
+    if prof["profiler"]:
+        response.headers["X-Profile-File"] = os.path.basename(_dump_profile(*prof["profiler"]))
+
+    wall     = perf_counter() - prof["start"]
+    endpoint = _endpoint()
+    REQUEST_SECONDS.observe(wall, endpoint, request.method, str(response.status_code))
+    SQL_QUERIES.observe(prof["queries"], endpoint)
+    SQL_SECONDS.observe(prof["sql"], endpoint)
+
+    timing = [f"app;dur={wall * 1000:.1f}",
+              f'db;dur={prof["sql"] * 1000:.1f};desc="{prof["queries"]} queries"']
+    timing += [f"{name};dur={secs * 1000:.1f}" for name, secs in prof["sections"].items()]
+    response.headers["Server-Timing"] = ", ".join(timing)
+    return response
+
+
+def metrics_text() -> str:
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    return "\n".join(lines) + "\n"
+
+
+def init_app(app):
+    """Install the request / SQL hooks and the /metrics route on `app`."""
+    global ENABLED
+    ENABLED = True
+
+    from sqlalchemy import event
+    from extensions import db
+    with app.app_context():
+        # Every bind, so reads routed to a replica are counted too.
+        for engine in db.engines.values():
+            event.listen(engine, "before_cursor_execute", _before_cursor)
+            event.listen(engine, "after_cursor_execute", _after_cursor)
+
+    if not PROFILE_TOKEN:
+        app.logger.warning("PROFILE_TOKEN is not set; X-Profile dumps are disabled")
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+
+    @app.route("/metrics")
+    def metrics():
+        return Response(metrics_text(), mimetype="text/plain; version=0.0.4")
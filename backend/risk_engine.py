@@ -4,6 +4,9 @@ Score range: 0 – 100
 Thresholds: Low <25 | Medium 25-50 | High 50-75 | Critical >75
 """
 
+from array import array
+from bisect import bisect_left, bisect_right
+
 WEIGHTS = {
     "turbidity":   0.30,
     "ph":          0.20,
@@ -76,3 +79,92 @@ def calculate_risk(water: dict, weather: dict, disease_summary: dict) -> dict:
             "case_spike_score": round(c_score, 1),
         },
     }
+
+
+# ─────────── batch scoring ──────────────────────────────────────────────────────
+# Columnar equivalent of calculate_risk for ward/sensor-level volumes. Each
+# ladder above is expressed as a sorted threshold table plus a score table, and
+# rows are scored with a binary-search lookup (bisect, i.e. searchsorted)
+# instead of per-row if/elif chains. Inputs are any indexable sequences of equal
+# length (list, array.array, NumPy arrays); outputs are array.array columns.
+
+# bisect_left  → value <= bound falls in that bucket
+# bisect_right → value <  bound falls in that bucket
+TURBIDITY_BOUNDS = (1, 4, 10, 25)
+TURBIDITY_SCORES = (0, 20, 50, 75, 100)
+
+PH_LOW_BOUNDS    = (5.5, 6.0, 6.5)          # bisect_right: ph >= bound
+PH_LOW_SCORES    = (100, 60, 30, 0)
+PH_HIGH_BOUNDS   = (8.5, 9.0, 9.5)          # bisect_left:  ph >  bound
+PH_HIGH_SCORES   = (0, 30, 60, 100)
+
+RAINFALL_BOUNDS  = (0, 10, 50, 100)
+RAINFALL_SCORES  = (15, 15, 45, 70, 100)    # mm == 0 is masked to 0 separately
+
+CASE_SPIKE_BOUNDS = (0.1, 0.2, 0.35, 0.5)
+CASE_SPIKE_SCORES = (0, 25, 50, 75, 100)
+
+LEVEL_BOUNDS = (25, 50, 75)
+LEVELS       = ("Low", "Medium", "High", "Critical")
+
+
+def score_turbidity_batch(ntu) -> array:
+    return array("d", (TURBIDITY_SCORES[bisect_left(TURBIDITY_BOUNDS, v)] for v in ntu))
+
+
+def score_ph_batch(ph) -> array:
+    # Both tails are looked up independently; the in-range side scores 0.
+    return array("d", (
+        max(PH_LOW_SCORES[bisect_right(PH_LOW_BOUNDS, v)],
+            PH_HIGH_SCORES[bisect_left(PH_HIGH_BOUNDS, v)])
+        for v in ph
+    ))
+
+
+def score_rainfall_batch(mm) -> array:
+    return array("d", (
+        RAINFALL_SCORES[bisect_left(RAINFALL_BOUNDS, v)] * (v != 0)
+        for v in mm
+    ))
+
+
+def score_case_spike_batch(active, total) -> array:
+    return array("d", (
+        CASE_SPIKE_SCORES[bisect_right(CASE_SPIKE_BOUNDS, a / t)] if t else 0
+        for a, t in zip(active, total)
+    ))
+
+
+def calculate_risk_batch(turbidity, ph, rainfall_mm, active_cases, total_cases) -> dict:
+    """
+    Score many areas at once. All arguments are equal-length columns.
+    Returns {"score": array, "level": list, "breakdown": {<name>: array}} where
+    row i matches calculate_risk() for the same inputs.
+    """
+    n = len(turbidity)
+    if not (len(ph) == len(rainfall_mm) == len(active_cases) == len(total_cases) == n):
+        raise ValueError("calculate_risk_batch: all input columns must have the same length")
+
+    t_scores  = score_turbidity_batch(turbidity)
+    ph_scores = score_ph_batch(ph)
+    r_scores  = score_rainfall_batch(rainfall_mm)
+    c_scores  = score_case_spike_batch(active_cases, total_cases)
+
+    w_t, w_ph, w_r, w_c = (
+        WEIGHTS["turbidity"], WEIGHTS["ph"], WEIGHTS["rainfall"], WEIGHTS["cases_spike"],
+    )
+    totals = [
+        w_t * t + w_ph * p + w_r * r + w_c * c
+        for t, p, r, c in zip(t_scores, ph_scores, r_scores, c_scores)
+    ]
+
+    return {
+        "score": array("d", (round(v, 1) for v in totals)),
+        "level": [LEVELS[bisect_right(LEVEL_BOUNDS, v)] for v in totals],
+        "breakdown": {
+            "turbidity_score":  t_scores,
+            "ph_score":         ph_scores,
+            "rainfall_score":   r_scores,
+            "case_spike_score": c_scores,
+        },
+    }
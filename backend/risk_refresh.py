@@ -0,0 +1,121 @@
+"""
+Set-based risk recalculation.
+Loads the latest water and weather row for every requested area, plus the
+case counts summed over the latest row of each disease the area tracks, with
+one query per table, scores them in a single batch and writes the results
+back with bulk UPDATE / INSERT statements, so the number of queries does not
+grow with the number of areas.
+"""
+from datetime import datetime
+from time import perf_counter
+
+from sqlalchemy import insert, select, update
+
+from alerting import adjust_unread, suppressed
+from cache import ALERTS, RISK, bump
+from events import publish
+from extensions import db
+from models import Alert, RiskLevel, WaterQuality, WeatherData, latest_case_totals, latest_per_area
+from profiling import timed
+from risk_engine import calculate_risk_batch
+
+
+def _ms(start: float) -> float:
+    return round((perf_counter() - start) * 1000, 2)
+
+
+def refresh_risk(areas=None):
+    """
+    Recalculate risk for `areas` (all areas when None) and raise alerts for
+    High/Critical results, unless the same or a higher level was already
+    alerted for the area within ALERT_SUPPRESSION_MINUTES.
+    Returns (updated_area_dicts, timings_ms).
+    Areas whose score or level moved and any new alerts are published to the
+    event hub after the commit.
+    """
+    timings = {}
+
+    start = perf_counter()
+    risk_q = select(RiskLevel.id, RiskLevel.area, RiskLevel.score, RiskLevel.level, RiskLevel.lat, RiskLevel.lng)
+    if areas is not None:
+        risk_q = risk_q.where(RiskLevel.area.in_(areas))
+    risks = db.session.execute(risk_q).all()
+    scope = None if areas is None else [r.area for r in risks]
+
+    water   = latest_per_area(WaterQuality, scope)
+    weather = latest_per_area(WeatherData,  scope)
+    cases   = latest_case_totals(scope)
+    timings["load"] = _ms(start)
+
+    start = perf_counter()
+    scorable = [r for r in risks if r.area in water and r.area in weather and r.area in cases]
+    with timed("calculate_risk"):
+        batch = calculate_risk_batch(
+            turbidity    = [water[r.area].turbidity      for r in scorable],
+            ph           = [water[r.area].ph             for r in scorable],
+            rainfall_mm  = [weather[r.area].rainfall_mm  for r in scorable],
+            active_cases = [cases[r.area].active_cases   for r in scorable],
+            total_cases  = [cases[r.area].total_cases    for r in scorable],
+        )
+    timings["score"] = _ms(start)
+
+    start = perf_counter()
+    now = datetime.utcnow()
+    alert_levels = {
+        r.area: level for r, level in zip(scorable, batch["level"])
+        if level in ("High", "Critical")
+    }
+    quiet = suppressed(alert_levels, now)
+
+    risk_updates, new_alerts, updated, changes = [], [], [], []
+    breakdown = batch["breakdown"]
+    for i, r in enumerate(scorable):
+        score, level = batch["score"][i], batch["level"][i]
+        risk_updates.append({"id": r.id, "score": score, "level": level, "updated_at": now})
+
+        raise_alert = r.area in alert_levels and r.area not in quiet
+        if raise_alert:
+            new_alerts.append({
+                "area": r.area,
+                "message": (
+                    f"⚠️ {level} outbreak risk in {r.area}. "
+                    f"Score: {score}. Active cases: {cases[r.area].active_cases}."
+                ),
+                "severity": level,
+                "is_sent": False,
+                "created_at": now,
+            })
+
+        updated.append({
+            "id": r.id, "area": r.area,
+            "score": round(score, 1), "level": level,
+            "lat": r.lat, "lng": r.lng,
+            "updated_at": now.isoformat(),
+            "breakdown": {name: column[i] for name, column in breakdown.items()},
+            "alert_raised": raise_alert,
+        })
+        if level != r.level or round(score, 1) != round(r.score or 0, 1):
+            changes.append({
+                "area": r.area, "score": round(score, 1), "level": level,
+                "prev_level": r.level, "updated_at": now.isoformat(),
+            })
+
+    if risk_updates:
+        db.session.execute(update(RiskLevel), risk_updates)
+    alert_ids = []
+    if new_alerts:
+        alert_ids = db.session.scalars(insert(Alert).returning(Alert.id), new_alerts).all()
+        adjust_unread(len(alert_ids))
+    db.session.commit()
+    bump(RISK, ALERTS)
+    timings["write"] = _ms(start)
+
+    if changes:
+        publish("risk.updated", {"changes": changes})
+    if new_alerts:
+        publish("alert.created", {"alerts": [
+            {"id": alert_id, **row, "created_at": now.isoformat()}
+            for alert_id, row in zip(alert_ids, new_alerts)
+        ]})
+
+    return updated, timings
@@ -0,0 +1,76 @@
+"""
+Incremental risk recomputation.
+Ingest endpoints call mark_dirty(area) after storing a reading; a background
+thread wakes up, waits a short debounce window so a burst of sensor readings
+collapses into one pass, and rescores only the dirty areas.
+"""
+import logging
+import os
+import threading
+
+from extensions import db
+from risk_refresh import refresh_risk
+
+log = logging.getLogger(__name__)
+
+_dirty = set()
+_lock  = threading.Lock()
+_wake  = threading.Event()
+_thread = None
+
+
+def mark_dirty(*areas):
+    with _lock:
+        _dirty.update(areas)
+    _wake.set()
+
+
+def pending():
+    with _lock:
+        return sorted(_dirty)
+
+
+def _drain():
+    with _lock:
+        areas = set(_dirty)
+        _dirty.clear()
+    return areas
+
+
+def flush(app):
+    """Rescore every dirty area now. Returns the list of areas rescored."""
+    areas = _drain()
+    if not areas:
+        return []
+    with app.app_context():
+        try:
+            updated, _ = refresh_risk(sorted(areas))
+        except Exception:
+            db.session.rollback()
+            mark_dirty(*areas)   # retry on the next wake-up
+            raise
+        finally:
+            db.session.remove()
+    return [u["area"] for u in updated]
+
+
+def _run(app, debounce: float):
+    while True:
+        _wake.wait()
+        _wake.clear()
+        if debounce:
+            threading.Event().wait(debounce)
+        try:
+            flush(app)
+        except Exception:
+            log.exception("incremental risk refresh failed")
+
+
+def start_worker(app):
+    """Start the per-process refresh thread (idempotent)."""
+    global _thread
+    if _thread is not None:
+        return
+    debounce = float(os.getenv("RISK_REFRESH_DEBOUNCE", "2"))
+    _thread = threading.Thread(target=_run, args=(app, debounce), name="risk-worker", daemon=True)
+    _thread.start()
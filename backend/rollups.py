@@ -0,0 +1,113 @@
+"""
+Hourly and daily rollups of sensor readings.
+Every stored reading is folded into its (area, metric, granularity, bucket)
+row with an upsert, so trend charts and dashboard averages read a few hundred
+rollup rows instead of scanning the raw time-series tables.
+"""
+from collections import defaultdict
+
+from sqlalchemy import case, select
+
+from extensions import db
+from models import ReadingRollup, WaterQuality, WeatherData
+
+ROLLUP_METRICS = {
+    WaterQuality: ("ph", "turbidity", "hardness", "chloramines"),
+    WeatherData:  ("rainfall_mm",),
+}
+METRIC_NAMES = tuple(m for metrics in ROLLUP_METRICS.values() for m in metrics)
+
+GRANULARITIES = {
+    "hour": lambda ts: ts.replace(minute=0, second=0, microsecond=0),
+    "day":  lambda ts: ts.replace(hour=0, minute=0, second=0, microsecond=0),
+}
+
+
+def _field(reading, name):
+    return reading[name] if isinstance(reading, dict) else getattr(reading, name)
+
+
+def _aggregate(model, readings) -> dict:
+    """Fold readings (ORM rows or dicts with area_id / recorded_at / metrics) into bucket partials."""
+    buckets = defaultdict(lambda: [0, float("inf"), float("-inf"), 0.0])
+    metrics = ROLLUP_METRICS[model]
+    truncations = tuple(GRANULARITIES.items())
+    for reading in readings:
+        area_id, ts = _field(reading, "area_id"), _field(reading, "recorded_at")
+        starts = [(granularity, truncate(ts)) for granularity, truncate in truncations]
+        for metric in metrics:
+            value = _field(reading, metric)
+            if value is None:
+                continue
+            for granularity, start in starts:
+                agg = buckets[(area_id, metric, granularity, start)]
+                agg[0] += 1
+                if value < agg[1]:
+                    agg[1] = value
+                if value > agg[2]:
+                    agg[2] = value
+                agg[3] += value
+    return buckets
+
+
+def _upsert(buckets: dict):
+    rows = [
+        {"area_id": area_id, "metric": metric, "granularity": granularity, "bucket_start": start,
+         "count": count, "min_value": lo, "max_value": hi, "total": total}
+        for (area_id, metric, granularity, start), (count, lo, hi, total) in buckets.items()
+    ]
+    if not rows:
+        return
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        return _merge_rows(rows)
+
+    t    = ReadingRollup.__table__
+    stmt = insert(t)
+    new  = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["area_id", "metric", "granularity", "bucket_start"],
+        set_={
+            "count":     t.c.count + new["count"],
+            "min_value": case((new.min_value < t.c.min_value, new.min_value), else_=t.c.min_value),
+            "max_value": case((new.max_value > t.c.max_value, new.max_value), else_=t.c.max_value),
+            "total":     t.c.total + new.total,
+        },
+    )
+    db.session.execute(stmt, rows)
+
+
+def _merge_rows(rows):
+    # Portable read-modify-write for dialects without ON CONFLICT support.
+    for r in rows:
+        existing = db.session.execute(select(ReadingRollup).filter_by(
+            area_id=r["area_id"], metric=r["metric"],
+            granularity=r["granularity"], bucket_start=r["bucket_start"],
+        )).scalar_one_or_none()
+        if existing is None:
+            db.session.add(ReadingRollup(**r))
+            continue
+        existing.count    += r["count"]
+        existing.min_value = min(existing.min_value, r["min_value"])
+        existing.max_value = max(existing.max_value, r["max_value"])
+        existing.total    += r["total"]
+
+
+def update_rollups(model, readings):
+    """Fold new readings of `model` into the rollups (caller commits)."""
+    if model in ROLLUP_METRICS:
+        _upsert(_aggregate(model, readings))
+
+
+def rebuild_rollups(batch_size: int = 5000):
+    """Recompute every rollup from the raw tables (backfill / repair). Caller commits."""
+    db.session.execute(ReadingRollup.__table__.delete())
+    for model, metrics in ROLLUP_METRICS.items():
+        columns = [model.area_id, model.recorded_at] + [getattr(model, m) for m in metrics]
+        q = select(*columns).execution_options(yield_per=batch_size)
+        _upsert(_aggregate(model, db.session.execute(q)))
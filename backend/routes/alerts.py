@@ -1,6 +1,9 @@
 from flask import Blueprint, jsonify, request
 from models import Alert
 from extensions import db
+from cache import ALERTS, bump
+from events import publish
+import alerting
 
 alerts_bp = Blueprint("alerts", __name__)
 
@@ -8,9 +11,14 @@ alerts_bp = Blueprint("alerts", __name__)
 @alerts_bp.route("/", methods=["GET"])
 def get_alerts():
     severity = request.args.get("severity")
+    is_sent  = request.args.get("is_sent")
     limit    = int(request.args.get("limit", 50))
 
     query = Alert.query
+    if request.args.get("include_archived") != "1":
+        query = query.filter(Alert.archived_at.is_(None))
+    if is_sent is not None:
+        query = query.filter_by(is_sent=is_sent == "1")
     if severity:
         query = query.filter_by(severity=severity)
     alerts = query.order_by(Alert.created_at.desc()).limit(limit).all()
@@ -19,20 +27,86 @@ def get_alerts():
 
 @alerts_bp.route("/unread-count", methods=["GET"])
 def unread_count():
-    count = Alert.query.filter_by(is_sent=False).count()
-    return jsonify({"count": count})
+    return jsonify({"count": alerting.unread_count()})
+
+
+def _bulk_criteria(source: dict):
+    """
+    Criteria from {ids, severity, area, before} (JSON body or query string).
+    At least one filter, or all=true, is required so a bare call cannot touch
+    every alert by accident.
+    """
+    if not any(source.get(k) for k in ("ids", "severity", "area", "before", "all")):
+        raise ValueError("Provide ids, severity, area or before (or all=true)")
+    ids = source.get("ids")
+    if isinstance(ids, str):
+        ids = ids.split(",")
+    return alerting.alert_criteria(ids=ids, severity=source.get("severity"),
+                                   area=source.get("area"), before=source.get("before"))
 
 
 @alerts_bp.route("/<int:alert_id>/mark-sent", methods=["PATCH"])
 def mark_sent(alert_id):
     alert = Alert.query.get_or_404(alert_id)
-    alert.is_sent = True
+    ids = alerting.mark_sent(Alert.id == alert.id)
     db.session.commit()
+    if ids:
+        bump(ALERTS)
+        publish("alert.sent", {"ids": ids})
     return jsonify(alert.to_dict())
 
 
+@alerts_bp.route("/mark-sent", methods=["POST"])
+def bulk_mark_sent():
+    """Mark alerts sent by id list, severity and/or area in one UPDATE."""
+    try:
+        criteria = _bulk_criteria(request.get_json() or {})
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    ids = alerting.mark_sent(*criteria)
+    db.session.commit()
+    if ids:
+        bump(ALERTS)
+        publish("alert.sent", {"ids": ids})
+    return jsonify({"updated": len(ids)})
+
+
+@alerts_bp.route("/archive", methods=["POST"])
+def archive_alerts():
+    """Archive alerts by id list, severity, area and/or age; archived alerts leave the feed."""
+    try:
+        criteria = _bulk_criteria(request.get_json() or {})
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    ids = alerting.archive(*criteria)
+    db.session.commit()
+    if ids:
+        bump(ALERTS)
+        publish("alert.archived", {"ids": ids})
+    return jsonify({"archived": len(ids)})
+
+
 @alerts_bp.route("/clear", methods=["DELETE"])
 def clear_alerts():
-    Alert.query.delete()
+    """Archive every alert still in the feed; rows are deleted later by prune."""
+    ids = alerting.archive()
+    db.session.commit()
+    if ids:
+        bump(ALERTS)
+        publish("alert.archived", {"ids": ids})
+    return jsonify({"message": "All alerts cleared", "archived": len(ids)})
+
+
+@alerts_bp.route("/prune", methods=["POST"])
+def prune_alerts():
+    """Archive alerts older than ALERT_TTL_DAYS, then delete those archived past ALERT_RETENTION_DAYS."""
+    ids = alerting.archive_expired()
     db.session.commit()
-    return jsonify({"message": "All alerts cleared"})
+    deleted = alerting.prune()
+    if ids or deleted:
+        bump(ALERTS)
+    if ids:
+        publish("alert.archived", {"ids": ids})
+    return jsonify({"archived": len(ids), "deleted": deleted})
@@ -1,5 +1,15 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request
+from collections import deque
+from concurrent.futures import Future
+from time import perf_counter
+import hashlib
+import json
 import os
+import re
+import threading
+
+from cache import VersionedCache
+from chatbot_kb import KnowledgeBase
 
 chatbot_bp = Blueprint("chatbot", __name__)
 
@@ -33,19 +43,158 @@ FALLBACK_RESPONSES = {
 }
 
 
+DEFAULT_REPLY = (
+    "I'm JalRaksha AI, your water health assistant. "
+    "I can help with questions about water quality, waterborne diseases, "
+    "outbreak risk levels, and preventive measures. "
+    "Please ask about: cholera, typhoid, water pH, turbidity, risk levels, or prevention tips."
+)
+
+# Built-in entries unless CHATBOT_KB_PATH points at a JSON knowledge base.
+_kb = KnowledgeBase(FALLBACK_RESPONSES, DEFAULT_REPLY)
+
+
 def get_fallback_response(message: str) -> str:
-    msg_lower = message.lower()
-    for keyword, response in FALLBACK_RESPONSES.items():
-        if keyword in msg_lower:
-            return response
-    return (
-        "I'm JalRaksha AI, your water health assistant. "
-        "I can help with questions about water quality, waterborne diseases, "
-        "outbreak risk levels, and preventive measures. "
-        "Please ask about: cholera, typhoid, water pH, turbidity, risk levels, or prevention tips."
-    )
+    return _kb.respond(message)
+
+
+# ─────────── Gemini client, answer cache, request coalescing ───────────────────
+
+GEMINI_MODEL        = "gemini-1.5-flash"
+HISTORY_TURNS       = 6
+CHAT_CACHE_TTL      = float(os.getenv("CHAT_CACHE_TTL", "3600"))
+CHAT_CACHE_SIZE     = int(os.getenv("CHAT_CACHE_SIZE", "2048"))
+UPSTREAM_TIMEOUT    = float(os.getenv("CHAT_UPSTREAM_TIMEOUT", "30"))
+
+PRIMER = [
+    {"role": "user",  "parts": [SYSTEM_CONTEXT]},
+    {"role": "model", "parts": ["Understood. I am JalRaksha AI, ready to assist with water health monitoring queries."]},
+]
+
+_model      = None
+_model_lock = threading.Lock()
+
+_answers  = VersionedCache((), ttl=CHAT_CACHE_TTL, maxsize=CHAT_CACHE_SIZE)
+_inflight = {}                  # cache key -> Future shared by identical concurrent questions
+_inflight_lock = threading.Lock()
+_metrics  = {"hits": 0, "misses": 0, "coalesced": 0, "upstream_calls": 0, "upstream_errors": 0}
+_metrics_lock = threading.Lock()
+_ttfb     = {}                  # "route.source" -> recent time-to-first-byte samples (ms)
+TTFB_SAMPLES = 500
+
+
+def _count(name: str, n: int = 1):
+    with _metrics_lock:
+        _metrics[name] += n
+
+
+def _record_ttfb(route: str, source: str, ms: float):
+    with _metrics_lock:
+        _ttfb.setdefault(f"{route}.{source}", deque(maxlen=TTFB_SAMPLES)).append(ms)
+
+
+def _percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))], 1)
+
+
+def _get_model():
+    """Configure the SDK and build the model client once per process."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                import google.generativeai as genai
+                genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+                _model = genai.GenerativeModel(GEMINI_MODEL)
+    return _model
+
+
+def preload():
+    """Import the SDK and build the client before the first question arrives."""
+    if os.getenv("GEMINI_API_KEY"):
+        _get_model()
+
+
+def _normalize(text: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+def _recent_history(history: list) -> list:
+    return [(h.get("user", ""), h.get("bot", "")) for h in history[-HISTORY_TURNS:]]
+
+
+def _cache_key(user_message: str, turns: list) -> str:
+    # The answer depends on the question and on the turns the model actually sees.
+    raw = json.dumps([_normalize(user_message), [[_normalize(u), _normalize(b)] for u, b in turns]])
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _chat_history(turns: list) -> list:
+    chat_history = list(PRIMER)
+    for user, bot in turns:
+        chat_history.append({"role": "user",  "parts": [user]})
+        chat_history.append({"role": "model", "parts": [bot]})
+    return chat_history
 
 
+def _ask_gemini(user_message: str, turns: list) -> str:
+    _count("upstream_calls")
+    chat = _get_model().start_chat(history=_chat_history(turns))
+    return chat.send_message(user_message).text
+
+
+def _stream_gemini(user_message: str, turns: list):
+    """Yield text chunks as Gemini produces them."""
+    _count("upstream_calls")
+    chat = _get_model().start_chat(history=_chat_history(turns))
+    for chunk in chat.send_message(user_message, stream=True):
+        if chunk.text:
+            yield chunk.text
+
+
+def _cached_answer(user_message: str, history: list):
+    """
+    Answer via cache → in-flight call for the same key → upstream.
+    Returns (reply, cached). Raises if the upstream call fails.
+    """
+    turns = _recent_history(history)
+    key   = _cache_key(user_message, turns)
+
+    reply = _answers.get(key)
+    if reply is not None:
+        _count("hits")
+        return reply, True
+
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = Future()
+            _inflight[key] = future
+    if not leader:
+        _count("coalesced")
+        return future.result(timeout=UPSTREAM_TIMEOUT), True
+
+    _count("misses")
+    try:
+        reply = _ask_gemini(user_message, turns)
+        if not reply:
+            raise ValueError("empty reply from Gemini")   # fall back; never cache ""
+        _answers.put(key, reply)
+        future.set_result(reply)
+        return reply, False
+    except Exception as e:
+        _count("upstream_errors")
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+
+# ─────────── routes ─────────────────────────────────────────────────────────────
+
 @chatbot_bp.route("/message", methods=["POST"])
 def message():
     data = request.get_json()
@@ -54,29 +203,107 @@ def message():
 
     user_message  = data["message"].strip()
     history       = data.get("history", [])
-    api_key       = os.getenv("GEMINI_API_KEY")
+    started       = perf_counter()
 
-    if api_key:
+    if os.getenv("GEMINI_API_KEY"):
         try:
-            import google.generativeai as genai
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel("gemini-1.5-flash")
-
-            chat_history = [
-                {"role": "user",  "parts": [SYSTEM_CONTEXT]},
-                {"role": "model", "parts": ["Understood. I am JalRaksha AI, ready to assist with water health monitoring queries."]},
-            ]
-            for h in history[-6:]:
-                chat_history.append({"role": "user",  "parts": [h.get("user", "")]})
-                chat_history.append({"role": "model", "parts": [h.get("bot",  "")]})
-
-            chat    = model.start_chat(history=chat_history)
-            resp    = chat.send_message(user_message)
-            bot_reply = resp.text
-
-        except Exception as e:
-            bot_reply = get_fallback_response(user_message)
-    else:
-        bot_reply = get_fallback_response(user_message)
-
-    return jsonify({"reply": bot_reply, "source": "gemini" if api_key else "fallback"})
+            bot_reply, cached = _cached_answer(user_message, history)
+            _record_ttfb("message", "cache" if cached else "gemini", (perf_counter() - started) * 1000)
+            return jsonify({"reply": bot_reply, "source": "gemini", "cached": cached})
+        except Exception:
+            pass
+
+    _record_ttfb("message", "fallback", (perf_counter() - started) * 1000)
+    return jsonify({"reply": get_fallback_response(user_message), "source": "fallback", "cached": False})
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@chatbot_bp.route("/stream", methods=["POST"])
+def stream():
+    """
+    Server-sent-events variant of /message. Emits `delta` events with text
+    chunks as Gemini produces them (cached and fallback answers arrive as a
+    single delta), then a `done` event with source, cache flag and timings.
+    An upstream failure after partial output emits `error` before `done`.
+    """
+    data = request.get_json()
+    if not data or "message" not in data:
+        return jsonify({"error": "No message provided"}), 400
+
+    user_message = data["message"].strip()
+    history      = data.get("history", [])
+    use_gemini   = bool(os.getenv("GEMINI_API_KEY"))
+    started      = perf_counter()
+
+    def events():
+        first_at = None
+        source, cached, parts = "fallback", False, []
+
+        def delta(text):
+            nonlocal first_at
+            if first_at is None:
+                first_at = perf_counter()
+            return _sse("delta", {"text": text})
+
+        if use_gemini:
+            turns = _recent_history(history)
+            key   = _cache_key(user_message, turns)
+            reply = _answers.get(key)
+            if reply is not None:
+                _count("hits")
+                source, cached = "gemini", True
+                yield delta(reply)
+            else:
+                _count("misses")
+                try:
+                    for text in _stream_gemini(user_message, turns):
+                        parts.append(text)
+                        yield delta(text)
+                    if parts:   # an empty stream falls back and is never cached
+                        _answers.put(key, "".join(parts))
+                        source = "gemini"
+                except Exception:
+                    _count("upstream_errors")
+                    if parts:
+                        source = "gemini"
+                        yield _sse("error", {"error": "Response interrupted"})
+
+        if source == "fallback":
+            yield delta(get_fallback_response(user_message))
+
+        ttfb_ms = (first_at - started) * 1000
+        _record_ttfb("stream", "cache" if cached else source, ttfb_ms)
+        yield _sse("done", {
+            "source":   source,
+            "cached":   cached,
+            "ttfb_ms":  round(ttfb_ms, 1),
+            "total_ms": round((perf_counter() - started) * 1000, 1),
+        })
+
+    return Response(events(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@chatbot_bp.route("/metrics", methods=["GET"])
+def metrics():
+    """Answer-cache, upstream call and time-to-first-byte stats for this process."""
+    with _metrics_lock:
+        snapshot = dict(_metrics)
+    lookups = snapshot["hits"] + snapshot["misses"] + snapshot["coalesced"]
+    snapshot["hit_ratio"]  = round((snapshot["hits"] + snapshot["coalesced"]) / lookups, 3) if lookups else 0.0
+    snapshot["in_flight"]  = len(_inflight)
+    with _metrics_lock:
+        samples = {name: list(values) for name, values in _ttfb.items()}
+    snapshot["ttfb_ms"] = {
+        name: {"count": len(values), "p50": _percentile(values, 0.5), "p95": _percentile(values, 0.95)}
+        for name, values in samples.items()
+    }
+    snapshot["knowledge_base"] = {
+        "source":  _kb.source,
+        "entries": len(_kb.index().entries),
+        "error":   _kb.last_error,
+    }
+    return jsonify(snapshot)
@@ -1,74 +1,281 @@
-from flask import Blueprint, jsonify
-from models import WaterQuality, WeatherData, DiseaseCase, RiskLevel, Alert
+import base64
+import csv
+import hashlib
+import io
+import os
+from datetime import datetime
+
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from models import Area, WaterQuality, WeatherData, DiseaseCase, RiskLevel, Alert, ReadingRollup
+from rollups import GRANULARITIES, METRIC_NAMES
 from extensions import db
-from sqlalchemy import func
+from sqlalchemy import and_, case, func, or_, select, true
+from cache import ALERTS, READINGS, RISK, VersionedCache, versions
+from db_routing import primary_required, read_from_replica
 
 dashboard_bp = Blueprint("dashboard", __name__)
 
+# Rebuilt when readings, risk levels or alerts change in this process; the TTL
+# picks up writes from other workers. With read replicas, only primary reads
+# are cached and requests pinned to the primary bypass the cache. The ETag is
+# a hash of the body, so it is stable across processes and an unchanged poll
+# gets a 304.
+_summary_cache = VersionedCache(
+    (READINGS, RISK, ALERTS), ttl=float(os.getenv("SUMMARY_CACHE_TTL", "15")), maxsize=1,
+)
 
-@dashboard_bp.route("/summary", methods=["GET"])
-def summary():
-    total_cases   = db.session.query(func.sum(DiseaseCase.total_cases)).scalar() or 0
-    active_cases  = db.session.query(func.sum(DiseaseCase.active_cases)).scalar() or 0
-    recovered     = db.session.query(func.sum(DiseaseCase.recovered)).scalar() or 0
-    deaths        = db.session.query(func.sum(DiseaseCase.deaths)).scalar() or 0
-    monitored     = db.session.query(func.count(func.distinct(RiskLevel.area))).scalar() or 0
-
-    recovery_rate = round((recovered / total_cases) * 100, 1) if total_cases else 0
-    fatality_rate = round((deaths     / total_cases) * 100, 1) if total_cases else 0
-
-    high_risk    = RiskLevel.query.filter(RiskLevel.level.in_(["High", "Critical"])).count()
-    critical     = RiskLevel.query.filter_by(level="Critical").count()
-
-    # Latest water quality (averaged)
-    wq_avg = db.session.query(
-        func.avg(WaterQuality.ph).label("ph"),
-        func.avg(WaterQuality.turbidity).label("turbidity"),
-        func.avg(WaterQuality.hardness).label("hardness"),
-        func.avg(WaterQuality.chloramines).label("chloramines"),
-    ).first()
-
-    # Weather summary
-    avg_rain = db.session.query(func.avg(WeatherData.rainfall_mm)).scalar() or 0
-    flood_zones = WeatherData.query.filter_by(flood_risk=True).count()
-
-    recent_alerts = (
-        Alert.query.order_by(Alert.created_at.desc()).limit(5).all()
+
+def _rollup_mean(metric: str):
+    is_metric = ReadingRollup.metric == metric
+    return (
+        func.sum(case((is_metric, ReadingRollup.total), else_=0.0)) /
+        func.nullif(func.sum(case((is_metric, ReadingRollup.count), else_=0)), 0)
     )
 
-    return jsonify({
+
+def _load_summary() -> dict:
+    """All dashboard statistics in two round trips: one cross join of single-row aggregates, one alert list."""
+    cases = select(
+        func.coalesce(func.sum(DiseaseCase.total_cases), 0).label("total_cases"),
+        func.coalesce(func.sum(DiseaseCase.active_cases), 0).label("active_cases"),
+        func.coalesce(func.sum(DiseaseCase.recovered), 0).label("recovered"),
+        func.coalesce(func.sum(DiseaseCase.deaths), 0).label("deaths"),
+    ).subquery()
+    risk = select(
+        func.count(RiskLevel.id).label("monitored"),
+        func.coalesce(func.sum(case((RiskLevel.level.in_(["High", "Critical"]), 1), else_=0)), 0).label("high_risk"),
+        func.coalesce(func.sum(case((RiskLevel.level == "Critical", 1), else_=0)), 0).label("critical"),
+    ).subquery()
+    # Averages come from the daily rollups (a few rows per area per day), not the raw tables.
+    means = select(
+        _rollup_mean("ph").label("ph"),
+        _rollup_mean("turbidity").label("turbidity"),
+        _rollup_mean("hardness").label("hardness"),
+        _rollup_mean("chloramines").label("chloramines"),
+        _rollup_mean("rainfall_mm").label("avg_rain"),
+    ).where(ReadingRollup.granularity == "day").subquery()
+    weather = select(
+        func.coalesce(func.sum(case((WeatherData.flood_risk.is_(True), 1), else_=0)), 0).label("flood_zones"),
+    ).subquery()
+
+    row = db.session.execute(
+        select(cases, risk, means, weather).select_from(
+            cases.join(risk, true()).join(means, true()).join(weather, true())
+        )
+    ).one()
+    recent_alerts = (Alert.query.filter(Alert.archived_at.is_(None))
+                     .order_by(Alert.created_at.desc()).limit(5).all())
+
+    total_cases = int(row.total_cases)
+    recovery_rate = round((row.recovered / total_cases) * 100, 1) if total_cases else 0
+    fatality_rate = round((row.deaths    / total_cases) * 100, 1) if total_cases else 0
+
+    return {
         "statistics": {
-            "total_cases":    int(total_cases),
-            "active_cases":   int(active_cases),
-            "recovered":      int(recovered),
-            "deaths":         int(deaths),
+            "total_cases":    total_cases,
+            "active_cases":   int(row.active_cases),
+            "recovered":      int(row.recovered),
+            "deaths":         int(row.deaths),
             "recovery_rate":  recovery_rate,
             "fatality_rate":  fatality_rate,
-            "monitored_areas": int(monitored),
-            "high_risk_areas": int(high_risk),
-            "critical_areas":  int(critical),
+            "monitored_areas": int(row.monitored),
+            "high_risk_areas": int(row.high_risk),
+            "critical_areas":  int(row.critical),
         },
         "water_quality": {
-            "ph":           round(float(wq_avg.ph or 7), 2),
-            "turbidity":    round(float(wq_avg.turbidity or 0), 2),
-            "hardness":     round(float(wq_avg.hardness or 0), 2),
-            "chloramines":  round(float(wq_avg.chloramines or 0), 2),
+            "ph":           round(float(row.ph or 7), 2),
+            "turbidity":    round(float(row.turbidity or 0), 2),
+            "hardness":     round(float(row.hardness or 0), 2),
+            "chloramines":  round(float(row.chloramines or 0), 2),
         },
         "weather": {
-            "avg_rainfall_mm": round(float(avg_rain), 1),
-            "flood_zones":     int(flood_zones),
+            "avg_rainfall_mm": round(float(row.avg_rain or 0), 1),
+            "flood_zones":     int(row.flood_zones),
         },
         "recent_alerts": [a.to_dict() for a in recent_alerts],
-    })
+    }
+
+
+@dashboard_bp.route("/summary", methods=["GET"])
+def summary():
+    entry = None if primary_required() else _summary_cache.get("summary")
+    if entry is None:
+        built_versions = versions(*_summary_cache.scopes)
+        body = current_app.json.dumps(_load_summary())
+        entry = (body, hashlib.sha1(body.encode()).hexdigest())
+        if not read_from_replica():
+            _summary_cache.put("summary", entry, built_versions)
+
+    body, etag = entry
+    resp = current_app.response_class(body, mimetype="application/json")
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp.make_conditional(request)
+
+
+# ─────────── reading feeds ──────────────────────────────────────────────────────
+# Keyset pagination on (recorded_at DESC, id DESC), which is exactly the order of
+# the (area_id, recorded_at DESC, id DESC) index, plus constant-memory exports.
+
+FEED_PAGE_SIZE = 500
+FEED_MAX_PAGE  = 5000
+EXPORT_BATCH   = 1000
+
+
+def _encode_cursor(row) -> str:
+    raw = f"{row.recorded_at.isoformat()}|{row.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str):
+    try:
+        ts, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit("|", 1)
+        return datetime.fromisoformat(ts), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("invalid cursor")
+
+
+def _parse_time(name: str):
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an ISO-8601 timestamp")
+
+
+def _feed_query(model):
+    q = select(model).order_by(model.recorded_at.desc(), model.id.desc())
+
+    area = request.args.get("area")
+    if area:
+        q = q.where(model.area_id == select(Area.id).where(Area.name == area).scalar_subquery())
+    since, until = _parse_time("since"), _parse_time("until")
+    if since:
+        q = q.where(model.recorded_at >= since)
+    if until:
+        q = q.where(model.recorded_at < until)
+    return q
+
+
+def _stream_export(model, q, fmt: str):
+    def ndjson():
+        for row in db.session.execute(q.execution_options(yield_per=EXPORT_BATCH)).scalars():
+            yield current_app.json.dumps(row.to_dict()) + "\n"
+
+    def csv_rows():
+        buf    = io.StringIO()
+        writer = None
+        for row in db.session.execute(q.execution_options(yield_per=EXPORT_BATCH)).scalars():
+            record = row.to_dict()
+            if writer is None:
+                writer = csv.DictWriter(buf, fieldnames=list(record))
+                writer.writeheader()
+            writer.writerow(record)
+            if buf.tell() > 64 * 1024:
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate()
+        yield buf.getvalue()
+
+    if fmt == "csv":
+        resp = Response(stream_with_context(csv_rows()), mimetype="text/csv")
+        resp.headers["Content-Disposition"] = f"attachment; filename={model.__tablename__}.csv"
+        return resp
+    return Response(stream_with_context(ndjson()), mimetype="application/x-ndjson")
+
+
+def _reading_feed(model):
+    """
+    ?area=&since=&until=         filters (ISO-8601 times, `until` exclusive)
+    ?limit=&cursor=              keyset page; next cursor in the X-Next-Cursor header
+    ?format=ndjson|csv           stream every matching row instead of one page
+    """
+    fmt = request.args.get("format", "json")
+    if fmt not in ("json", "ndjson", "csv"):
+        return jsonify({"error": "format must be json, ndjson or csv"}), 400
+    try:
+        q = _feed_query(model)
+        if fmt != "json":
+            return _stream_export(model, q, fmt)
+
+        limit  = min(max(int(request.args.get("limit", FEED_PAGE_SIZE)), 1), FEED_MAX_PAGE)
+        cursor = request.args.get("cursor")
+        if cursor:
+            ts, row_id = _decode_cursor(cursor)
+            q = q.where(or_(
+                model.recorded_at < ts,
+                and_(model.recorded_at == ts, model.id < row_id),
+            ))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    rows = db.session.execute(q.limit(limit + 1)).scalars().all()
+    page = rows[:limit]
+    resp = jsonify([r.to_dict() for r in page])
+    if len(rows) > limit:
+        resp.headers["X-Next-Cursor"] = _encode_cursor(page[-1])
+    return resp
 
 
 @dashboard_bp.route("/water-quality", methods=["GET"])
 def water_quality():
-    records = WaterQuality.query.order_by(WaterQuality.recorded_at.desc()).all()
-    return jsonify([r.to_dict() for r in records])
+    return _reading_feed(WaterQuality)
 
 
 @dashboard_bp.route("/weather", methods=["GET"])
 def weather():
-    records = WeatherData.query.order_by(WeatherData.recorded_at.desc()).all()
-    return jsonify([r.to_dict() for r in records])
+    return _reading_feed(WeatherData)
+
+
+@dashboard_bp.route("/trends", methods=["GET"])
+def trends():
+    """
+    Bucketed min / max / mean / count series read only from the rollup table.
+    ?metric=ph,turbidity  ?granularity=hour|day  ?area=  ?since=  ?until=
+    """
+    metrics     = [m for m in request.args.get("metric", "ph").split(",") if m]
+    granularity = request.args.get("granularity", "day")
+    unknown     = [m for m in metrics if m not in METRIC_NAMES]
+    if unknown:
+        return jsonify({"error": f"unknown metric(s): {', '.join(unknown)}",
+                        "metrics": list(METRIC_NAMES)}), 400
+    if granularity not in GRANULARITIES:
+        return jsonify({"error": f"granularity must be one of {', '.join(GRANULARITIES)}"}), 400
+    try:
+        since, until = _parse_time("since"), _parse_time("until")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    q = (
+        select(
+            ReadingRollup.metric,
+            ReadingRollup.bucket_start,
+            func.sum(ReadingRollup.count).label("count"),
+            func.min(ReadingRollup.min_value).label("min"),
+            func.max(ReadingRollup.max_value).label("max"),
+            func.sum(ReadingRollup.total).label("total"),
+        )
+        .where(ReadingRollup.metric.in_(metrics), ReadingRollup.granularity == granularity)
+        .group_by(ReadingRollup.metric, ReadingRollup.bucket_start)
+        .order_by(ReadingRollup.metric, ReadingRollup.bucket_start)
+    )
+    area = request.args.get("area")
+    if area:
+        q = q.where(ReadingRollup.area_id == select(Area.id).where(Area.name == area).scalar_subquery())
+    if since:
+        q = q.where(ReadingRollup.bucket_start >= GRANULARITIES[granularity](since))
+    if until:
+        q = q.where(ReadingRollup.bucket_start < until)
+
+    series = {m: [] for m in metrics}
+    for row in db.session.execute(q):
+        series[row.metric].append({
+            "bucket_start": row.bucket_start.isoformat(),
+            "count": int(row.count),
+            "min":   row.min,
+            "max":   row.max,
+            "mean":  round(row.total / row.count, 3) if row.count else None,
+        })
+    return jsonify({"granularity": granularity, "area": area, "series": series})
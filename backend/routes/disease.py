@@ -1,9 +1,10 @@
 from flask import Blueprint, jsonify, request
-from models import DiseaseCase, RiskLevel, Alert, WaterQuality, WeatherData
+from models import DiseaseCase, RiskLevel, Alert, OutboxMessage, area_snapshots
 from extensions import db
-from sqlalchemy import func
-from risk_engine import calculate_risk
-from datetime import datetime
+from sqlalchemy import func, select
+from risk_refresh import refresh_risk
+from notifications import enqueue, get_provider
+from time import perf_counter
 
 disease_bp = Blueprint("disease", __name__)
 
@@ -43,17 +44,12 @@ def risk_map():
 
 @disease_bp.route("/high-risk", methods=["GET"])
 def high_risk():
-    areas = (
-        RiskLevel.query
-        .filter(RiskLevel.level.in_(["High", "Critical"]))
-        .order_by(RiskLevel.score.desc())
-        .all()
+    rows = area_snapshots(
+        RiskLevel.level.in_(["High", "Critical"]),
+        order_by=RiskLevel.score.desc(),
     )
     result = []
-    for area in areas:
-        cases = DiseaseCase.query.filter_by(area=area.area).first()
-        weather = WeatherData.query.filter_by(area=area.area).first()
-        wq      = WaterQuality.query.filter_by(area=area.area).first()
+    for area, wq, weather, cases in rows:
         result.append({
             **area.to_dict(),
             "disease":      cases.disease     if cases   else "Unknown",
@@ -66,13 +62,10 @@ def high_risk():
 
 @disease_bp.route("/area/<string:area_name>", methods=["GET"])
 def area_detail(area_name):
-    wq      = WaterQuality.query.filter_by(area=area_name).first()
-    weather = WeatherData.query.filter_by(area=area_name).first()
-    cases   = DiseaseCase.query.filter_by(area=area_name).first()
-    risk    = RiskLevel.query.filter_by(area=area_name).first()
-
-    if not risk:
+    rows = area_snapshots(RiskLevel.area == area_name)
+    if not rows:
         return jsonify({"error": "Area not found"}), 404
+    risk, wq, weather, cases = rows[0]
 
     return jsonify({
         "area":         area_name,
@@ -86,77 +79,33 @@ def area_detail(area_name):
 @disease_bp.route("/recalculate", methods=["POST"])
 def recalculate():
     """Recalculate risk scores for all areas and generate alerts."""
-    from models import Alert
-    areas = RiskLevel.query.all()
-    updated = []
-
-    for area_risk in areas:
-        wq      = WaterQuality.query.filter_by(area=area_risk.area).first()
-        weather = WeatherData.query.filter_by(area=area_risk.area).first()
-        cases   = DiseaseCase.query.filter_by(area=area_risk.area).first()
-
-        if not (wq and weather and cases):
-            continue
-
-        risk_data = calculate_risk(
-            water=wq.to_dict(),
-            weather=weather.to_dict(),
-            disease_summary={"active_cases": cases.active_cases, "total_cases": cases.total_cases},
-        )
-        area_risk.score      = risk_data["score"]
-        area_risk.level      = risk_data["level"]
-        area_risk.updated_at = datetime.utcnow()
-
-        if risk_data["level"] in ("High", "Critical"):
-            alert = Alert(
-                area=area_risk.area,
-                message=(
-                    f"⚠️ {risk_data['level']} outbreak risk in {area_risk.area}. "
-                    f"Score: {risk_data['score']}. Active cases: {cases.active_cases}."
-                ),
-                severity=risk_data["level"],
-            )
-            db.session.add(alert)
-
-        updated.append({**area_risk.to_dict(), "breakdown": risk_data["breakdown"]})
-
-    db.session.commit()
-    return jsonify({"updated": len(updated), "areas": updated})
+    started = perf_counter()
+    updated, timings = refresh_risk()
+    timings["total"] = round((perf_counter() - started) * 1000, 2)
+    return jsonify({"updated": len(updated), "areas": updated, "timings_ms": timings})
 
 
 @disease_bp.route("/scheduler/send-now", methods=["POST"])
 def send_alerts_now():
-    """Manual trigger: send SMS for all unsent critical/high alerts via Twilio."""
+    """Queue SMS for all unsent critical/high alerts; delivery marks each alert sent."""
     import os
-    try:
-        from twilio.rest import Client
-        account_sid = os.getenv("TWILIO_ACCOUNT_SID")
-        auth_token  = os.getenv("TWILIO_AUTH_TOKEN")
-        from_number = os.getenv("TWILIO_FROM_NUMBER")
-        to_number   = os.getenv("TWILIO_TO_NUMBER")
-
-        if not all([account_sid, auth_token, from_number, to_number]):
-            return jsonify({"error": "Twilio credentials not configured in .env"}), 400
-
-        client = Client(account_sid, auth_token)
-        unsent = Alert.query.filter_by(is_sent=False).filter(
-            Alert.severity.in_(["High", "Critical"])
-        ).all()
-
-        sent_count = 0
-        for alert in unsent:
-            client.messages.create(
-                body=alert.message,
-                from_=from_number,
-                to=to_number,
-            )
-            alert.is_sent = True
-            sent_count += 1
-
-        db.session.commit()
-        return jsonify({"sent": sent_count})
-
-    except ImportError:
-        return jsonify({"error": "twilio package not installed"}), 500
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    to_number = os.getenv("TWILIO_TO_NUMBER")
+    if not (get_provider("sms").configured() and to_number):
+        return jsonify({"error": "Twilio credentials not configured in .env"}), 400
+
+    in_flight = (
+        select(OutboxMessage.id)
+        .where(OutboxMessage.alert_id == Alert.id, OutboxMessage.status.in_(["queued", "sending"]))
+        .exists()
+    )
+    unsent = db.session.execute(
+        select(Alert.id, Alert.message)
+        .where(Alert.is_sent.is_(False), Alert.archived_at.is_(None),
+               Alert.severity.in_(["High", "Critical"]), ~in_flight)
+        .order_by(Alert.created_at)
+    ).all()
+
+    job_id = enqueue("sms", [
+        {"recipient": to_number, "body": a.message, "alert_id": a.id} for a in unsent
+    ]) if unsent else None
+    return jsonify({"queued": len(unsent), "job_id": job_id}), 202
@@ -0,0 +1,57 @@
+from flask import Blueprint, Response, jsonify, request
+import json
+import os
+
+from events import TOPICS, hub
+
+events_bp = Blueprint("events", __name__)
+
+HEARTBEAT = float(os.getenv("EVENTS_HEARTBEAT", "15"))
+
+
+def _frame(seq: int, event: str, data: dict) -> str:
+    return f"id: {seq}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@events_bp.route("/stream", methods=["GET"])
+def stream():
+    """
+    Server-sent events for risk and alert changes.
+    ?topics=risk,alert narrows the feed; Last-Event-ID (sent automatically by
+    EventSource on reconnect) or ?last_id= replays what was missed.
+    """
+    topics = [t.strip() for t in request.args.get("topics", "").split(",") if t.strip()] or None
+    unknown = set(topics or ()) - set(TOPICS)
+    if unknown:
+        return jsonify({"error": f"Unknown topics: {', '.join(sorted(unknown))}"}), 400
+
+    last_id = request.headers.get("Last-Event-ID") or request.args.get("last_id")
+    try:
+        last_id = int(last_id) if last_id else None
+    except ValueError:
+        return jsonify({"error": "last_id must be an integer"}), 400
+
+    sub = hub.subscribe(topics, last_id)
+
+    def events():
+        try:
+            yield f"retry: 3000\nevent: hello\ndata: {json.dumps({'last_id': hub.stats()['last_id']})}\n\n"
+            while True:
+                item = sub.get(HEARTBEAT)
+                if item is not None:
+                    yield _frame(*item)
+                elif not sub.overflowed:
+                    yield ": keep-alive\n\n"
+                if sub.overflowed and sub.queue.empty():
+                    # Too slow to keep up: close so the client reconnects and replays.
+                    break
+        finally:
+            sub.close()
+
+    return Response(events(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@events_bp.route("/stats", methods=["GET"])
+def stats():
+    return jsonify(hub.stats())
@@ -0,0 +1,88 @@
+import io
+from datetime import datetime
+
+from flask import Blueprint, jsonify, request
+
+from cache import READINGS, bump
+from extensions import db
+from ingestion import (BATCH_SIZE, DISEASE_FIELDS, KINDS, WATER_FIELDS, WEATHER_FIELDS,
+                       detect_format, load_file, parse_reading)
+from models import Area, WaterQuality, WeatherData, DiseaseCase
+from risk_worker import mark_dirty, pending
+from rollups import update_rollups
+
+ingest_bp = Blueprint("ingest", __name__)
+
+
+def _ingest(model, fields: dict):
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "JSON object required"}), 400
+    try:
+        values = parse_reading(model, fields, data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    area = Area.get_or_create(values.pop("area"))
+    values.setdefault("recorded_at", datetime.utcnow())
+    row  = model(area_ref=area, **values)
+    db.session.add(row)
+    db.session.flush()
+    update_rollups(model, [row])
+    db.session.commit()
+    bump(READINGS)
+    mark_dirty(row.area)
+    return jsonify(row.to_dict()), 201
+
+
+# ─────────── routes ─────────────────────────────────────────────────────────────
+
+@ingest_bp.route("/water-quality", methods=["POST"])
+def ingest_water_quality():
+    return _ingest(WaterQuality, WATER_FIELDS)
+
+
+@ingest_bp.route("/weather", methods=["POST"])
+def ingest_weather():
+    return _ingest(WeatherData, WEATHER_FIELDS)
+
+
+@ingest_bp.route("/disease-cases", methods=["POST"])
+def ingest_disease_cases():
+    return _ingest(DiseaseCase, DISEASE_FIELDS)
+
+
+@ingest_bp.route("/bulk/<kind>", methods=["POST"])
+def ingest_bulk(kind):
+    """
+    Load a CSV or Parquet file of readings: multipart field `file`, or the raw
+    request body with ?format=csv|parquet. Rows are validated and inserted in
+    batches (?batch_size=); the affected areas are rescored at the end.
+    """
+    if kind not in KINDS:
+        return jsonify({"error": f"Unknown kind '{kind}'"}), 404
+
+    upload = request.files.get("file")
+    if upload is not None:
+        stream = upload.stream
+        fmt    = request.args.get("format") or detect_format(upload.filename, upload.mimetype)
+    else:
+        stream = request.stream
+        fmt    = request.args.get("format") or detect_format("", request.content_type)
+        if fmt == "parquet":
+            # Parquet needs random access; spool the body.
+            stream = io.BytesIO(stream.read())
+
+    try:
+        batch_size = int(request.args.get("batch_size", BATCH_SIZE))
+        stats = load_file(kind, stream, fmt, batch_size=max(1, batch_size))
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+    return jsonify(stats), 200 if stats["inserted"] else 400
+
+
+@ingest_bp.route("/pending", methods=["GET"])
+def pending_areas():
+    """Areas with readings that have not been rescored yet."""
+    return jsonify({"areas": pending()})
@@ -0,0 +1,14 @@
+from flask import Blueprint, jsonify, request
+
+from notifications import job_status
+
+notifications_bp = Blueprint("notifications", __name__)
+
+
+@notifications_bp.route("/jobs/<string:job_id>", methods=["GET"])
+def get_job(job_id):
+    """Delivery progress of a queued SMS / email job (?messages=0 for counts only)."""
+    status = job_status(job_id, include_messages=request.args.get("messages", "1") != "0")
+    if status is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(status)
@@ -1,16 +1,33 @@
-import os, smtplib, uuid
+import io
+import json
+import os
+import re
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
+from time import perf_counter
 
-from flask import Blueprint, jsonify, request
-from sqlalchemy import select
+from flask import Blueprint, Response, current_app, jsonify, request
+from jinja2 import Environment, FileSystemLoader, select_autoescape
 
-from extensions import db
-from models import WaterQuality, WeatherData, DiseaseCase, RiskLevel
+from cache import VersionedCache
+from notifications import enqueue, get_provider
+from models import (WaterQuality, WeatherData, DiseaseCase, RiskLevel, area_snapshots, latest_for_area,
+                    snapshot_version, snapshot_versions)
+from profiling import timed
 
 reports_bp = Blueprint("reports", __name__)
 
+# Compiled once at import; rendering never re-parses the template.
+_templates = Environment(
+    loader=FileSystemLoader(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates")),
+    autoescape=select_autoescape(["html"]),
+    trim_blocks=True,
+    lstrip_blocks=True,
+)
+_EMAIL_TEMPLATE = _templates.get_template("report_email.html")
+
 
 # ─────────── helpers ────────────────────────────────────────────────────────────
 
@@ -29,26 +46,16 @@ def _water_status(wq):
     return issues
 
 
+def _ms(start: float) -> float:
+    return round((perf_counter() - start) * 1000, 2)
+
+
 def _risk_color(level: str) -> str:
     return {"Low": "green", "Medium": "orange", "High": "red", "Critical": "darkred"}.get(level, "gray")
 
 
-def _build_report_payload(area_name: str):
-    """Gather all DB data for a single area and return a structured report dict."""
-    wq_row  = db.session.execute(
-        select(WaterQuality).where(WaterQuality.area == area_name).order_by(WaterQuality.id.desc())
-    ).scalars().first()
-    wd_row  = db.session.execute(
-        select(WeatherData).where(WeatherData.area == area_name).order_by(WeatherData.id.desc())
-    ).scalars().first()
-    dc_row  = db.session.execute(
-        select(DiseaseCase).where(DiseaseCase.area == area_name).order_by(DiseaseCase.id.desc())
-    ).scalars().first()
-    rl_row  = db.session.execute(
-        select(RiskLevel).where(RiskLevel.area == area_name).order_by(RiskLevel.id.desc())
-    ).scalars().first()
-
-    report = {
+def _assemble_report(area_name: str, rl_row, wq_row, wd_row, dc_row) -> dict:
+    return {
         "report_id":    f"JR-{uuid.uuid4().hex[:8].upper()}",
         "generated_at": datetime.utcnow().isoformat(),
         "area":         area_name,
@@ -62,26 +69,42 @@ def _build_report_payload(area_name: str):
         "water_issues": _water_status(wq_row.to_dict()) if wq_row else [],
         "flood_active": wd_row.flood_risk if wd_row else False,
     }
-    return report
 
 
-def _build_email_html(report: dict) -> str:
-    """Render a full HTML email body for the area report."""
-    area     = report["area"]
-    level    = report["risk"]["level"]
-    score    = report["risk"]["score"]
-    color    = _risk_color(level)
-    gen_at   = report["generated_at"][:19].replace("T", " ") + " UTC"
-    rid      = report["report_id"]
-    wq       = report.get("water_quality") or {}
-    wd       = report.get("weather") or {}
-    dc       = report.get("disease") or {}
-    issues   = report.get("water_issues", [])
-
-    issue_rows = "".join(f"<li style='color:#c0392b'>{i}</li>" for i in issues) if issues else "<li style='color:green'>All major parameters within safe range</li>"
-    wq_table = ""
+def _build_report_payload(area_name: str):
+    """Gather all DB data for a single area and return a structured report dict."""
+    rows = area_snapshots(RiskLevel.area == area_name)
+    if rows:
+        return _assemble_report(area_name, *rows[0])
+    # Area without a risk row (e.g. newly ingested): readings only.
+    return _assemble_report(
+        area_name, None,
+        latest_for_area(WaterQuality, area_name),
+        latest_for_area(WeatherData,  area_name),
+        latest_for_area(DiseaseCase,  area_name),
+    )
+
+
+def _build_report_payloads(area_names: list) -> dict:
+    """
+    Reports for many areas from one snapshot query. Returns
+    {area_name: (snapshot_version, report)} in the requested order; the
+    version is None for areas without a risk row.
+    """
+    snapshots = area_snapshots(RiskLevel.area.in_(area_names))
+    built     = {row[0].area: (snapshot_version(*row), _assemble_report(row[0].area, *row)) for row in snapshots}
+    return {name: built.get(name) or (None, _build_report_payload(name)) for name in area_names}
+
+
+def _email_context(report: dict) -> dict:
+    """Template variables for report_email.html; all branching data prep lives here."""
+    wq = report.get("water_quality") or {}
+    wd = report.get("weather") or {}
+    dc = report.get("disease") or {}
+
+    wq_params = []
     if wq:
-        params = [
+        wq_params = [
             ("pH",             wq.get("ph","—"),            "6.5 – 8.5"),
             ("Turbidity (NTU)", wq.get("turbidity","—"),     "< 1 NTU"),
             ("Hardness (mg/L)", wq.get("hardness","—"),      "< 300 mg/L"),
@@ -90,24 +113,6 @@ def _build_email_html(report: dict) -> str:
             ("Conductivity",   wq.get("conductivity","—"),   "< 500 µS/cm"),
             ("Organic Carbon", wq.get("organic_carbon","—"), "< 2 mg/L"),
         ]
-        wq_table = "<table style='width:100%;border-collapse:collapse;font-size:13px;'><tr style='background:#eaf0fb'><th style='padding:6px;border:1px solid #ccc;text-align:left'>Parameter</th><th style='padding:6px;border:1px solid #ccc'>Value</th><th style='padding:6px;border:1px solid #ccc'>Safe Range</th></tr>"
-        for name, val, safe in params:
-            wq_table += f"<tr><td style='padding:6px;border:1px solid #ccc'>{name}</td><td style='padding:6px;border:1px solid #ccc;text-align:center'>{val}</td><td style='padding:6px;border:1px solid #ccc;text-align:center;color:#555'>{safe}</td></tr>"
-        wq_table += "</table>"
-
-    disease_block = ""
-    if dc:
-        disease_block = f"""
-        <h3 style='color:#6d28d9'>Disease Outbreak Data</h3>
-        <table style='width:100%;border-collapse:collapse;font-size:13px;'>
-          <tr style='background:#f3e8ff'>
-            <td style='padding:6px;border:1px solid #ccc'>Disease</td><td style='padding:6px;border:1px solid #ccc'><b>{dc.get('disease','—')}</b></td>
-          </tr>
-          <tr><td style='padding:6px;border:1px solid #ccc'>Total Cases</td><td style='padding:6px;border:1px solid #ccc'>{dc.get('total_cases','—')}</td></tr>
-          <tr style='background:#fef3c7'><td style='padding:6px;border:1px solid #ccc'>Active Cases</td><td style='padding:6px;border:1px solid #ccc;color:#b45309;font-weight:bold'>{dc.get('active_cases','—')}</td></tr>
-          <tr><td style='padding:6px;border:1px solid #ccc'>Recovered</td><td style='padding:6px;border:1px solid #ccc;color:green'>{dc.get('recovered','—')}</td></tr>
-          <tr style='background:#fee2e2'><td style='padding:6px;border:1px solid #ccc'>Deaths</td><td style='padding:6px;border:1px solid #ccc;color:#b91c1c;font-weight:bold'>{dc.get('deaths','—')}</td></tr>
-        </table>"""
 
     climate_lines = []
     if wd:
@@ -122,70 +127,24 @@ def _build_email_html(report: dict) -> str:
     if not climate_lines:
         climate_lines.append("Seasonal weather changes affecting water source quality")
 
-    html = f"""<!DOCTYPE html>
-<html>
-<head><meta charset='utf-8'/></head>
-<body style='font-family:Arial,sans-serif;max-width:700px;margin:0 auto;color:#1a1a1a;'>
-  <div style='background:linear-gradient(135deg,#1e3a5f,#0f2942);padding:24px 32px;border-radius:8px 8px 0 0;'>
-    <h1 style='color:white;margin:0;font-size:22px;'>🌊 JalRaksha — Water Health Intelligence</h1>
-    <p style='color:#7dd3fc;margin:4px 0 0;font-size:12px;'>Official Area Water Health Report</p>
-  </div>
-
-  <div style='background:#f0f4f8;padding:16px 32px;border-bottom:3px solid {color};'>
-    <table style='width:100%;'>
-      <tr>
-        <td><h2 style='margin:0;color:#0f2942'>{area}</h2><p style='margin:4px 0 0;color:#555;font-size:12px;'>Report ID: {rid} &nbsp;|&nbsp; Generated: {gen_at}</p></td>
-        <td style='text-align:right;'>
-          <span style='background:{color};color:white;padding:6px 16px;border-radius:20px;font-weight:bold;font-size:15px;'>
-            {level.upper()} RISK — {score}/100
-          </span>
-        </td>
-      </tr>
-    </table>
-  </div>
-
-  <div style='padding:24px 32px;background:white;'>
-    <h3 style='color:#1e3a5f;border-bottom:2px solid #e2e8f0;padding-bottom:6px;'>1. Water Quality Analysis</h3>
-    {wq_table if wq_table else "<p style='color:#888'>No water quality data available.</p>"}
-
-    <h3 style='color:#dc2626;margin-top:24px;'>⚠ Parameter Violations</h3>
-    <ul style='margin:8px 0;padding-left:20px;'>{issue_rows}</ul>
-  </div>
-
-  <div style='padding:0 32px 24px;background:white;'>
-    <h3 style='color:#1e3a5f;border-bottom:2px solid #e2e8f0;padding-bottom:6px;'>2. Environmental / Weather Conditions</h3>
-    {'<table style="font-size:13px;"><tr><td style="padding:4px 12px 4px 0;color:#555">Rainfall</td><td><b>' + str(wd.get('rainfall_mm','—')) + ' mm</b></td></tr><tr><td style="padding:4px 12px 4px 0;color:#555">Temperature</td><td><b>' + str(wd.get('temperature','—')) + ' °C</b></td></tr><tr><td style="padding:4px 12px 4px 0;color:#555">Humidity</td><td><b>' + str(wd.get('humidity','—')) + ' %</b></td></tr><tr><td style="padding:4px 12px 4px 0;color:#555">Flood Risk</td><td><b style="color:' + ('red' if wd.get('flood_risk') else 'green') + '">' + ('YES — ACTIVE' if wd.get('flood_risk') else 'No') + '</b></td></tr></table>' if wd else "<p style='color:#888'>No weather data.</p>"}
-
-    <h4 style='color:#0369a1;margin-top:12px;'>Contributing Environmental Factors:</h4>
-    <ul style='font-size:13px;'>{''.join(f"<li>{c}</li>" for c in climate_lines)}</ul>
-  </div>
-
-  <div style='padding:0 32px 24px;background:white;'>{disease_block}</div>
-
-  <div style='padding:16px 32px 24px;background:#fffbeb;border-top:2px solid #fcd34d;'>
-    <h3 style='color:#92400e;margin-top:0;'>3. Recommended Government Actions</h3>
-    <ol style='font-size:13px;line-height:1.7;color:#1a1a1a;'>
-      <li>Deploy mobile water testing units to {area} within <b>24 hours</b></li>
-      <li>Issue a public advisory for residents to boil water before use</li>
-      <li>Inspect and repair sewage infrastructure and open drains in the area</li>
-      <li>Distribute ORS packets and water purification tablets at public centres</li>
-      <li>Increase surveillance frequency for waterborne disease cases at local PHCs</li>
-      <li>Coordinate with CMWSSB / TWAD Board for emergency water supply</li>
-      <li>Activate rapid response teams if active disease cases exceed threshold</li>
-    </ol>
-  </div>
-
-  <div style='padding:12px 32px;background:#1e3a5f;border-radius:0 0 8px 8px;text-align:center;'>
-    <p style='color:#7dd3fc;font-size:11px;margin:0;'>
-      🚨 Emergency: <b style='color:white'>108</b> &nbsp;|&nbsp;
-      Disease Surveillance: <b style='color:white'>104</b> &nbsp;|&nbsp;
-      Water Quality Helpline: <b style='color:white'>1800-180-5678</b>
-    </p>
-    <p style='color:#475569;font-size:10px;margin:4px 0 0;'>This report was auto-generated by JalRaksha Water Health Intelligence System</p>
-  </div>
-</body>
-</html>"""
-    return html
+    return {
+        "area":   report["area"],
+        "level":  report["risk"]["level"],
+        "score":  report["risk"]["score"],
+        "color":  _risk_color(report["risk"]["level"]),
+        "gen_at": report["generated_at"][:19].replace("T", " ") + " UTC",
+        "rid":    report["report_id"],
+        "wq_params": wq_params,
+        "wd": wd,
+        "dc": dc,
+        "issues": report.get("water_issues", []),
+        "climate_lines": climate_lines,
+    }
+
+
+def _build_email_html(report: dict) -> str:
+    """Render a full HTML email body for the area report."""
+    return _EMAIL_TEMPLATE.render(_email_context(report))
 
 
 def _build_sms_text(report: dict) -> str:
@@ -208,56 +167,151 @@ def _build_sms_text(report: dict) -> str:
     return sms
 
 
-# ─────────── routes ─────────────────────────────────────────────────────────────
+# ─────────── report cache ───────────────────────────────────────────────────────
+# Payloads are cached per area together with the snapshot_version() of the rows
+# they were built from. Every lookup re-reads the current versions (one
+# index-only query for all requested areas) and rebuilds areas whose risk row
+# or newest readings changed, so a write made by any worker process is seen on
+# the next request. Rendered HTML / SMS is cached per report_id, so each
+# payload is rendered at most once per format. report_id and generated_at
+# therefore name the data snapshot: they stay the same across responses
+# until the area's data changes (or the entry expires), by design.
 
-@reports_bp.route("/area/<path:area_name>", methods=["GET"])
-def get_area_report(area_name):
-    report = _build_report_payload(area_name)
-    return jsonify(report)
+REPORT_CACHE_TTL = float(os.getenv("REPORT_CACHE_TTL", "300"))
+_report_cache = VersionedCache((), ttl=REPORT_CACHE_TTL, maxsize=512)
+_render_cache = VersionedCache((), ttl=REPORT_CACHE_TTL, maxsize=1024)
 
 
-@reports_bp.route("/send-email", methods=["POST"])
-def send_email():
-    data      = request.get_json(force=True)
-    area_name = data.get("area", "")
-    recipients = data.get("recipients", [])   # list of email strings
-    if not area_name or not recipients:
-        return jsonify({"error": "area and recipients required"}), 400
+def _get_report(area_name: str) -> dict:
+    return _get_reports([area_name])[area_name]
+
+
+def _get_reports(area_names=None) -> dict:
+    """Reports for `area_names` (all risk areas when None); unchanged areas come from the cache."""
+    current = snapshot_versions(*([] if area_names is None else [RiskLevel.area.in_(area_names)]))
+    if area_names is None:
+        area_names = list(current)
+    reports = {}
+    for name in area_names:
+        entry = _report_cache.get(name)
+        reports[name] = entry[1] if entry and entry[0] == current.get(name) else None
+    missing = [name for name, report in reports.items() if report is None]
+    if missing:
+        for name, (version, report) in _build_report_payloads(missing).items():
+            if version is not None:
+                _report_cache.put(name, (version, report))
+            reports[name] = report
+    return reports
+
+
+def _rendered(report: dict, kind: str, render) -> str:
+    key  = (report["report_id"], kind)
+    text = _render_cache.get(key)
+    if text is None:
+        with timed(f"render_{kind}"):
+            text = render(report)
+        _render_cache.put(key, text)
+    return text
+
+
+def _email_html(report: dict) -> str:
+    return _rendered(report, "html", _build_email_html)
+
+
+def _sms_text(report: dict) -> str:
+    return _rendered(report, "sms", _build_sms_text)
 
-    report    = _build_report_payload(area_name)
-    html_body = _build_email_html(report)
 
-    smtp_host = os.getenv("SMTP_HOST", "smtp.gmail.com")
-    smtp_port = int(os.getenv("SMTP_PORT", "587"))
-    smtp_user = os.getenv("SMTP_USER", "")
-    smtp_pass = os.getenv("SMTP_PASSWORD", "")
+def _email_subject(report: dict) -> str:
+    return f"[JalRaksha] Water Health Report — {report['area']} | {report['risk']['level']} Risk"
 
-    if not smtp_user or not smtp_pass:
+
+def _queue_email(report: dict, recipients: list):
+    """Render the HTML report and queue it for `recipients`. Returns (body, http_status)."""
+    html_body = _email_html(report)
+    subject   = _email_subject(report)
+
+    if not get_provider("email").configured():
         # Return the report data so frontend can open email client as fallback
-        return jsonify({
+        return {
             "status": "smtp_not_configured",
             "message": "SMTP credentials not set. Use mailto fallback.",
-            "subject": f"[JalRaksha] Water Health Report — {area_name} | {report['risk']['level']} Risk",
+            "subject": subject,
             "report": report,
             "html_preview": html_body[:500],
-        }), 200
+        }, 200
+
+    job_id = enqueue("email", [
+        {"recipient": r, "subject": subject, "body": html_body} for r in recipients
+    ])
+    return {
+        "status": "queued", "job_id": job_id,
+        "recipients": recipients, "report_id": report["report_id"],
+    }, 202
+
+
+def _queue_email_bundle(reports: list, recipients: list):
+    """Queue one report email per (area, recipient) as a single job; the dispatcher batches them per SMTP session."""
+    report_ids = [r["report_id"] for r in reports]
+    if not get_provider("email").configured():
+        return {
+            "status": "smtp_not_configured",
+            "message": "SMTP credentials not set. Use mailto fallback.",
+            "report_ids": report_ids,
+        }, 200
+
+    messages = []
+    for report in reports:
+        subject, html_body = _email_subject(report), _email_html(report)
+        messages.extend({"recipient": r, "subject": subject, "body": html_body} for r in recipients)
+    job_id = enqueue("email", messages)
+    return {
+        "status": "queued", "job_id": job_id,
+        "areas": [r["area"] for r in reports],
+        "recipients": recipients, "report_ids": report_ids,
+    }, 202
+
+
+def _queue_sms(report: dict, phones: list):
+    """Render the SMS text and queue it for `phones`. Returns (body, http_status)."""
+    sms_text = _sms_text(report)
+
+    if not get_provider("sms").configured():
+        return {
+            "status": "twilio_not_configured",
+            "message": "Twilio credentials not set in .env",
+            "sms_preview": sms_text,
+            "report_id": report["report_id"],
+        }, 200
+
+    job_id = enqueue("sms", [{"recipient": p, "body": sms_text} for p in phones])
+    return {
+        "status": "queued", "job_id": job_id,
+        "phones": phones, "report_id": report["report_id"],
+    }, 202
 
-    try:
-        msg = MIMEMultipart("alternative")
-        msg["Subject"] = f"[JalRaksha] Water Health Report — {area_name} | {report['risk']['level']} Risk"
-        msg["From"]    = smtp_user
-        msg["To"]      = ", ".join(recipients)
-        msg.attach(MIMEText(html_body, "html"))
 
-        with smtplib.SMTP(smtp_host, smtp_port) as server:
-            server.ehlo()
-            server.starttls()
-            server.login(smtp_user, smtp_pass)
-            server.sendmail(smtp_user, recipients, msg.as_string())
+# ─────────── routes ─────────────────────────────────────────────────────────────
+
+@reports_bp.route("/area/<path:area_name>", methods=["GET"])
+def get_area_report(area_name):
+    return jsonify(_get_report(area_name))
+
+
+@reports_bp.route("/send-email", methods=["POST"])
+def send_email():
+    data      = request.get_json(force=True)
+    area_name = data.get("area", "")
+    areas     = data.get("areas", [])        # batch mode: many area reports in one job
+    recipients = data.get("recipients", [])   # list of email strings
+    if not (area_name or areas) or not recipients:
+        return jsonify({"error": "area (or areas) and recipients required"}), 400
 
-        return jsonify({"status": "sent", "recipients": recipients, "report_id": report["report_id"]})
-    except Exception as e:
-        return jsonify({"error": str(e), "status": "failed"}), 500
+    if areas:
+        body, status = _queue_email_bundle(list(_get_reports(areas).values()), recipients)
+    else:
+        body, status = _queue_email(_get_report(area_name), recipients)
+    return jsonify(body), status
 
 
 @reports_bp.route("/send-sms", methods=["POST"])
@@ -268,64 +322,125 @@ def send_sms():
     if not area_name:
         return jsonify({"error": "area required"}), 400
 
-    report   = _build_report_payload(area_name)
-    sms_text = _build_sms_text(report)
-
-    account_sid  = os.getenv("TWILIO_ACCOUNT_SID", "")
-    auth_token   = os.getenv("TWILIO_AUTH_TOKEN", "")
-    from_number  = os.getenv("TWILIO_FROM", "")
-
-    if not account_sid or not auth_token or not from_number:
-        return jsonify({
-            "status": "twilio_not_configured",
-            "message": "Twilio credentials not set in .env",
-            "sms_preview": sms_text,
-            "report_id": report["report_id"],
-        }), 200
-
-    try:
-        from twilio.rest import Client
-        client  = Client(account_sid, auth_token)
-        results = []
-        for phone in phones:
-            msg = client.messages.create(body=sms_text, from_=from_number, to=phone)
-            results.append({"phone": phone, "sid": msg.sid, "status": msg.status})
-        return jsonify({"status": "sent", "results": results, "report_id": report["report_id"]})
-    except Exception as e:
-        return jsonify({"error": str(e), "status": "failed"}), 500
+    body, status = _queue_sms(_get_report(area_name), phones)
+    return jsonify(body), status
 
 
 @reports_bp.route("/broadcast", methods=["POST"])
 def broadcast():
-    """Send both email + SMS in one call."""
+    """Send both email + SMS in one call, from a single report payload."""
     data        = request.get_json(force=True)
     area_name   = data.get("area", "")
     email_to    = data.get("email_to", [])
     sms_to      = data.get("sms_to", [])
+    if not area_name:
+        return jsonify({"error": "area required"}), 400
+
+    started = perf_counter()
+    report  = _get_report(area_name)
+    timings = {"report": _ms(started)}
+
+    app = current_app._get_current_object()
+
+    def run_channel(name, fn, targets):
+        t0 = perf_counter()
+        with app.app_context():
+            try:
+                body, _ = fn(report, targets)
+            except Exception as e:
+                body = {"status": "failed", "error": str(e)}
+        return name, body, _ms(t0)
 
-    results = {}
-    if email_to:
-        with reports_bp.open_resource(""):  # noop — just use internal helpers
-            pass
-        try:
-            import requests as req
-            r = req.post(
-                "http://127.0.0.1:5000/api/reports/send-email",
-                json={"area": area_name, "recipients": email_to},
-                timeout=15,
-            )
-            results["email"] = r.json()
-        except Exception as e:
-            results["email"] = {"error": str(e)}
-    if sms_to:
-        try:
-            import requests as req
-            r = req.post(
-                "http://127.0.0.1:5000/api/reports/send-sms",
-                json={"area": area_name, "phones": sms_to},
-                timeout=15,
-            )
-            results["sms"] = r.json()
-        except Exception as e:
-            results["sms"] = {"error": str(e)}
+    channels = [("email", _queue_email, email_to), ("sms", _queue_sms, sms_to)]
+    channels = [c for c in channels if c[2]]
+
+    results = {"report_id": report["report_id"]}
+    with ThreadPoolExecutor(max_workers=max(len(channels), 1)) as pool:
+        for name, body, elapsed in pool.map(lambda c: run_channel(*c), channels):
+            results[name] = body
+            timings[name] = elapsed
+
+    timings["total"] = _ms(started)
+    results["timings_ms"] = timings
     return jsonify(results)
+
+
+class _ZipChunks(io.RawIOBase):
+    """Write-only, unseekable sink: zipfile streams entries into it and we drain the bytes."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+def _bundle_filename(index: int, area_name: str) -> str:
+    # The index keeps names unique: "T Nagar" and "T_Nagar" sanitize alike.
+    return f"{index:03d}-" + re.sub(r"[^A-Za-z0-9_-]+", "_", area_name).strip("_") + ".html"
+
+
+@reports_bp.route("/bundle", methods=["GET", "POST"])
+def bundle():
+    """
+    Reports for many areas in one response.
+    Areas: JSON body {"areas": [...]} or ?areas=A,B — all monitored areas when omitted.
+    ?format=zip (default): one HTML file per area plus manifest.json
+    ?format=ndjson: one {"area", "report", "html"?} line per area (?html=1 to include HTML)
+    """
+    data  = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "JSON object required"}), 400
+    areas = data.get("areas")
+    if areas is not None and not (isinstance(areas, list) and all(isinstance(a, str) for a in areas)):
+        return jsonify({"error": "areas must be a list of area names"}), 400
+    areas = areas or [a for a in request.args.get("areas", "").split(",") if a] or None
+    fmt   = request.args.get("format", data.get("format", "zip"))
+    if fmt not in ("zip", "ndjson"):
+        return jsonify({"error": "format must be zip or ndjson"}), 400
+
+    reports = list(_get_reports(areas).values())   # constant number of queries
+    workers = min(8, max(len(reports), 1))
+
+    def rendered():
+        # Rendering is pure Python on plain dicts, so it runs outside the app context.
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            yield from zip(reports, pool.map(_email_html, reports))
+
+    if fmt == "ndjson":
+        with_html = request.args.get("html", "0") == "1"
+
+        def lines():
+            for report, html_body in rendered():
+                line = {"area": report["area"], "report": report}
+                if with_html:
+                    line["html"] = html_body
+                yield json.dumps(line, ensure_ascii=False) + "\n"
+
+        return Response(lines(), mimetype="application/x-ndjson")
+
+    def archive():
+        sink = _ZipChunks()
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            manifest = []
+            for i, (report, html_body) in enumerate(rendered(), start=1):
+                name = _bundle_filename(i, report["area"])
+                zf.writestr(name, html_body)
+                manifest.append({"area": report["area"], "file": name,
+                                 "report_id": report["report_id"], "risk": report["risk"]})
+                yield sink.drain()
+            zf.writestr("manifest.json", json.dumps(manifest, indent=2, ensure_ascii=False))
+        yield sink.drain()
+
+    stamp = datetime.utcnow().strftime("%Y%m%d")
+    resp  = Response(archive(), mimetype="application/zip")
+    resp.headers["Content-Disposition"] = f"attachment; filename=jalraksha-reports-{stamp}.zip"
+    return resp
@@ -1,5 +1,5 @@
 from datetime import datetime
-from models import WaterQuality, WeatherData, DiseaseCase, RiskLevel, Alert
+from models import Area, WaterQuality, WeatherData, DiseaseCase, RiskLevel, Alert
 from extensions import db
 from risk_engine import calculate_risk
 
@@ -84,15 +84,18 @@ def seed_if_empty():
         wr = WEATHER_SAMPLES[i]
         dc = DISEASE_CASES[i]
 
-        wq = WaterQuality(area=area["name"], **ws)
+        area_row = Area(name=area["name"])
+        db.session.add(area_row)
+
+        wq = WaterQuality(area_ref=area_row, **ws)
         db.session.add(wq)
 
-        wd = WeatherData(area=area["name"], **wr)
+        wd = WeatherData(area_ref=area_row, **wr)
         db.session.add(wd)
 
         disease = DISEASES[i % len(DISEASES)]
         dcase = DiseaseCase(
-            disease=disease, area=area["name"],
+            disease=disease, area_ref=area_row,
             total_cases=dc["total"], active_cases=dc["active"],
             recovered=dc["recovered"], deaths=dc["deaths"],
         )
@@ -124,5 +127,11 @@ def seed_if_empty():
             )
             db.session.add(alert)
 
+    db.session.flush()
+    from rollups import rebuild_rollups
+    rebuild_rollups()
+    from alerting import recount_unread
+    recount_unread()
+
     db.session.commit()
     print("✅ Seed data inserted.")
@@ -0,0 +1,162 @@
+"""
+Pooled, persistent SMTP sessions.
+
+Opening a session costs a TCP connect plus EHLO, STARTTLS and AUTH. The pool
+keeps authenticated sessions around for reuse (up to `max_size` at once),
+health-checks a session with NOOP when it has been idle for a while, drops
+sessions idle longer than `max_idle`, and reconnects once when a server hangs
+up mid-send. `send_many` pushes a whole batch through a single session.
+"""
+import smtplib
+import threading
+from contextlib import contextmanager
+from time import monotonic
+
+
+class SMTPPool:
+    def __init__(self, host: str, port: int, user: str = "", password: str = "",
+                 starttls: bool = True, max_size: int = 4, max_idle: float = 60.0,
+                 check_after: float = 5.0, timeout: float = 30.0):
+        self.host, self.port   = host, port
+        self.user, self.password = user, password
+        self.starttls    = starttls
+        self.max_idle    = max_idle       # close sessions idle longer than this
+        self.check_after = check_after    # NOOP sessions idle longer than this before reuse
+        self.timeout     = timeout
+        self._idle  = []                  # [(session, last_used)] — LIFO keeps hot sessions hot
+        self._lock  = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self.stats  = {"connects": 0, "reuses": 0, "discards": 0}
+
+    # ── session lifecycle ──────────────────────────────────────────────────────
+
+    def _connect(self) -> smtplib.SMTP:
+        session = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        session.ehlo()
+        if self.starttls:
+            session.starttls()
+            session.ehlo()
+        if self.user and session.has_extn("auth"):
+            session.login(self.user, self.password)
+        self.stats["connects"] += 1
+        return session
+
+    @staticmethod
+    def _close(session):
+        try:
+            session.quit()
+        except Exception:
+            try:
+                session.close()
+            except Exception:
+                pass
+
+    def _healthy(self, session) -> bool:
+        try:
+            return session.noop()[0] == 250
+        except Exception:
+            return False
+
+    def _discard(self, session):
+        if session is not None:
+            self.stats["discards"] += 1
+            self._close(session)
+        return None
+
+    def _checkout(self) -> smtplib.SMTP:
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                session, last_used = self._idle.pop()
+            idle_for = monotonic() - last_used
+            if idle_for > self.max_idle or (idle_for > self.check_after and not self._healthy(session)):
+                self.stats["discards"] += 1
+                self._close(session)
+                continue
+            self.stats["reuses"] += 1
+            return session
+        return self._connect()
+
+    def _checkin(self, session):
+        with self._lock:
+            self._idle.append((session, monotonic()))
+
+    @contextmanager
+    def session(self):
+        """Borrow a session; it is discarded instead of returned if the block raises."""
+        self._slots.acquire()
+        session = None
+        try:
+            session = self._checkout()
+            yield session
+        except BaseException:
+            if session is not None:
+                self.stats["discards"] += 1
+                self._close(session)
+            session = None
+            raise
+        finally:
+            if session is not None:
+                self._checkin(session)
+            self._slots.release()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for session, _ in idle:
+            self._close(session)
+
+    # ── sending ────────────────────────────────────────────────────────────────
+
+    def send(self, from_addr: str, to_addrs: list, message: str):
+        try:
+            with self.session() as s:
+                return s.sendmail(from_addr, to_addrs, message)
+        except smtplib.SMTPServerDisconnected:
+            # Pooled session went stale between health checks; one fresh retry.
+            with self.session() as s:
+                return s.sendmail(from_addr, to_addrs, message)
+
+    def send_many(self, messages) -> list:
+        """
+        Send [(from_addr, to_addrs, message)] over one session. A dropped
+        session is replaced once per message; a server-side rejection only
+        fails that message. Returns one exception-or-None per message.
+        """
+        messages = list(messages)
+        results  = []
+        session  = None
+        self._slots.acquire()
+        try:
+            for from_addr, to_addrs, message in messages:
+                for attempt in (1, 2):
+                    try:
+                        if session is None:
+                            session = self._checkout()
+                        session.sendmail(from_addr, to_addrs, message)
+                        results.append(None)
+                        break
+                    except smtplib.SMTPServerDisconnected as e:
+                        session = self._discard(session)
+                        if attempt == 2:
+                            results.append(e)
+                    except smtplib.SMTPException as e:
+                        # Rejected message; the session is still usable. Must precede
+                        # OSError, which SMTPException subclasses.
+                        results.append(e)
+                        break
+                    except OSError as e:   # socket error / timeout: the session is gone
+                        session = self._discard(session)
+                        if attempt == 2:
+                            results.append(e)
+                if session is None:
+                    # Could not (re)connect: fail the rest instead of timing out per message.
+                    error = results[-1]
+                    results.extend(error for _ in range(len(messages) - len(results)))
+                    break
+        finally:
+            if session is not None:
+                self._checkin(session)
+            self._slots.release()
+        return results
@@ -0,0 +1,60 @@
+import os
+import sys
+
+import pytest
+
+# Before any backend module is imported: no background threads in tests.
+os.environ.setdefault("RISK_WORKER", "0")
+os.environ.setdefault("NOTIFY_WORKER", "0")
+os.environ.setdefault("PRELOAD_SDKS", "0")
+os.environ.setdefault("PROFILING", "0")
+os.environ.pop("DATABASE_REPLICA_URLS", None)
+os.environ.pop("GEMINI_API_KEY", None)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """A seeded app on a fresh SQLite file; process-local caches start empty."""
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'test.db'}")
+    from app import create_app
+    from cache import ALERTS, READINGS, RISK, bump
+
+    bump(READINGS, RISK, ALERTS)
+    app = create_app()
+    app.config["TESTING"] = True
+    from extensions import db
+    with app.app_context():
+        yield app
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def count_queries(app):
+    """count_queries() → context manager collecting the SQL statements executed inside it."""
+    from contextlib import contextmanager
+    from sqlalchemy import event
+    from extensions import db
+
+    @contextmanager
+    def counter():
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+
+    return counter
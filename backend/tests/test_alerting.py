@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from alerting import suppressed
+from extensions import db
+from models import Alert
+
+NOW = datetime(2026, 6, 1, 12, 0)
+
+
+@pytest.fixture
+def recent(app):
+    def add(area, severity, minutes_ago):
+        db.session.add(Alert(area=area, message="test", severity=severity,
+                             created_at=NOW - timedelta(minutes=minutes_ago)))
+        db.session.commit()
+    return add
+
+
+def test_lower_level_is_suppressed_by_a_recent_higher_alert(recent):
+    recent("Zone A", "Critical", 10)
+    assert suppressed({"Zone A": "High"}, NOW, window_minutes=60) == {"Zone A"}
+
+
+def test_same_level_in_window_is_suppressed_and_escalation_is_not(recent):
+    recent("Zone A", "High", 10)
+    recent("Zone B", "High", 10)
+    assert suppressed({"Zone A": "High", "Zone B": "Critical"}, NOW, window_minutes=60) == {"Zone A"}
+
+
+def test_expired_window_or_zero_window_lets_alerts_through(recent):
+    recent("Zone A", "Critical", 90)
+    assert suppressed({"Zone A": "High"}, NOW, window_minutes=60) == set()
+    recent("Zone A", "Critical", 5)
+    assert suppressed({"Zone A": "High"}, NOW, window_minutes=0) == set()
@@ -0,0 +1,161 @@
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from cache import VersionedCache
+from routes import chatbot
+
+
+class StubModel:
+    """Stands in for genai.GenerativeModel; `gate` holds replies until set."""
+
+    def __init__(self, chunks=("Boil ", "water."), fail_after=None):
+        self.chunks     = list(chunks)
+        self.fail_after = fail_after
+        self.calls      = []
+        self.gate       = threading.Event()
+        self.gate.set()
+
+    def start_chat(self, history):
+        return SimpleNamespace(send_message=lambda message, stream=False: self._reply(history, message, stream))
+
+    def _reply(self, history, message, stream):
+        self.calls.append((len(history), message))
+        self.gate.wait(5)
+        if not stream:
+            return SimpleNamespace(text="".join(self.chunks))
+        return self._stream()
+
+    def _stream(self):
+        for i, text in enumerate(self.chunks):
+            if i == self.fail_after:
+                raise RuntimeError("upstream reset")
+            yield SimpleNamespace(text=text)
+
+
+@pytest.fixture
+def model(monkeypatch):
+    stub = StubModel()
+    monkeypatch.setenv("GEMINI_API_KEY", "test")
+    monkeypatch.setattr(chatbot, "_model", stub)
+    monkeypatch.setattr(chatbot, "_answers", VersionedCache((), ttl=60, maxsize=16))
+    monkeypatch.setattr(chatbot, "_metrics", dict.fromkeys(chatbot._metrics, 0))
+    monkeypatch.setattr(chatbot, "_ttfb", {})
+    return stub
+
+
+def _ask(client, message, history=()):
+    return client.post("/api/chatbot/message", json={"message": message, "history": list(history)}).get_json()
+
+
+def test_repeat_question_is_answered_from_cache(client, model):
+    first = _ask(client, "What is cholera?")
+    again = _ask(client, "  what is CHOLERA ")
+    assert first == {"reply": "Boil water.", "source": "gemini", "cached": False}
+    assert again["cached"] and again["reply"] == "Boil water."
+    assert len(model.calls) == 1
+
+    metrics = client.get("/api/chatbot/metrics").get_json()
+    assert (metrics["hits"], metrics["misses"], metrics["upstream_calls"]) == (1, 1, 1)
+
+
+def test_history_is_part_of_the_key_and_sent_once(client, model):
+    history = [{"user": "hi", "bot": "hello"}]
+    _ask(client, "What is cholera?")
+    _ask(client, "What is cholera?", history)
+    assert len(model.calls) == 2
+    assert model.calls[1][0] == len(chatbot.PRIMER) + 2
+
+
+def test_identical_concurrent_questions_share_one_upstream_call(app, model):
+    model.gate.clear()
+    replies = []
+
+    def ask():
+        replies.append(_ask(app.test_client(), "safe pH?"))
+
+    threads = [threading.Thread(target=ask) for _ in range(5)]
+    for t in threads:
+        t.start()
+    deadline = time.monotonic() + 5
+    while chatbot._metrics["coalesced"] < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    model.gate.set()
+    for t in threads:
+        t.join()
+
+    assert len(model.calls) == 1
+    assert [r["reply"] for r in replies] == ["Boil water."] * 5
+    assert chatbot._metrics["coalesced"] == 4
+
+
+def test_upstream_failure_falls_back_and_is_not_cached(client, model, monkeypatch):
+    monkeypatch.setattr(model, "_reply", lambda *a: (_ for _ in ()).throw(RuntimeError("quota")))
+    reply = _ask(client, "cholera symptoms")
+    assert reply["source"] == "fallback" and "Vibrio" in reply["reply"]
+    assert chatbot._metrics["upstream_errors"] == 1
+    assert len(chatbot._answers._data) == 0
+
+
+def _events(resp) -> list:
+    events = []
+    for block in resp.get_data(as_text=True).strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def _stream(client, message):
+    resp = client.post("/api/chatbot/stream", json={"message": message})
+    assert resp.mimetype == "text/event-stream"
+    return _events(resp)
+
+
+def test_stream_emits_chunks_then_done_and_caches_the_answer(client, model):
+    model.chunks = ["Boil ", "water ", "for one minute."]
+    events = _stream(client, "How do I make water safe?")
+    assert [e for e, _ in events] == ["delta", "delta", "delta", "done"]
+    assert "".join(d["text"] for e, d in events if e == "delta") == "Boil water for one minute."
+    done = events[-1][1]
+    assert (done["source"], done["cached"]) == ("gemini", False)
+    assert 0 <= done["ttfb_ms"] <= done["total_ms"]
+
+    events = _stream(client, "how do i make water safe")
+    assert events[0] == ("delta", {"text": "Boil water for one minute."})
+    assert events[-1][1]["cached"] is True
+    assert len(model.calls) == 1
+
+    ttfb = client.get("/api/chatbot/metrics").get_json()["ttfb_ms"]
+    assert ttfb["stream.gemini"]["count"] == 1 and ttfb["stream.cache"]["count"] == 1
+
+
+def test_stream_interrupted_after_partial_output(client, model):
+    model.fail_after = 1
+    events = _stream(client, "typhoid?")
+    assert [e for e, _ in events] == ["delta", "error", "done"]
+    assert events[-1][1]["source"] == "gemini"
+    assert len(chatbot._answers._data) == 0
+
+
+def test_stream_without_gemini_sends_the_fallback_at_once(client, monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    events = _stream(client, "what is turbidity")
+    assert [e for e, _ in events] == ["delta", "done"]
+    assert "NTU" in events[0][1]["text"]
+    assert events[1][1]["source"] == "fallback"
+
+
+def test_empty_upstream_stream_falls_back_and_is_not_cached(client, model):
+    model.chunks = []
+    events = _stream(client, "what is turbidity")
+    assert [e for e, _ in events] == ["delta", "done"]
+    assert "NTU" in events[0][1]["text"]
+    assert events[1][1]["source"] == "fallback"
+    assert len(chatbot._answers._data) == 0
+
+    reply = _ask(client, "what is turbidity")
+    assert reply["source"] == "fallback" and "NTU" in reply["reply"]
+    assert len(chatbot._answers._data) == 0
@@ -0,0 +1,23 @@
+import pytest
+
+from extensions import db
+from models import WaterQuality, WeatherData
+from routes.dashboard import _feed_query
+
+
+@pytest.mark.parametrize("model", [WaterQuality, WeatherData])
+def test_unfiltered_feed_page_uses_index(app, model):
+    with app.test_request_context("/"):
+        q = _feed_query(model).limit(50)
+    compiled = q.compile(db.engine, compile_kwargs={"literal_binds": True})
+    plan = " | ".join(row[-1] for row in db.session.execute(db.text(f"EXPLAIN QUERY PLAN {compiled}")))
+    assert f"ix_{model.__tablename__}_recorded" in plan, plan
+    assert "TEMP B-TREE" not in plan, plan
+
+
+def test_feed_pages_are_consistent(client):
+    first = client.get("/api/dashboard/water-quality?limit=5")
+    assert len(first.get_json()) == 5
+    second = client.get(f"/api/dashboard/water-quality?limit=5&cursor={first.headers['X-Next-Cursor']}")
+    ids = [r["id"] for r in first.get_json() + second.get_json()]
+    assert len(ids) == 10 and len(set(ids)) == 10
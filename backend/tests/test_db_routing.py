@@ -0,0 +1,118 @@
+"""Read-replica routing against two SQLite files (primary + replica)."""
+import time
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import inspect, text
+
+import db_routing
+from extensions import db
+from routes.dashboard import _summary_cache
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    """Must come before `app`: create_app() reads the replica binds."""
+    monkeypatch.setattr(db_routing, "REPLICA_URLS", [f"sqlite:///{tmp_path / 'replica.db'}"])
+    monkeypatch.setattr(db_routing, "heartbeats", {})
+    monkeypatch.setattr(db_routing, "_thread", object())   # tests drive the heartbeat by hand
+    monkeypatch.setattr(db, "metadatas", dict(db.metadatas))   # binds add a metadata per key
+    _summary_cache.clear()
+    yield
+    _summary_cache.clear()
+
+
+def _sync():
+    db_routing.sync_sqlite_replicas(db.engines)
+    db_routing.check_replicas(db.engines)
+
+
+def _critical(client, **headers):
+    resp = client.get("/api/dashboard/summary", headers=headers)
+    return resp.headers.get("X-DB-Route"), resp.get_json()["statistics"]["critical_areas"]
+
+
+def _promote_on_primary(area):
+    """A write made through another worker: no bump() in this process."""
+    db.session.execute(text("UPDATE risk_levels SET level = 'Critical' WHERE area = :a"), {"a": area})
+    db.session.commit()
+
+
+def test_replica_reads_are_not_cached(replica, app, client):
+    _sync()
+    route, before = _critical(client)
+    assert route == "replica_1"
+    assert _summary_cache.get("summary") is None
+
+    _promote_on_primary("Adyar")
+    _sync()
+    assert _critical(client) == ("replica_1", before + 1)
+
+
+def test_primary_pinned_requests_bypass_the_cache(replica, app, client):
+    _sync()
+    route, before = _critical(client, **{"X-Read-Consistency": "strong"})
+    assert route == "primary"
+    assert _summary_cache.get("summary") is not None   # built from the primary
+
+    _promote_on_primary("Adyar")   # the replica has not caught up yet
+    assert _critical(client, **{"X-Read-Consistency": "strong"})[1] == before + 1
+
+    client.set_cookie(db_routing.COOKIE, f"{time.time() + 5:.3f}")
+    assert _critical(client)[1] == before + 1
+
+
+def test_heartbeat_starts_after_the_schema_exists(tmp_path, monkeypatch):
+    from app import create_app
+
+    seen = []
+
+    class Thread:
+        def __init__(self, target, args, **kwargs):
+            self.app = args[0]
+
+        def start(self):
+            with self.app.app_context():
+                seen.append(inspect(db.engine).has_table("counters"))
+
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'fresh.db'}")
+    monkeypatch.setattr(db_routing, "REPLICA_URLS", [f"sqlite:///{tmp_path / 'replica.db'}"])
+    monkeypatch.setattr(db_routing, "heartbeats", {})
+    monkeypatch.setattr(db_routing, "_thread", None)
+    monkeypatch.setattr(db, "metadatas", dict(db.metadatas))
+    monkeypatch.setattr(db_routing, "threading", SimpleNamespace(Thread=Thread))
+    app = create_app()
+    assert seen == [True]
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def test_heartbeat_column_holds_timestamps_past_2038(replica, app, monkeypatch):
+    from sqlalchemy.dialects import postgresql
+    from sqlalchemy.schema import CreateTable
+
+    from models import Counter
+
+    assert "value BIGINT" in str(CreateTable(Counter.__table__).compile(dialect=postgresql.dialect()))
+    monkeypatch.setattr(db_routing, "time", SimpleNamespace(time=lambda: 2_200_000_000.0))   # 2039
+    assert db_routing.beat(db.engines) == 2_200_000_000
+    assert db.session.get(Counter, db_routing.HEARTBEAT).value == 2_200_000_000
+
+
+def test_profiling_counts_queries_routed_to_a_replica(replica, monkeypatch, tmp_path):
+    import profiling
+    from app import create_app
+
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setenv("PROFILING", "1")
+    monkeypatch.setattr(profiling, "ENABLED", False)
+    app = create_app()
+    with app.app_context():
+        _sync()
+        resp = app.test_client().get("/api/disease/map")
+        assert resp.headers["X-DB-Route"] == "replica_1"
+        queries = int(resp.headers["Server-Timing"].split('desc="')[1].split(" ")[0])
+        assert queries >= 1
+        for engine in db.engines.values():
+            engine.dispose()
@@ -0,0 +1,73 @@
+import pytest
+
+from extensions import db
+from ingestion import load_rows
+from models import RiskLevel
+
+WATER = {"ph": 7.1, "turbidity": 12, "hardness": 150, "chloramines": 4, "conductivity": 400,
+         "organic_carbon": 12, "trihalomethanes": 60}
+
+
+def _add_areas(start: int, n: int):
+    """n extra High-risk areas, each with a reading of every kind."""
+    names = [f"Ward {i:03d}" for i in range(start, start + n)]
+    for name in names:
+        db.session.add(RiskLevel(area=name, score=60, level="High"))
+    db.session.commit()
+    load_rows("water-quality", ((i, {"area": a, **WATER}) for i, a in enumerate(names)), refresh=False)
+    load_rows("weather", ((i, {"area": a, "rainfall_mm": 60}) for i, a in enumerate(names)), refresh=False)
+    load_rows("disease-cases", ((i, {"area": a, "disease": "Cholera", "total_cases": 10, "active_cases": 3})
+                                for i, a in enumerate(names)), refresh=False)
+
+
+def _count(client, count_queries, method, url):
+    with count_queries() as statements:
+        resp = getattr(client, method)(url)
+    assert resp.status_code == 200
+    return len(statements), resp.get_json()
+
+
+@pytest.mark.parametrize("url", ["/api/disease/high-risk", "/api/disease/area/Ward 000"])
+def test_read_query_count_does_not_grow_with_areas(app, client, count_queries, url):
+    _add_areas(0, 10)
+    n_queries, n_body = _count(client, count_queries, "get", url)
+    _add_areas(10, 10)
+    two_n_queries, two_n_body = _count(client, count_queries, "get", url)
+
+    assert n_queries == two_n_queries == 1
+    if isinstance(two_n_body, list):
+        assert len(two_n_body) == len(n_body) + 10
+
+
+def test_recalculate_query_count_does_not_grow_with_areas(app, client, count_queries):
+    _add_areas(0, 10)
+    n_queries, _ = _count(client, count_queries, "post", "/api/disease/recalculate")
+    _add_areas(10, 10)
+    two_n_queries, body = _count(client, count_queries, "post", "/api/disease/recalculate")
+    assert body["updated"] == 12 + 20
+    assert n_queries == two_n_queries
+
+
+def test_recalculate_sums_the_latest_row_of_every_disease(app):
+    from datetime import datetime, timedelta
+
+    from risk_engine import calculate_risk
+    from risk_refresh import refresh_risk
+
+    t0 = datetime(2026, 5, 1)
+    db.session.add(RiskLevel(area="Ward 900", score=0, level="Low"))
+    db.session.commit()
+    load_rows("water-quality", [(1, {"area": "Ward 900", **WATER})], refresh=False)
+    load_rows("weather", [(1, {"area": "Ward 900", "rainfall_mm": 60})], refresh=False)
+    load_rows("disease-cases", [
+        (1, {"area": "Ward 900", "disease": "Cholera", "total_cases": 5,  "active_cases": 1, "recorded_at": t0}),
+        (2, {"area": "Ward 900", "disease": "Cholera", "total_cases": 50, "active_cases": 40,
+             "recorded_at": t0 + timedelta(hours=1)}),
+        (3, {"area": "Ward 900", "disease": "Typhoid", "total_cases": 40, "active_cases": 2,
+             "recorded_at": t0 + timedelta(hours=2)}),   # newest overall, but not the only disease
+    ], refresh=False)
+
+    refresh_risk(["Ward 900"])
+    expected = calculate_risk(WATER, {"rainfall_mm": 60}, {"active_cases": 42, "total_cases": 90})
+    db.session.expire_all()
+    assert RiskLevel.query.filter_by(area="Ward 900").one().score == pytest.approx(expected["score"], abs=0.1)
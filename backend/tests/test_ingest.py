@@ -0,0 +1,111 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+import ingestion
+import risk_worker
+from extensions import db
+from models import WeatherData
+
+WATER = {"ph": 7.1, "turbidity": 30, "hardness": 150, "chloramines": 4, "conductivity": 400,
+         "organic_carbon": 12, "trihalomethanes": 60}
+
+
+def test_new_area_from_ingest_is_scored(app, client):
+    assert client.post("/api/ingest/water-quality", json={"area": "Newtown", **WATER}).status_code == 201
+    assert client.post("/api/ingest/weather", json={"area": "Newtown", "rainfall_mm": 120}).status_code == 201
+    assert client.post("/api/ingest/disease-cases", json={
+        "area": "Newtown", "disease": "Cholera", "total_cases": 10, "active_cases": 6}).status_code == 201
+
+    assert risk_worker.flush(app) == ["Newtown"]
+    detail = client.get("/api/disease/area/Newtown")
+    assert detail.status_code == 200
+    assert detail.get_json()["risk"]["level"] in ("High", "Critical")
+
+
+def test_non_finite_values_rejected(client):
+    for bad in ("nan", "inf", "-Infinity"):
+        resp = client.post("/api/ingest/water-quality", json={"area": "Adyar", **WATER, "ph": bad})
+        assert resp.status_code == 400, bad
+        assert "ph" in resp.get_json()["error"]
+
+
+SPARSE_WEATHER = """area,rainfall_mm,temperature,humidity,flood_risk,recorded_at
+Adyar,12.25,31,,,2026-05-01T06:00:00
+Adyar,40.75,,88,yes,
+Velachery,3.125,29.5,70,no,2026-05-01T06:00:00
+"""
+
+
+def test_sparse_csv_fills_blank_columns_with_defaults(client):
+    resp = client.post("/api/ingest/bulk/weather?format=csv", data=SPARSE_WEATHER,
+                       content_type="text/csv")
+    stats = resp.get_json()
+    assert resp.status_code == 200, stats
+    assert (stats["inserted"], stats["rejected"]) == (3, 0)
+
+    rows = db.session.execute(
+        select(WeatherData.rainfall_mm, WeatherData.temperature, WeatherData.humidity, WeatherData.flood_risk)
+        .where(WeatherData.rainfall_mm.in_((12.25, 40.75, 3.125)))
+        .order_by(WeatherData.rainfall_mm)
+    ).all()
+    assert [tuple(r) for r in rows] == [(3.125, 29.5, 70, False), (12.25, 31, 60.0, False), (40.75, 25.0, 88, True)]
+
+
+def test_offset_timestamps_are_stored_as_utc(client):
+    body = {"area": "Adyar", "rainfall_mm": 7.375, "recorded_at": "2026-01-01T00:00:00+05:30"}
+    assert client.post("/api/ingest/weather", json=body).status_code == 201
+    row = WeatherData.query.filter_by(rainfall_mm=7.375).one()
+    assert row.recorded_at == datetime(2025, 12, 31, 18, 30)
+
+    csv_body = "area,rainfall_mm,recorded_at\nAdyar,7.625,2026-01-01T00:00:00-02:00\n"
+    resp = client.post("/api/ingest/bulk/weather?format=csv", data=csv_body, content_type="text/csv")
+    assert resp.get_json()["inserted"] == 1
+    assert WeatherData.query.filter_by(rainfall_mm=7.625).one().recorded_at == datetime(2026, 1, 1, 2, 0)
+
+
+@pytest.mark.parametrize("body, field", [
+    ({"total_cases": -1, "active_cases": 0}, "total_cases"),
+    ({"total_cases": 5, "active_cases": -2}, "active_cases"),
+    ({"total_cases": 5, "active_cases": 6}, "active_cases cannot exceed"),
+    ({"total_cases": 5, "active_cases": 1, "deaths": -1}, "deaths"),
+])
+def test_disease_counts_are_range_checked(client, body, field):
+    resp = client.post("/api/ingest/disease-cases", json={"area": "Adyar", "disease": "Cholera", **body})
+    assert resp.status_code == 400
+    assert field in resp.get_json()["error"]
+
+
+def test_ph_and_humidity_are_range_checked(client):
+    for ph in (-0.5, 14.5):
+        assert client.post("/api/ingest/water-quality", json={"area": "Adyar", **WATER, "ph": ph}).status_code == 400
+    assert client.post("/api/ingest/weather", json={"area": "Adyar", "rainfall_mm": 1, "humidity": 101}).status_code == 400
+
+    csv_body = ("area,disease,total_cases,active_cases\n"
+                "Adyar,Cholera,10,4\nAdyar,Cholera,10,11\nAdyar,Cholera,-3,0\n")
+    stats = client.post("/api/ingest/bulk/disease-cases?format=csv", data=csv_body,
+                        content_type="text/csv").get_json()
+    assert (stats["inserted"], stats["rejected"]) == (1, 2)
+    assert [e["row"] for e in stats["errors"]] == [3, 4]
+
+
+def test_failed_batch_rolls_back_and_committed_batches_are_rescored(app, monkeypatch):
+    calls, rescored = [], []
+
+    def failing_rollups(model, rows):
+        calls.append(len(rows))
+        if len(calls) == 2:
+            raise IntegrityError("INSERT", {}, Exception("constraint failed"))
+
+    monkeypatch.setattr(ingestion, "update_rollups", failing_rollups)
+    monkeypatch.setattr(ingestion, "refresh_risk", lambda areas: rescored.append(areas) or ([], {}))
+    rows = [(1, {"area": "Adyar", "rainfall_mm": 9.125}), (2, {"area": "Velachery", "rainfall_mm": 9.125})]
+
+    with pytest.raises(IntegrityError):
+        ingestion.load_rows("weather", rows, batch_size=1)
+
+    assert rescored == [["Adyar"]]
+    # The session is usable again and only the first batch was kept.
+    assert [r.area for r in WeatherData.query.filter_by(rainfall_mm=9.125)] == ["Adyar"]
@@ -0,0 +1,76 @@
+import sqlite3
+
+import pytest
+
+# Schema and a few rows as created by the version before the areas table.
+LEGACY_SCHEMA = """
+CREATE TABLE water_quality (id INTEGER PRIMARY KEY, area VARCHAR(100) NOT NULL, ph FLOAT NOT NULL,
+    turbidity FLOAT NOT NULL, hardness FLOAT NOT NULL, chloramines FLOAT NOT NULL,
+    conductivity FLOAT NOT NULL, organic_carbon FLOAT NOT NULL, trihalomethanes FLOAT NOT NULL,
+    recorded_at DATETIME);
+CREATE TABLE weather_data (id INTEGER PRIMARY KEY, area VARCHAR(100) NOT NULL, rainfall_mm FLOAT,
+    temperature FLOAT, humidity FLOAT, flood_risk BOOLEAN, recorded_at DATETIME);
+CREATE TABLE disease_cases (id INTEGER PRIMARY KEY, disease VARCHAR(100) NOT NULL,
+    area VARCHAR(100) NOT NULL, total_cases INTEGER, active_cases INTEGER, recovered INTEGER,
+    deaths INTEGER, recorded_at DATETIME);
+CREATE TABLE risk_levels (id INTEGER PRIMARY KEY, area VARCHAR(100) NOT NULL UNIQUE, score FLOAT,
+    level VARCHAR(20), lat FLOAT, lng FLOAT, updated_at DATETIME);
+CREATE TABLE alerts (id INTEGER PRIMARY KEY, area VARCHAR(100) NOT NULL, message TEXT NOT NULL,
+    severity VARCHAR(20), is_sent BOOLEAN, created_at DATETIME);
+
+INSERT INTO water_quality VALUES (1, 'Oldtown', 7.0, 30, 150, 4, 400, 12, 60, '2024-01-01 10:00:00');
+INSERT INTO water_quality VALUES (2, 'Oldtown', 6.9, 35, 150, 4, 400, 12, 60, '2024-01-01 11:00:00');
+INSERT INTO water_quality VALUES (3, 'Riverside', 7.2, 1, 150, 4, 400, 12, 60, '2024-01-01 10:00:00');
+INSERT INTO weather_data VALUES (1, 'Oldtown', 120, 30, 80, 1, '2024-01-01 10:00:00');
+INSERT INTO weather_data VALUES (2, 'Riverside', 0, 30, 60, 0, '2024-01-01 10:00:00');
+INSERT INTO disease_cases VALUES (1, 'Cholera', 'Oldtown', 10, 6, 4, 0, '2024-01-01 10:00:00');
+INSERT INTO disease_cases VALUES (2, 'Cholera', 'Riverside', 10, 0, 10, 0, '2024-01-01 10:00:00');
+INSERT INTO risk_levels VALUES (1, 'Oldtown', 80, 'Critical', 13.1, 80.2, '2024-01-01 10:00:00');
+INSERT INTO alerts VALUES (1, 'Oldtown', 'old alert', 'Critical', 0, '2024-01-01 10:00:00');
+"""
+
+
+@pytest.fixture
+def legacy_app(tmp_path, monkeypatch):
+    path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.close()
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{path}")
+    from app import create_app
+    app = create_app()   # must boot despite the old schema
+    yield app
+    from extensions import db
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_init_db_refuses_legacy_schema(legacy_app):
+    result = legacy_app.test_cli_runner().invoke(args=["init-db"])
+    assert result.exit_code != 0
+    assert "migrate-db" in result.output
+
+
+def test_migrate_db_keeps_readings(legacy_app):
+    runner = legacy_app.test_cli_runner()
+    result = runner.invoke(args=["migrate-db"])
+    assert result.exit_code == 0, result.output
+
+    client = legacy_app.test_client()
+    detail = client.get("/api/disease/area/Oldtown").get_json()
+    assert detail["water_quality"]["turbidity"] == 35          # newest of the two rows
+    assert detail["weather"]["rainfall_mm"] == 120
+
+    # Riverside had readings but no risk row: it now gets one and is scored.
+    assert client.get("/api/disease/area/Riverside").status_code == 200
+    updated = client.post("/api/disease/recalculate").get_json()["areas"]
+    assert {a["area"] for a in updated} == {"Oldtown", "Riverside"}
+
+    assert client.get("/api/alerts/unread-count").get_json()["count"] >= 1
+    assert client.post("/api/alerts/archive", json={"all": True}).status_code == 200
+
+    # New writes use area_id; a second run has nothing left to do.
+    assert client.post("/api/ingest/weather", json={"area": "Oldtown", "rainfall_mm": 5}).status_code == 201
+    again = runner.invoke(args=["migrate-db"])
+    assert "0 step(s)" in again.output
@@ -0,0 +1,130 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+import notifications
+from extensions import db
+from models import Alert, OutboxMessage
+from notifications import CLAIM_TIMEOUT, dispatch_once, enqueue, job_status
+
+
+class FakeLimiter:
+    def acquire(self):
+        pass
+
+
+class FakeSMS:
+    """Records every send; recipients in `fail` raise like a provider rejection."""
+    channel = "sms"
+
+    def __init__(self, fail=()):
+        self.limiter = FakeLimiter()
+        self.fail    = set(fail)
+        self.sent    = []
+
+    def configured(self):
+        return True
+
+    def send(self, msg):
+        if msg["recipient"] in self.fail:
+            raise RuntimeError(f"rejected {msg['recipient']}")
+        self.sent.append(msg["recipient"])
+        return f"ref-{len(self.sent)}"
+
+
+class FakeEmail(FakeSMS):
+    channel = "email"
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def send_batch(self, msgs):
+        self.batches.append([m["recipient"] for m in msgs])
+        return [("", None) for _ in msgs]
+
+
+@pytest.fixture
+def pool():
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        yield executor
+
+
+@pytest.fixture
+def fake_sms(monkeypatch):
+    provider = FakeSMS(fail={"+910000000000"})
+    monkeypatch.setitem(notifications._providers, "sms", provider)
+    return provider
+
+
+def _make_due():
+    db.session.execute(update(OutboxMessage).values(next_attempt_at=datetime.utcnow() - timedelta(seconds=1)))
+    db.session.commit()
+
+
+def test_delivery_marks_messages_and_alert_sent(app, pool, fake_sms):
+    alert = Alert.query.filter_by(is_sent=False).first()
+    job = enqueue("sms", [{"recipient": "+911111111111", "body": "hi", "alert_id": alert.id},
+                          {"recipient": "+912222222222", "body": "hi"}])
+    assert dispatch_once(app, pool) == 2
+
+    status = job_status(job)
+    assert status["sent"] == 2 and status["done"]
+    assert sorted(fake_sms.sent) == ["+911111111111", "+912222222222"]
+    db.session.expire_all()
+    assert db.session.get(Alert, alert.id).is_sent
+
+
+def test_failures_retry_with_backoff_then_fail(app, pool, fake_sms, monkeypatch):
+    monkeypatch.setattr(notifications, "MAX_ATTEMPTS", 3)
+    job = enqueue("sms", [{"recipient": "+910000000000", "body": "hi"}])
+
+    dispatch_once(app, pool)
+    msg = OutboxMessage.query.filter_by(job_id=job).one()
+    assert (msg.status, msg.attempts) == ("queued", 1)
+    assert "rejected" in msg.last_error
+    assert msg.next_attempt_at > datetime.utcnow()
+    assert dispatch_once(app, pool) == 0          # not due yet
+
+    for _ in range(2):
+        _make_due()
+        dispatch_once(app, pool)
+    db.session.expire_all()
+    msg = OutboxMessage.query.filter_by(job_id=job).one()
+    assert (msg.status, msg.attempts) == ("failed", 3)
+
+
+def test_email_is_sent_in_batches(app, pool, monkeypatch):
+    provider = FakeEmail()
+    monkeypatch.setitem(notifications._providers, "email", provider)
+    monkeypatch.setattr(notifications, "BATCH_SIZE", 3)
+    enqueue("email", [{"recipient": f"u{i}@example.org", "subject": "s", "body": "b"} for i in range(7)])
+
+    assert dispatch_once(app, pool) == 7
+    assert sorted(len(b) for b in provider.batches) == [3, 3]
+    assert len(provider.sent) == 1                # a lone trailing message goes through send()
+
+
+def test_fresh_claims_are_not_taken_twice(app):
+    enqueue("sms", [{"recipient": "+911111111111", "body": "hi"}])
+    first = notifications._claim(10)
+    assert len(first) == 1
+    assert notifications._claim(10) == []
+
+
+def test_stale_claim_is_reclaimed_and_old_owner_cannot_overwrite(app, fake_sms):
+    enqueue("sms", [{"recipient": "+911111111111", "body": "hi"}])
+    stale = notifications._claim(10)[0]
+    db.session.execute(update(OutboxMessage).values(claimed_at=datetime.utcnow() - CLAIM_TIMEOUT * 2))
+    db.session.commit()
+
+    fresh = notifications._claim(10)[0]
+    assert fresh["id"] == stale["id"] and fresh["claimed_by"] != stale["claimed_by"]
+
+    # The slow first dispatcher finally reports a failure: it must not touch the row.
+    notifications._record([(stale, None, "timeout")])
+    db.session.expire_all()
+    row = db.session.get(OutboxMessage, stale["id"])
+    assert (row.status, row.claimed_by, row.attempts) == ("sending", fresh["claimed_by"], 0)
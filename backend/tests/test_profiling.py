@@ -0,0 +1,36 @@
+import os
+
+import pytest
+
+import profiling
+
+
+@pytest.fixture
+def profiled(monkeypatch, tmp_path):
+    """Must come before `client` so create_app() installs the middleware."""
+    monkeypatch.setenv("PROFILING", "1")
+    monkeypatch.setattr(profiling, "ENABLED", False)   # restored after the test
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path / "profiles"))
+    return tmp_path / "profiles"
+
+
+def _get(client, **headers):
+    return client.get("/api/dashboard/summary", headers=headers)
+
+
+def test_x_profile_is_ignored_without_a_token(profiled, client, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_TOKEN", None)
+    for value in ("1", "pyinstrument", "anything:cprofile"):
+        resp = _get(client, **{"X-Profile": value})
+        assert "X-Profile-File" not in resp.headers
+        assert "Server-Timing" in resp.headers
+    assert not profiled.exists()
+
+
+def test_x_profile_requires_the_matching_token(profiled, client, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_TOKEN", "s3cret")
+    assert "X-Profile-File" not in _get(client, **{"X-Profile": "1"}).headers
+    assert "X-Profile-File" not in _get(client, **{"X-Profile": "wrong"}).headers
+
+    name = _get(client, **{"X-Profile": "s3cret"}).headers["X-Profile-File"]
+    assert name.endswith(".prof") and os.listdir(profiled) == [name]
@@ -0,0 +1,68 @@
+import io
+import json
+import zipfile
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from extensions import db
+
+AREA = "North Chennai"
+
+
+def _report(client):
+    resp = client.get(f"/api/reports/area/{AREA}")
+    assert resp.status_code == 200
+    return resp.get_json()
+
+
+def test_unchanged_area_is_served_from_cache(client):
+    assert _report(client)["report_id"] == _report(client)["report_id"]
+
+
+def test_writes_from_another_process_invalidate_the_cached_report(client):
+    """Writes that never call bump() here (another worker's) must still show up."""
+    first = _report(client)
+
+    db.session.execute(text("UPDATE risk_levels SET score = 99.5, level = 'Critical', updated_at = :now "
+                            "WHERE area = :area"), {"now": datetime.utcnow() + timedelta(seconds=1), "area": AREA})
+    db.session.commit()
+    second = _report(client)
+    assert second["report_id"] != first["report_id"]
+    assert second["risk"] == {"level": "Critical", "score": 99.5}
+
+    db.session.execute(text(
+        "INSERT INTO water_quality (area_id, ph, turbidity, hardness, chloramines, conductivity, "
+        "organic_carbon, trihalomethanes, recorded_at) "
+        "SELECT id, 5.1, 9.0, 100, 2, 300, 3, 40, :now FROM areas WHERE name = :area"
+    ), {"now": datetime.utcnow() + timedelta(minutes=1), "area": AREA})
+    db.session.commit()
+    third = _report(client)
+    assert third["water_quality"]["ph"] == 5.1
+
+
+def test_send_paths_use_current_data(client):
+    _report(client)
+    db.session.execute(text("UPDATE risk_levels SET level = 'Critical', updated_at = :now WHERE area = :area"),
+                       {"now": datetime.utcnow() + timedelta(seconds=1), "area": AREA})
+    db.session.commit()
+    resp = client.post("/api/reports/send-sms", json={"area": AREA, "phones": ["+911111111111"]})
+    assert resp.get_json()["status"] == "twilio_not_configured"
+    assert "CRITICAL RISK" in resp.get_json()["sms_preview"]
+
+
+def test_bundle_rejects_areas_that_are_not_a_list_of_names(client):
+    for areas in ("Adyar", [1, 2], {"a": 1}):
+        resp = client.post("/api/reports/bundle", json={"areas": areas})
+        assert resp.status_code == 400, areas
+
+
+def test_bundle_entries_are_unique_when_names_sanitize_alike(client):
+    resp = client.post("/api/reports/bundle", json={"areas": ["T Nagar", "T_Nagar", "Adyar"]})
+    assert resp.status_code == 200
+    zf = zipfile.ZipFile(io.BytesIO(resp.get_data()))
+    names = zf.namelist()
+    assert len(names) == len(set(names)) == 4
+    manifest = json.loads(zf.read("manifest.json"))
+    assert [m["area"] for m in manifest] == ["T Nagar", "T_Nagar", "Adyar"]
+    assert [m["file"] for m in manifest] == ["001-T_Nagar.html", "002-T_Nagar.html", "003-Adyar.html"]
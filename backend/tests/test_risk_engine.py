@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from risk_engine import calculate_risk, calculate_risk_batch
+
+TURBIDITY = [0, 0.5, 1, 1.0001, 3.99, 4, 4.01, 9.99, 10, 10.01, 24.99, 25, 25.01, 60]
+PH        = [3, 5.49, 5.5, 5.51, 5.99, 6.0, 6.01, 6.49, 6.5, 7, 8.5, 8.51, 9.0, 9.01, 9.5, 9.51, 12]
+RAINFALL  = [0, 0.1, 10, 10.1, 50, 50.1, 100, 100.1, 300]
+CASES     = [(0, 0), (5, 0), (0, 10), (1, 10), (2, 10), (35, 100), (49, 100), (5, 10), (10, 10)]
+
+
+def _scalar(t, p, r, active, total):
+    return calculate_risk({"turbidity": t, "ph": p}, {"rainfall_mm": r},
+                          {"active_cases": active, "total_cases": total})
+
+
+def _assert_parity(rows):
+    cols = list(zip(*rows))
+    batch = calculate_risk_batch(turbidity=cols[0], ph=cols[1], rainfall_mm=cols[2],
+                                 active_cases=cols[3], total_cases=cols[4])
+    for i, row in enumerate(rows):
+        expected = _scalar(*row)
+        assert batch["score"][i] == expected["score"], row
+        assert batch["level"][i] == expected["level"], row
+        for name, value in expected["breakdown"].items():
+            assert batch["breakdown"][name][i] == value, (row, name)
+
+
+def test_turbidity_boundaries():
+    _assert_parity([(t, 7, 0, 0, 10) for t in TURBIDITY])
+
+
+def test_ph_boundaries():
+    _assert_parity([(1, p, 0, 0, 10) for p in PH])
+
+
+def test_rainfall_boundaries():
+    _assert_parity([(1, 7, r, 0, 10) for r in RAINFALL])
+
+
+def test_case_spike_boundaries_including_zero_totals():
+    _assert_parity([(1, 7, 0, a, t) for a, t in CASES])
+
+
+def test_all_boundary_combinations():
+    rows = [(t, p, r, a, n) for t in TURBIDITY[::3] for p in PH[::3] for r in RAINFALL[::2] for a, n in CASES[::2]]
+    _assert_parity(rows)
+
+
+def test_random_rows():
+    rng = random.Random(7)
+    rows = []
+    for _ in range(5000):
+        total = rng.choice([0, rng.randint(1, 500)])
+        rows.append((round(rng.uniform(0, 40), rng.choice([0, 1, 2])),
+                     round(rng.uniform(4, 11), rng.choice([1, 2])),
+                     rng.choice([0, round(rng.expovariate(1 / 40), 1)]),
+                     rng.randint(0, total) if total else 0,
+                     total))
+    _assert_parity(rows)
+
+
+def test_empty_batch():
+    batch = calculate_risk_batch([], [], [], [], [])
+    assert list(batch["score"]) == [] and batch["level"] == []
+
+
+def test_mismatched_columns_rejected():
+    with pytest.raises(ValueError):
+        calculate_risk_batch([1], [7, 7], [0], [0], [1])
@@ -0,0 +1,98 @@
+"""SMTPPool against a minimal in-process SMTP server (an aiosmtpd-style stand-in)."""
+import socketserver
+import threading
+
+import pytest
+
+from smtp_pool import SMTPPool
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        server = self.server
+        server.connections += 1
+        self.reply("220 test ESMTP")
+        rcpts = []
+        while line := self.rfile.readline():
+            cmd = line.decode().strip()
+            verb = cmd[:4].upper()
+            if verb in ("EHLO", "HELO"):
+                self.reply("250 test")
+            elif verb == "MAIL":
+                rcpts = []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                rcpt = cmd.split(":", 1)[1].strip("<> ")
+                if rcpt in server.reject:
+                    self.reply("550 no such user")
+                else:
+                    rcpts.append(rcpt)
+                    self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 go ahead")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                server.delivered.extend(rcpts)
+                self.reply("250 queued")
+                if server.hangup_after and len(server.delivered) == server.hangup_after:
+                    server.hangup_after = 0
+                    return   # drop the connection without QUIT
+            elif verb in ("RSET", "NOOP"):
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("502 unknown")
+
+
+@pytest.fixture
+def smtpd():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    server.connections, server.delivered, server.reject, server.hangup_after = 0, [], set(), 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _pool(server):
+    return SMTPPool("127.0.0.1", server.server_address[1], starttls=False, timeout=5)
+
+
+def _msgs(*rcpts):
+    return [("from@example.org", [r], f"Subject: t\r\n\r\nhello {r}") for r in rcpts]
+
+
+def test_rejected_recipient_fails_only_its_message(smtpd):
+    smtpd.reject = {"bad@example.org"}
+    pool = _pool(smtpd)
+    results = pool.send_many(_msgs("a@example.org", "bad@example.org", "b@example.org"))
+
+    assert results[0] is None and results[2] is None
+    assert "no such user" in str(results[1])
+    assert smtpd.delivered == ["a@example.org", "b@example.org"]
+    assert smtpd.connections == 1 and pool.stats["discards"] == 0
+    pool.close()
+
+
+def test_dropped_session_is_replaced_once(smtpd):
+    smtpd.hangup_after = 1
+    pool = _pool(smtpd)
+    results = pool.send_many(_msgs("a@example.org", "b@example.org", "c@example.org"))
+
+    assert results == [None, None, None]
+    assert smtpd.delivered == ["a@example.org", "b@example.org", "c@example.org"]
+    assert smtpd.connections == 2 and pool.stats["discards"] == 1
+    pool.close()
+
+
+def test_unreachable_server_fails_every_message():
+    pool = SMTPPool("127.0.0.1", 1, starttls=False, timeout=1)
+    results = pool.send_many(_msgs("a@example.org", "b@example.org"))
+    assert len(results) == 2 and all(isinstance(e, OSError) for e in results)
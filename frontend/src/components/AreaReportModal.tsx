@@ -59,8 +59,8 @@ function SendPanel({ areaName, report, mode, onClose }: { areaName: string; repo
         res = await sendReportSMS(areaName, items)
       }
       const status = (res as any).status as string
-      if (status === 'sent') {
-        setFeedback({ ok: true, msg: `Report successfully sent to ${items.length} recipient(s)!` })
+      if (status === 'sent' || status === 'queued') {
+        setFeedback({ ok: true, msg: `Report queued for delivery to ${items.length} recipient(s)!` })
       } else if (status === 'smtp_not_configured' || status === 'twilio_not_configured') {
         if (mode === 'email') {
           // Open mailto as fallback
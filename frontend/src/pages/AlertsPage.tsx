@@ -1,5 +1,6 @@
 import { useEffect, useState } from 'react'
-import { getAlerts, clearAlerts, sendAlertsNow, markAlertSent } from '../services/api'
+import { getAlerts, clearAlerts, sendAlertsNow, markAlertSent, markAlertsSent } from '../services/api'
+import { useLiveEvents } from '../services/events'
 import type { Alert, RiskLevel } from '../types'
 import RiskBadge from '../components/RiskBadge'
 import { Bell, Send, Trash2, CheckCircle, AlertTriangle, MessageSquare } from 'lucide-react'
@@ -20,6 +21,21 @@ export default function AlertsPage() {
 
   useEffect(() => { load() }, [])
 
+  useLiveEvents(['alert'], (event, data) => {
+    if (event === 'alert.created') {
+      const fresh = (data.alerts as Alert[]).filter(a => filter === 'All' || a.severity === filter)
+      setAlerts(prev => [...fresh, ...prev])
+    } else if (event === 'alert.sent') {
+      const ids = new Set<number>(data.ids)
+      setAlerts(prev => prev.map(a => ids.has(a.id) ? { ...a, is_sent: true } : a))
+    } else if (event === 'alert.archived') {
+      const ids = new Set<number>(data.ids)
+      setAlerts(prev => prev.filter(a => !ids.has(a.id)))
+    }
+  }, () => {
+    getAlerts(filter === 'All' ? undefined : filter).then(setAlerts)
+  })
+
   const handleFilter = (f: string) => {
     setFilter(f)
     load(f)
@@ -29,7 +45,7 @@ export default function AlertsPage() {
     setSending(true); setSmsResult(null)
     try {
       const res = await sendAlertsNow()
-      setSmsResult(`✅ ${res.sent} SMS alert(s) sent successfully.`)
+      setSmsResult(`✅ ${res.queued} SMS alert(s) queued for delivery.`)
     } catch (e: any) {
       setSmsResult(`❌ ${e?.response?.data?.error || 'Failed to send SMS'}`)
     } finally {
@@ -48,6 +64,11 @@ export default function AlertsPage() {
     setAlerts(prev => prev.map(a => a.id === id ? { ...a, is_sent: true } : a))
   }
 
+  const handleMarkAllSent = async () => {
+    await markAlertsSent(filter === 'All' ? { all: true } : { severity: filter })
+    setAlerts(prev => prev.map(a => filter === 'All' || a.severity === filter ? { ...a, is_sent: true } : a))
+  }
+
   const severities = ['All', 'Critical', 'High', 'Medium', 'Low']
 
   return (
@@ -65,6 +86,10 @@ export default function AlertsPage() {
             <Send className={`w-4 h-4 ${sending ? 'animate-bounce' : ''}`} />
             {sending ? 'Sending…' : 'Send SMS Alerts'}
           </button>
+          <button onClick={handleMarkAllSent} className="btn-secondary flex items-center gap-2">
+            <CheckCircle className="w-4 h-4" />
+            Mark {filter === 'All' ? 'All' : filter} Sent
+          </button>
           <button onClick={handleClear} className="btn-danger flex items-center gap-2">
             <Trash2 className="w-4 h-4" />
             Clear All
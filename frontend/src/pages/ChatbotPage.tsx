@@ -1,5 +1,5 @@
 import { useState, useRef, useEffect } from 'react'
-import { sendChatMessage } from '../services/api'
+import { streamChatMessage } from '../services/api'
 import type { ChatMessage } from '../types'
 import { Bot, Send, User, Droplets, RefreshCw } from 'lucide-react'
 
@@ -47,9 +47,13 @@ export default function ChatbotPage() {
           return acc
         }, [])
 
-      const res = await sendChatMessage(msg, history)
-      const botMsg: ChatMessage = { role: 'bot', text: res.reply, timestamp: new Date().toISOString() }
-      setMessages(prev => [...prev, botMsg])
+      // The bot bubble appears with the first chunk and grows as the rest arrive.
+      const botMsg: ChatMessage = { role: 'bot', text: '', timestamp: new Date().toISOString() }
+      await streamChatMessage(msg, history, chunk => {
+        const first = botMsg.text === ''
+        botMsg.text += chunk
+        setMessages(prev => [...(first ? prev : prev.slice(0, -1)), { ...botMsg }])
+      })
     } catch {
       setMessages(prev => [...prev, {
         role: 'bot',
@@ -134,7 +138,7 @@ export default function ChatbotPage() {
           </div>
         ))}
 
-        {loading && (
+        {loading && messages[messages.length - 1]?.role === 'user' && (
           <div className="flex gap-3 justify-start">
             <div className="w-8 h-8 rounded-full bg-blue-600 flex items-center justify-center flex-shrink-0">
               <Droplets className="w-4 h-4 text-white" />
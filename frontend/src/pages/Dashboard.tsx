@@ -1,5 +1,6 @@
 import { useEffect, useState } from 'react'
 import { getDashboardSummary, getDiseaseSummary } from '../services/api'
+import { useLiveEvents } from '../services/events'
 import type { DashboardData, DiseaseSummary } from '../types'
 import StatCard from '../components/StatCard'
 import RiskBadge from '../components/RiskBadge'
@@ -43,6 +44,10 @@ export default function Dashboard() {
       .finally(() => setLoading(false))
   }, [])
 
+  // Statistics are aggregates, so re-read the (server-cached) summary when something changes.
+  const refresh = () => { getDashboardSummary().then(setData) }
+  useLiveEvents(['risk', 'alert'], refresh, refresh)
+
   useEffect(() => {
     if (data && (data.statistics.critical_areas > 0 || data.statistics.high_risk_areas > 0)) {
       playBeep()
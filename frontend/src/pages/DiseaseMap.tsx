@@ -1,5 +1,6 @@
 import { useEffect, useState } from 'react'
 import { getRiskMap, getHighRiskAreas, getAreaDetail } from '../services/api'
+import { useLiveEvents } from '../services/events'
 import type { AreaRisk, RiskLevel } from '../types'
 import RiskBadge from '../components/RiskBadge'
 import AreaWarningPanel from '../components/AreaWarningPanel'
@@ -30,6 +31,18 @@ export default function DiseaseMap() {
       .finally(() => setLoading(false))
   }, [])
 
+  useLiveEvents(['risk'], (_, data: { changes: Pick<AreaRisk, 'area' | 'score' | 'level' | 'updated_at'>[] }) => {
+    const byArea = new Map(data.changes.map(c => [c.area, c]))
+    setAreas(prev => prev.map(a => {
+      const c = byArea.get(a.area)
+      return c ? { ...a, score: c.score, level: c.level, updated_at: c.updated_at } : a
+    }))
+    getHighRiskAreas().then(setHighRisk)
+  }, () => {
+    Promise.all([getRiskMap(), getHighRiskAreas()])
+      .then(([map, hr]) => { setAreas(map); setHighRisk(hr) })
+  })
+
   const handleAreaClick = async (area: AreaRisk) => {
     const detail = await getAreaDetail(area.area)
     setSelected(detail)
@@ -18,13 +18,57 @@ export const getAlerts             = (severity?: string) =>
 export const getUnreadCount        = () => api.get('/alerts/unread-count').then(r => r.data)
 export const markAlertSent         = (id: number) => api.patch(`/alerts/${id}/mark-sent`).then(r => r.data)
 export const clearAlerts           = () => api.delete('/alerts/clear').then(r => r.data)
+export const markAlertsSent        = (filter: { ids?: number[]; severity?: string; area?: string; all?: boolean }) =>
+  api.post('/alerts/mark-sent', filter).then(r => r.data)
 
 export const sendChatMessage       = (message: string, history: {user: string; bot: string}[]) =>
   api.post('/chatbot/message', { message, history }).then(r => r.data)
 
+// Reads the /chatbot/stream SSE response, calling onDelta with each text chunk.
+// Resolves with the final `done` payload.
+export type ChatStreamDone = { source: string; cached: boolean; ttfb_ms: number; total_ms: number }
+
+export async function streamChatMessage(
+  message: string,
+  history: {user: string; bot: string}[],
+  onDelta: (text: string) => void,
+): Promise<ChatStreamDone> {
+  const res = await fetch('/api/chatbot/stream', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ message, history }),
+  })
+  if (!res.ok || !res.body) throw new Error(`Chat stream failed: ${res.status}`)
+
+  const reader  = res.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+  let done: ChatStreamDone | null = null
+  for (;;) {
+    const { value, done: finished } = await reader.read()
+    if (finished) break
+    buffer += decoder.decode(value, { stream: true })
+    let sep
+    while ((sep = buffer.indexOf('\n\n')) >= 0) {
+      const block = buffer.slice(0, sep)
+      buffer = buffer.slice(sep + 2)
+      const event = block.match(/^event: (.*)$/m)?.[1]
+      const data  = block.match(/^data: (.*)$/m)?.[1]
+      if (!data) continue
+      const payload = JSON.parse(data)
+      if (event === 'delta') onDelta(payload.text)
+      else if (event === 'done') done = payload
+    }
+  }
+  if (!done) throw new Error('Chat stream ended early')
+  return done
+}
+
 export const getAreaReport         = (area: string) =>
   api.get(`/reports/area/${encodeURIComponent(area)}`).then(r => r.data)
 export const sendReportEmail       = (area: string, recipients: string[]) =>
   api.post('/reports/send-email', { area, recipients }).then(r => r.data)
 export const sendReportSMS         = (area: string, phones: string[]) =>
   api.post('/reports/send-sms', { area, phones }).then(r => r.data)
+export const getNotificationJob    = (jobId: string) =>
+  api.get(`/notifications/jobs/${jobId}`).then(r => r.data)
@@ -0,0 +1,42 @@
+import { useEffect, useRef } from 'react'
+
+export type LiveEvent = 'risk.updated' | 'alert.created' | 'alert.sent' | 'alert.archived'
+
+// Full refetch interval while subscribed. Deltas come from the worker process the
+// stream is connected to, so writes handled by other workers only arrive this way.
+const RESYNC_MS = 60_000
+
+// Subscribes to /api/events/stream for the page's lifetime. EventSource reconnects
+// on its own and resends Last-Event-ID, so missed deltas are replayed by the server
+// when it lands on the same worker. `resync` (a full refetch) runs on every
+// reconnect — the server greets each connection with `hello` — and every RESYNC_MS.
+export function useLiveEvents(
+  topics: ('risk' | 'alert')[],
+  onEvent: (event: LiveEvent, data: any) => void,
+  resync?: () => void,
+) {
+  const handler = useRef(onEvent)
+  handler.current = onEvent
+  const refetch = useRef(resync)
+  refetch.current = resync
+  const key = topics.join(',')
+
+  useEffect(() => {
+    const source = new EventSource(`/api/events/stream?topics=${key}`)
+    const events: LiveEvent[] = ['risk.updated', 'alert.created', 'alert.sent', 'alert.archived']
+    events.forEach(name =>
+      source.addEventListener(name, e => handler.current(name, JSON.parse((e as MessageEvent).data))),
+    )
+    let connected = false
+    source.addEventListener('hello', () => {
+      // The page loaded its data just before the first connection.
+      if (connected) refetch.current?.()
+      connected = true
+    })
+    const timer = window.setInterval(() => refetch.current?.(), RESYNC_MS)
+    return () => {
+      window.clearInterval(timer)
+      source.close()
+    }
+  }, [key])
+}